@@ -0,0 +1,72 @@
+"""Attentes de DM : `bot.wait_for` avec une fonction check par attente vs la DMInbox.
+
+Des milliers d'utilisateurs attendent de taper leur RCON en DM pendant que le salon
+continue de discuter. Les messages passent par le vrai `bot.dispatch` d'un
+`commands.Bot` (faux Discord) : avec `wait_for`, chaque message appelle la fonction
+check de toutes les attentes ; avec la DMInbox, seulement un accès dict par message.
+
+Usage : python benchmarks/bench_dm_inbox.py [messages_de_salon] [attentes...]
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discord
+from dm_inbox import DMInbox
+from fake_discord import FakeBot, FakeChannel, FakeGuild, FakeHTTP, FakeUser
+
+async def drain(baseline):
+    while len(asyncio.all_tasks()) > baseline:
+        await asyncio.sleep(0)
+
+async def run(label, waiters, chatter):
+    http = FakeHTTP(0)
+    bot = FakeBot(http)
+    inbox = DMInbox()
+    bot.add_listener(inbox.on_message)
+    channel = FakeChannel(http, FakeGuild())
+    users = [FakeUser(http, 1000 + i) for i in range(waiters)]
+    talker = FakeUser(http, 1)
+    async with bot:
+        baseline = len(asyncio.all_tasks())
+        if label == "wait_for":
+            def make_check(user):
+                def check(m):
+                    return m.author == user and isinstance(m.channel, discord.DMChannel)
+                return check
+            pending = [asyncio.create_task(bot.wait_for("message", check=make_check(user), timeout=300)) for user in users]
+        else:
+            pending = [asyncio.create_task(inbox.wait_for_reply(user, timeout=300)) for user in users]
+        await asyncio.sleep(0)
+        baseline += len(pending)
+
+        # Discussion dans le salon : aucune attente ne correspond
+        t0 = time.perf_counter()
+        for i in range(chatter):
+            bot.receive(talker, f"gg {i}", channel)
+        await drain(baseline)
+        per_message = (time.perf_counter() - t0) / chatter
+
+        # Chaque utilisateur répond en DM
+        t0 = time.perf_counter()
+        for user in users:
+            bot.receive(user, "monrcon", user.dm_channel)
+        replies = await asyncio.gather(*pending)
+        answered = time.perf_counter() - t0
+    assert all(reply.content == "monrcon" for reply in replies)
+    print(f"{label:<9} {waiters:>6} attentes | message de salon : {per_message * 1e6:8.1f} µs | "
+          f"{waiters} réponses DM livrées en {answered * 1000:8.1f} ms")
+    return per_message
+
+async def main(chatter, counts):
+    for waiters in counts:
+        before = await run("wait_for", waiters, chatter)
+        after = await run("DMInbox", waiters, chatter)
+        print(f"{'':<9} {'':>6}            → coût par message divisé par {before / after:.1f}")
+
+if __name__ == "__main__":
+    chatter = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    asyncio.run(main(chatter, [int(n) for n in sys.argv[2:]] or [10, 1000, 5000]))
@@ -0,0 +1,64 @@
+"""Compare une session aiohttp par appel (ancien code) au ServemeClient partagé.
+
+Le créneau est retiré du cache avant chaque recherche du client partagé, et son
+planificateur est réglé sans limite : on mesure les requêtes HTTP sur le pool de
+connexions, pas le cache ni le débit autorisé.
+
+Usage : python benchmarks/bench_http_pool.py [nombre_de_reserve]
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SERVEME_API_KEY", "bench")
+
+import aiohttp
+from stub_serveme import StubServeme
+from ratelimit import RequestScheduler
+from utils import ServemeClient
+
+START = "2025-05-05T20:00:00+02:00"
+END = "2025-05-05T22:00:00+02:00"
+
+async def per_call_search(base_url):
+    """Reproduit l'ancien find_servers : deux sessions neuves, donc deux connexions."""
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10)) as session:
+        async with session.get(f"{base_url}/new?api_key=bench") as resp:
+            prefilled = await resp.json()
+    payload = {"reservation": {"starts_at": START, "ends_at": END}}
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10)) as session:
+        async with session.post(f"{prefilled['actions']['find_servers']}?api_key=bench", json=payload) as resp:
+            return await resp.json()
+
+async def timed(label, n, call):
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        await call()
+        samples.append(time.perf_counter() - t0)
+    samples.sort()
+    mean = sum(samples) / n
+    print(f"{label:<12} moyenne {mean * 1000:7.2f} ms | p50 {samples[n // 2] * 1000:7.2f} ms | p95 {samples[int(n * 0.95)] * 1000:7.2f} ms")
+    return mean
+
+async def main(n):
+    stub = await StubServeme().start()
+    client = ServemeClient(api_key="bench", base_url=stub.base_url, scheduler=RequestScheduler(rate=1e6, burst=10 ** 6))
+
+    async def pooled_search():
+        client.invalidate_slot(START, END)
+        return await client.find_servers(START, END)
+
+    try:
+        before = await timed("par appel", n, lambda: per_call_search(stub.base_url))
+        requests = stub.requests
+        after = await timed("pool", n, pooled_search)
+        print(f"Gain : x{before / after:.1f} sur {n} recherches ({stub.requests - requests} requêtes HTTP côté pool)")
+    finally:
+        await client.close()
+        await stub.stop()
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
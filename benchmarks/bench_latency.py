@@ -0,0 +1,77 @@
+"""Classement des serveurs par latence mesurée, sur des écouteurs locaux (loopback).
+
+Chaque « serveur » répond à A2S_INFO après un délai simulé ; l'un ne répond qu'en TCP
+(repli), un autre jamais. On compare l'ordre obtenu par LatencyProber à l'ordre attendu
+et à l'ancien tri (nom de groupe, puis id).
+
+Usage : python benchmarks/bench_latency.py [nombre_de_serveurs]
+"""
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from latency import LatencyProber
+
+class DelayedA2S(asyncio.DatagramProtocol):
+    """Répond à toute requête UDP après `delay` secondes, comme un srcds plus ou moins lointain."""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        asyncio.get_running_loop().call_later(self.delay, self.transport.sendto, b"\xFF\xFF\xFF\xFFA\x00\x00\x00\x00", addr)
+
+async def udp_server(delay):
+    transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(lambda: DelayedA2S(delay), local_addr=("127.0.0.1", 0))
+    return transport, transport.get_extra_info("sockname")[1]
+
+async def main(n):
+    random.seed(1)
+    delays = random.sample(range(1, 200), n)
+    closers = []
+    addresses = {}
+    for i, delay in enumerate(delays):
+        transport, port = await udp_server(delay / 1000)
+        closers.append(transport.close)
+        addresses[f"127.0.0.1:{port}"] = (f"Groupe{i:02d}", delay)
+
+    # Serveur joignable seulement en TCP : l'UDP est fermé (ICMP), on se rabat sur le port RCON
+    tcp = await asyncio.start_server(lambda r, w: w.close(), "127.0.0.1", 0)
+    tcp_port = tcp.sockets[0].getsockname()[1]
+    addresses[f"127.0.0.1:{tcp_port}"] = ("GroupeTCP", None)
+    # Serveur muet : UDP ouvert mais sans réponse, pas de TCP
+    silent, silent_port = await udp_server(3600)
+    closers.append(silent.close)
+    addresses[f"127.0.0.1:{silent_port}"] = ("GroupeMuet", None)
+
+    prober = LatencyProber(timeout=0.5)
+    prober.track(addresses)
+    await prober.close()  # tournées lancées à la main plutôt que par la tâche de fond
+    for _ in range(3):
+        t0 = time.perf_counter()
+        await prober.probe_all()
+        elapsed = time.perf_counter() - t0
+
+    ranked = sorted(addresses, key=prober.sort_key)
+    expected = sorted((a for a, (_, d) in addresses.items() if d is not None), key=lambda a: addresses[a][1])
+    measured = [a for a in ranked if addresses[a][1] is not None]
+    inversions = sum(1 for x, y in zip(measured, measured[1:]) if addresses[x][1] > addresses[y][1])
+    print(f"{len(addresses)} serveurs sondés en {elapsed * 1000:.0f} ms (tournée complète)")
+    print(f"Top 5 par latence : " + ", ".join(f"{addresses[a][0]} ({prober.latency(a):.0f} ms)" for a in ranked[:5]))
+    print(f"Top 5 ancien tri  : " + ", ".join(f"{addresses[a][0]} ({addresses[a][1]} ms)" for a in sorted(addresses, key=lambda a: addresses[a][0])[:5] if addresses[a][1]))
+    print(f"Inversions d'ordre : {inversions} / {len(measured) - 1} | meilleur attendu en tête : {measured[0] == expected[0]}")
+    print(f"GroupeTCP : {prober.sort_key(f'127.0.0.1:{tcp_port}')} | GroupeMuet : {prober.sort_key(f'127.0.0.1:{silent_port}')}")
+
+    for close in closers:
+        close()
+    tcp.close()
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 30))
@@ -0,0 +1,100 @@
+"""Appels HTTP Discord par `!reserve` : un message par changement d'état vs LiveMessage.
+
+Joue la vraie commande `!reserve` (API serveme.tf simulée en local, HTTP Discord simulé)
+pour plusieurs utilisateurs en même temps, avec mot de passe personnalisé pour passer
+par la demande de RCON en DM. Les choix dans les menus arrivent après un délai humain.
+Dans le mode « message par étape », chaque mise à jour de statut part comme un message
+à part, comme avant ; sinon elles sont regroupées sur un seul message modifié.
+
+Usage : python benchmarks/bench_live_message.py [utilisateurs] [rtt_ms]
+"""
+import asyncio
+import os
+import random
+import sys
+import time
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SERVEME_API_KEY", "bench")
+
+import live_message
+from fake_discord import FakeHTTP, FakeChannel, FakeUser, human_clicks
+from stub_serveme import StubServeme
+from utils import ServemeClient
+from store import ReservationStore
+from latency import LatencyProber
+from commands import reservation
+
+class SendPerUpdate(live_message.LiveMessage):
+    """Référence : chaque mise à jour part immédiatement comme un nouveau message."""
+
+    def update(self, **fields):
+        self._state.update(fields)
+        asyncio.create_task(self.destination.send(**self._state))
+
+    async def flush(self):
+        pass
+
+    async def respond(self, interaction):
+        await interaction.response.edit_message(**self._state)
+
+    async def close(self, **fields):
+        self._state.update(fields)
+        await self.destination.send(**self._state)
+
+async def run(label, live_class, users, rtt):
+    random.seed(1)
+    http = FakeHTTP(rtt)
+    stub = await StubServeme(servers=[
+        {"id": i, "name": f"{['FishServ', 'NewBrigade', 'Qixalite'][i % 3]} #{i} (Paris)", "ip_and_port": f"127.0.0.1:{40000 + i}"}
+        for i in range(1, 3 * users + 1)
+    ]).start()
+    bot = types.SimpleNamespace(
+        serveme=ServemeClient("bench", stub.base_url), reservations=ReservationStore(":memory:"), latency_prober=LatencyProber()
+    )
+    bot.loop = asyncio.get_running_loop()
+
+    async def wait_for_reply(user, timeout=None):
+        await asyncio.sleep(random.uniform(1.0, 2.0))  # l'utilisateur tape son RCON en DM
+        return types.SimpleNamespace(content="monrcon")
+
+    async def wait_until_ready():
+        await asyncio.Event().wait()  # tâches de fond du cog jamais lancées
+
+    bot.dm_inbox = types.SimpleNamespace(wait_for_reply=wait_for_reply)
+    bot.wait_until_ready = wait_until_ready
+    reservation.LiveMessage = live_class
+    restore = human_clicks(http)
+    cog = reservation.ReservationCommands(bot)
+    channel = FakeChannel(http)
+    contexts = [
+        types.SimpleNamespace(guild=object(), author=FakeUser(http, i), channel=channel, send=channel.send)
+        for i in range(users)
+    ]
+    try:
+        t0 = time.perf_counter()
+        await asyncio.gather(*(
+            reservation.ReservationCommands.reserve.callback(cog, ctx, args="21:00 monmotdepasse") for ctx in contexts
+        ))
+        elapsed = time.perf_counter() - t0
+        await asyncio.sleep(rtt * 3)  # derniers envois de la référence
+    finally:
+        restore()
+        cog.cog_unload()
+        await bot.latency_prober.close()
+        await bot.serveme.close()
+        await stub.stop()
+    channel_calls = http.calls["send"] + http.calls["edit"] + http.calls["delete"]
+    print(f"{label:<20} {len(bot.reservations)}/{users} réservations en {elapsed:4.1f} s | par réservation : "
+          f"{channel_calls / users:4.1f} appels salon ({http.calls['send'] / users:.1f} envois, {http.calls['edit'] / users:.1f} modifs), "
+          f"{http.calls['interaction'] / users:.1f} réponses d'interaction, {http.calls['dm'] / users:.1f} DM")
+    return channel_calls
+
+async def main(users, rtt):
+    before = await run("message par étape", SendPerUpdate, users, rtt)
+    after = await run("LiveMessage", live_message.LiveMessage, users, rtt)
+    print(f"Appels salon divisés par {before / after:.1f}")
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20, float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.1))
@@ -0,0 +1,190 @@
+"""Test de charge hors ligne : N utilisateurs qui réservent, listent, changent de carte et terminent.
+
+Les extensions `commands.reservation` et `commands.utility` sont chargées dans un vrai
+`commands.Bot` jamais connecté : les messages arrivent par un faux Discord
+(fake_discord, via `bot.dispatch`), l'API serveme.tf est simulée en local
+(stub_serveme) et chaque serveur de jeu est un faux serveur RCON (fake_rcon). Chaque
+utilisateur joue `SCRIPT` avec des temps de réflexion humains (menus, RCON tapé en DM) ;
+les arrivées sont étalées sur la durée de montée. Une montée plus courte que ce que
+permet `API_RATE` fait apparaître le délestage du planificateur (réservations refusées).
+
+Rapport : débit, latence par commande vue de l'utilisateur (p50/p95/p99), durées côté
+bot relevées par `metrics`, retard de la boucle d'événements (avec la pile du dernier
+blocage vu par le LoopWatchdog), mémoire et tâches restantes, plus les réponses
+d'erreur et les messages que Discord refuserait.
+
+Usage : python benchmarks/bench_load.py [utilisateurs] [montée_s] [rtt_ms]
+"""
+import asyncio
+import collections
+import logging
+import os
+import random
+import resource
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SERVEME_API_KEY", "bench")
+
+import metrics
+from config import Config
+from fake_discord import FakeBot, FakeChannel, FakeGuild, FakeHTTP, FakeUser, human_clicks
+from fake_rcon import FakeRconServer
+from stub_serveme import StubServeme
+from utils import ServemeClient
+from rcon_pool import RconPool
+from latency import LatencyProber
+from status import StatusPoller
+from store import ReservationStore
+from loop_watchdog import LoopWatchdog
+from dm_inbox import DMInbox
+
+# Scénario joué par chaque utilisateur, dans l'ordre
+SCRIPT = ["!reserve now {password}", "!list", "!changelevel {reservation_id}", "!connect", "!end {reservation_id}"]
+THINK_TIME = (0.5, 1.5)  # entre deux commandes
+DM_TIME = (1.0, 2.0)  # pour taper le RCON en DM
+COMMAND_TIMEOUT = 60
+
+def percentiles(values):
+    if len(values) < 2:
+        return (values[0],) * 3 if values else (0.0,) * 3
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return cuts[49], cuts[94], cuts[98]
+
+async def sample_lag(samples, interval=0.005):
+    """Retard de réveil d'un sleep court : temps pendant lequel la boucle était occupée."""
+    loop = asyncio.get_running_loop()
+    while True:
+        t0 = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(loop.time() - t0 - interval)
+
+async def main(users, ramp, rtt):
+    random.seed(1)
+    http = FakeHTTP(rtt)
+    game_servers = [await FakeRconServer(password=Config.DEFAULT_RCON, latency=0.005).start() for _ in range(min(users, 60))]
+    stub = await StubServeme(servers=[
+        {"id": i + 1, "name": f"{['FishServ', 'NewBrigade', 'Qixalite'][i % 3]} #{i + 1} (Paris)",
+         "ip_and_port": f"{server.host}:{server.port}"}
+        for i, server in enumerate(game_servers)
+    ]).start()
+
+    bot = FakeBot(http)
+    bot.serveme = ServemeClient("bench", stub.base_url)
+    bot.rcon_pool = RconPool()
+    bot.latency_prober = LatencyProber()
+    bot.reservations = ReservationStore(":memory:")
+    bot.status_poller = StatusPoller(bot.rcon_pool, bot.reservations)
+    bot.dm_inbox = DMInbox()
+    bot.add_listener(bot.dm_inbox.on_message)
+    channel = FakeChannel(http, FakeGuild())
+    bot.channels[channel.id] = channel
+
+    durations = collections.defaultdict(list)
+    failures = collections.Counter()
+    waiting = {}
+
+    @bot.after_invoke
+    async def command_done(ctx):
+        if ctx.author.id in waiting:
+            waiting.pop(ctx.author.id).set_result(None)
+
+    @bot.event
+    async def on_command_error(ctx, error):
+        failures[ctx.invoked_with] += 1
+        if ctx.author.id in waiting:
+            waiting.pop(ctx.author.id).set_result(None)
+
+    @bot.event
+    async def on_error(event, *args, **kwargs):
+        logging.exception(f"Exception non gérée dans {event}")
+        message = args[0] if args else None
+        failures["(événement)"] += 1
+        if message is not None and message.author.id in waiting:
+            waiting.pop(message.author.id).set_result(None)
+
+    def on_dm(user, content):
+        if content and "mot de passe RCON" in content:
+            asyncio.get_running_loop().call_later(
+                random.uniform(*DM_TIME), bot.receive, user, Config.DEFAULT_RCON, user.dm_channel
+            )
+
+    async def play(user, delay):
+        await asyncio.sleep(delay)
+        for line in SCRIPT:
+            command = line.split()[0][1:]
+            done = waiting[user.id] = asyncio.get_running_loop().create_future()
+            t0 = time.perf_counter()
+            own = next(iter(bot.reservations.by_creator(user.id)), None)
+            bot.receive(user, line.format(password=f"pw{user.id}", reservation_id=own and own.reservation_id), channel)
+            try:
+                await asyncio.wait_for(done, COMMAND_TIMEOUT)
+            except asyncio.TimeoutError:
+                failures[command] += 1
+                waiting.pop(user.id, None)
+            durations[command].append(time.perf_counter() - t0)
+            if command == "reserve" and not bot.reservations.by_creator(user.id):
+                failures[command] += 1  # refusée (file serveme.tf pleine, erreur API...) : l'utilisateur abandonne
+                return
+            await asyncio.sleep(random.uniform(*THINK_TIME))
+
+    lag = []
+    restore = human_clicks(http)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    async with bot:
+        await bot.load_extension("commands.reservation")
+        await bot.load_extension("commands.utility")
+        bot.status_poller.start()
+        sampler = asyncio.create_task(sample_lag(lag))
+        watchdog = LoopWatchdog()
+        watchdog.start()
+        try:
+            t0 = time.perf_counter()
+            await asyncio.gather(*(
+                play(FakeUser(http, i + 1, on_dm), ramp * i / users) for i in range(users)
+            ))
+            elapsed = time.perf_counter() - t0
+        finally:
+            sampler.cancel()
+            await watchdog.close()
+            restore()
+            await bot.status_poller.close()
+            await bot.latency_prober.close()
+            await bot.rcon_pool.close()
+            await bot.serveme.close()
+    await stub.stop()
+    for server in game_servers:
+        await server.stop()
+    await asyncio.sleep(0.1)
+    leftover = len(asyncio.all_tasks()) - 1  # tâches survivant à l'arrêt du bot, hors main
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    completed = sum(len(values) for values in durations.values())
+    print(f"{users} utilisateurs, {completed} commandes en {elapsed:.1f} s ({completed / elapsed:.1f} commandes/s), "
+          f"{len(game_servers)} serveurs, RTT Discord {rtt * 1000:.0f} ms")
+    print(f"{'commande':<12} {'p50':>8} {'p95':>8} {'p99':>8} {'échecs':>7}   (vu de l'utilisateur, réflexion comprise)")
+    for command, values in durations.items():
+        p50, p95, p99 = percentiles(values)
+        print(f"{command:<12} {p50 * 1000:6.0f}ms {p95 * 1000:6.0f}ms {p99 * 1000:6.0f}ms {failures[command]:7d}")
+    print("Côté bot (metrics) :")
+    for (name, labels), stats in sorted(metrics.REGISTRY.snapshot().items()):
+        if name in ("serveme_request_seconds", "rcon_command_seconds", "reserve_stage_seconds", "command_seconds"):
+            label = ",".join(str(value) for _, value in labels)
+            print(f"  {name}{{{label}}} : {stats['count']} mesures, p50 {stats['p50'] * 1000:.1f} ms, p99 {stats['p99'] * 1000:.1f} ms")
+    p50, _, p99 = percentiles(lag)
+    print(f"Retard de la boucle : p50 {p50 * 1000:.2f} ms, p99 {p99 * 1000:.2f} ms, max {max(lag) * 1000:.1f} ms, "
+          f"{watchdog.stalls} blocage(s) > {watchdog.threshold * 1000:.0f} ms")
+    if watchdog.last_stack:
+        print("Dernier blocage :\n" + "\n".join(watchdog.last_stack.splitlines()[-6:]))
+    print(f"Mémoire (pic RSS) : {rss_after / 1024:.0f} Mo (+{(rss_after - rss_before) / 1024:.0f} Mo pendant le test), "
+          f"tâches restantes : {leftover}")
+    print(f"Appels Discord : {dict(http.calls)}, réponses d'erreur : {http.errors}, refusés par Discord : {http.invalid}")
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 100,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 120.0,
+        float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.05
+    ))
@@ -0,0 +1,44 @@
+"""Coût de l'instrumentation : observe/timer par appel et rendu de /metrics.
+
+Compare un appel RCON simulé nu et le même appel mesuré par `metrics.timer`, pour
+vérifier que les histogrammes restent négligeables sur les chemins chauds.
+
+Usage : python benchmarks/bench_metrics.py [appels]
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import Registry
+
+def main(calls):
+    registry = Registry()
+    commands = ["status", "changelevel", "exec", "echo", "autre"]
+    values = [random.lognormvariate(-4, 1.5) for _ in range(1000)]
+
+    def bare():
+        pass
+
+    def timed():
+        with registry.timer("rcon_command_seconds", command="status"):
+            pass
+
+    def observe():
+        registry.observe("rcon_command_seconds", values[calls % 1000], command=commands[calls % 5])
+
+    for label, fn in (("appel nu", bare), ("metrics.observe", observe), ("metrics.timer", timed)):
+        seconds = timeit.timeit(fn, number=calls)
+        print(f"{label:<16} {seconds / calls * 1e9:7.0f} ns/appel")
+
+    for i in range(calls):
+        registry.observe("discord_request_seconds", values[i % 1000], method="POST", route=f"/route/{i % 20}")
+    seconds = timeit.timeit(registry.render, number=20) / 20
+    print(f"rendu /metrics    {seconds * 1000:7.2f} ms pour {len(registry.histograms)} histogrammes")
+    p = registry.snapshot()[("discord_request_seconds", (("method", "POST"), ("route", "/route/0")))]
+    print(f"p50/p95/p99 estimés : {p['p50'] * 1000:.1f} / {p['p95'] * 1000:.1f} / {p['p99'] * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
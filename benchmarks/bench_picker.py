@@ -0,0 +1,92 @@
+"""Sélecteur à réactions vs menu déroulant discord.ui, avec HTTP Discord simulé.
+
+Compte les appels HTTP par sélection et mesure le délai avant que la première option
+soit cliquable (message envoyé, réaction visible et écoute en place), pour un choix
+parmi 10 options.
+
+Usage : python benchmarks/bench_picker.py
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from picker import pick_option
+
+RTT = 0.06  # aller-retour HTTP vers Discord
+BUCKET_INTERVAL = 0.25  # une réaction par 250 ms et par salon (bucket Discord)
+EMOJIS = ['🇦', '🇧', '🇨', '🇩', '🇪', '🇫', '🇬', '🇭', '🇮', '🇯']
+OPTIONS = [f"option {i}" for i in range(len(EMOJIS))]
+
+class FakeHTTP:
+    """Compte les appels ; les réactions sont espacées d'au moins BUCKET_INTERVAL."""
+
+    def __init__(self):
+        self.calls = 0
+        self.first_clickable = None
+        self.started = time.perf_counter()
+        self._next_reaction = 0.0
+        self._lock = asyncio.Lock()
+
+    async def request(self):
+        await asyncio.sleep(RTT)
+        self.calls += 1
+
+    async def reaction(self):
+        async with self._lock:
+            now = time.perf_counter()
+            wait = max(0.0, self._next_reaction - now)
+            self._next_reaction = now + wait + BUCKET_INTERVAL
+        await asyncio.sleep(wait)
+        await self.request()
+
+    def clickable(self):
+        if self.first_clickable is None:
+            self.first_clickable = time.perf_counter() - self.started
+
+class FakeMessage:
+    def __init__(self, http):
+        self.http = http
+
+    async def add_reaction(self, emoji):
+        await self.http.reaction()
+        self.http.clickable()
+
+    async def edit(self, **kwargs):
+        await self.http.request()
+
+class FakeChannel:
+    """Destination de pick_option : l'utilisateur choisit dès que le menu est affiché."""
+
+    def __init__(self, http):
+        self.http = http
+
+    async def send(self, embed=None, view=None):
+        await self.http.request()
+        if view is not None:
+            self.http.clickable()
+            asyncio.get_running_loop().call_soon(view.choose, OPTIONS[0])
+        return FakeMessage(self.http)
+
+async def reaction_picker(http):
+    """Ancien sélecteur : un message puis une réaction par option."""
+    msg = await FakeChannel(http).send()
+    for emoji in EMOJIS:
+        await msg.add_reaction(emoji)
+    return OPTIONS[0]
+
+async def run(label, picker):
+    http = FakeHTTP()
+    choice = await picker(http)
+    elapsed = time.perf_counter() - http.started
+    print(f"{label:<12} première option cliquable {http.first_clickable * 1000:6.0f} ms | "
+          f"toutes les options {elapsed * 1000:6.0f} ms | appels HTTP {http.calls:2d} | choix {choice!r}")
+
+async def main():
+    await run("réactions", reaction_picker)
+    await run("discord.ui", lambda http: pick_option(FakeChannel(http), None, "Choisir", OPTIONS))
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,79 @@
+"""Rafale de !reserve contre un faux serveme.tf limité à LIMIT requêtes/s.
+
+Compare un client sans planification (ni file ni nouvelle tentative) au RequestScheduler :
+requêtes abouties, 429 reçus, latence des fins de réservation (prioritaires) et des
+recherches, profondeur de file et attente.
+
+Usage : python benchmarks/bench_ratelimit.py [recherches] [fins]
+"""
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SERVEME_API_KEY", "bench")
+
+from config import Config
+from ratelimit import RequestScheduler
+from stub_serveme import StubServeme
+from utils import ServemeClient
+
+LIMIT = 5
+
+async def burst(client, searches, ends):
+    base = datetime(2030, 1, 1, 20, tzinfo=Config.TIMEZONE)
+    await client.get_prefilled_reservation()
+    latencies = {"search": [], "end": []}
+    failures = 0
+
+    async def search(i):
+        start = base + timedelta(minutes=i)
+        await client.find_servers(start.isoformat(), (start + Config.RESERVATION_DURATION).isoformat())
+
+    async def end(i):
+        _, status = await client.end_reservation(i)
+        if status >= 400:
+            raise Exception(f"HTTP {status}")
+
+    async def timed(kind, coro):
+        nonlocal failures
+        t0 = time.perf_counter()
+        try:
+            await coro
+            latencies[kind].append(time.perf_counter() - t0)
+        except Exception:
+            failures += 1
+
+    # Les fins arrivent après la rafale de recherches : la priorité doit les faire passer devant
+    jobs = [timed("search", search(i)) for i in range(searches)] + [timed("end", end(i)) for i in range(ends)]
+    t0 = time.perf_counter()
+    await asyncio.gather(*jobs)
+    return time.perf_counter() - t0, latencies, failures
+
+def avg(values):
+    return sum(values) / len(values) * 1000 if values else float("nan")
+
+async def run(label, scheduler, retries, searches, ends):
+    Config.API_MAX_RETRIES = retries
+    stub = await StubServeme(rate_limit=LIMIT).start()
+    client = ServemeClient(api_key="bench", base_url=stub.base_url, scheduler=scheduler)
+    try:
+        elapsed, latencies, failures = await burst(client, searches, ends)
+        print(f"{label}: {elapsed:5.2f} s | échecs {failures:3d} | 429 reçus {stub.rejected:3d} | "
+              f"fin moy. {avg(latencies['end']):7.1f} ms | recherche moy. {avg(latencies['search']):7.1f} ms")
+        print(f"  métriques : {client.scheduler.metrics()}")
+    finally:
+        await client.close()
+        await stub.stop()
+
+async def main(searches, ends):
+    await run("sans planificateur", RequestScheduler(rate=1e9, burst=10**9, max_queue=10**9), 0, searches, ends)
+    await run("RequestScheduler  ", RequestScheduler(rate=LIMIT, burst=LIMIT, max_queue=200), 3, searches, ends)
+    # Débit configuré trop haut : les en-têtes RateLimit-* et Retry-After doivent rattraper l'erreur
+    await run("débit surestimé   ", RequestScheduler(rate=4 * LIMIT, burst=4 * LIMIT, max_queue=200), 3, searches, ends)
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    asyncio.run(main(*(args or [30, 6])))
@@ -0,0 +1,76 @@
+"""Commande RCON sur toutes les réservations actives : un `!exec` après l'autre vs `!rconall`.
+
+50 faux serveurs RCON locaux (latence réseau et coût du login simulés), dont un qui ne
+répond plus pour vérifier que le délai par serveur borne la commande entière.
+
+Usage : python benchmarks/bench_rcon_fanout.py [nombre_de_serveurs]
+"""
+import asyncio
+import os
+import sys
+import time
+import types
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_rcon import FakeRconServer
+from config import Config
+from rcon_client import AsyncRconClient
+from rcon_pool import RconPool
+from store import Reservation, ReservationStore
+from commands.utility import UtilityCommands
+
+async def per_command(ip, port, password, command, *args):
+    """Une connexion authentifiée neuve par commande, comme un `!exec` isolé."""
+    client = await AsyncRconClient(ip, port, password).connect()
+    try:
+        return await client.run(command, *args)
+    finally:
+        await client.close()
+
+async def silent(reader, writer):
+    """Accepte la connexion mais ne répond jamais (serveur planté)."""
+    await reader.read()
+    writer.close()
+
+async def main(n):
+    servers = [await FakeRconServer(latency=0.02, auth_delay=0.01).start() for _ in range(n - 1)]
+    stuck_server = await asyncio.start_server(silent, "127.0.0.1", 0)
+    stuck = types.SimpleNamespace(host="127.0.0.1", port=stuck_server.sockets[0].getsockname()[1], password="fishrcon")
+    store = ReservationStore(":memory:")
+    now = datetime.now(Config.TIMEZONE)
+    for i, server in enumerate(servers + [stuck]):
+        store.add(Reservation(
+            reservation_id=i + 1, start=now, end=now + Config.RESERVATION_DURATION,
+            server_name=f"FishServ #{i + 1} (Paris)", ip_and_port=f"{server.host}:{server.port}",
+            password="fish", rcon=server.password, creator_id=i, creator_name=f"user{i}", channel_id=1
+        ))
+    pool = RconPool()
+    cog = UtilityCommands(types.SimpleNamespace(rcon_pool=pool, reservations=store))
+    active = store.active(now.timestamp())
+    healthy = active[:-1]
+    try:
+        t0 = time.perf_counter()
+        for server in servers:
+            await per_command(server.host, server.port, server.password, "exec", "etf2l_6v6_5cp")
+        sequential = time.perf_counter() - t0
+        print(f"{len(servers)} !exec successifs (hors serveur bloqué) : {sequential * 1000:7.0f} ms")
+
+        runs = [("rconall (à froid)", healthy), ("rconall (pool chaud)", healthy), ("rconall + serveur bloqué", active)]
+        for label, targets in runs:
+            t0 = time.perf_counter()
+            results = await cog.fan_out_rcon(targets, "exec", "etf2l_6v6_5cp")
+            elapsed = time.perf_counter() - t0
+            failures = [res.reservation_id for res, result in results if isinstance(result, Exception)]
+            print(f"{label:<25} {len(results)} serveurs : {elapsed * 1000:7.0f} ms | échecs {failures} "
+                  f"(délai {Config.RCON_FANOUT_TIMEOUT:g} s, {Config.RCON_FANOUT_CONCURRENCY} en parallèle)")
+    finally:
+        await pool.close()
+        store.close()
+        for server in servers:
+            await server.stop()
+        stuck_server.close()
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 50))
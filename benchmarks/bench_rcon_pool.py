@@ -0,0 +1,50 @@
+"""Latence par commande RCON : connexion + login par commande vs RconPool.
+
+Usage : python benchmarks/bench_rcon_pool.py [nombre_de_commandes]
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_rcon import FakeRconServer
+from rcon_client import AsyncRconClient
+from rcon_pool import RconPool
+
+async def per_command(ip, port, password, command, *args):
+    """Une connexion authentifiée neuve par commande, comme l'ancien run_rcon_command."""
+    client = await AsyncRconClient(ip, port, password).connect()
+    try:
+        return await client.run(command, *args)
+    finally:
+        await client.close()
+
+async def timed(label, n, call):
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        await call()
+        samples.append(time.perf_counter() - t0)
+    samples.sort()
+    mean = sum(samples) / n
+    print(f"{label:<12} moyenne {mean * 1000:7.2f} ms | p50 {samples[n // 2] * 1000:7.2f} ms | p95 {samples[int(n * 0.95)] * 1000:7.2f} ms")
+    return mean
+
+async def main(n):
+    # auth_delay simule le coût du login srcds, payé une fois par connexion
+    server = await FakeRconServer(auth_delay=0.005).start()
+    pool = RconPool()
+    try:
+        # Réponse en plusieurs paquets réassemblée correctement
+        assert len(await pool.run(server.host, server.port, server.password, "big", "20000")) == 20000
+        before = await timed("par commande", n, lambda: per_command(server.host, server.port, server.password, "exec", "etf2l_6v6_5cp"))
+        after = await timed("pool", n, lambda: pool.run(server.host, server.port, server.password, "exec", "etf2l_6v6_5cp"))
+        print(f"Gain : x{before / after:.1f} | connexions ouvertes : {server.connections} | logins : {server.auths}")
+    finally:
+        await pool.close()
+        await server.stop()
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
@@ -0,0 +1,111 @@
+"""Base des réservations partagée entre plusieurs processus (déploiement en shards).
+
+1. Notification une seule fois : N processus programment tous les mêmes notifications
+   et se les disputent avec `claim_notification` au même instant ; chaque réservation
+   doit être gagnée par exactement un processus.
+2. Visibilité : délai entre l'écriture d'une réservation par un processus et sa lecture
+   par un autre, et coût d'une lecture en mode partagé (`PRAGMA data_version`).
+3. Relais des DM : un DM déposé par le shard 0 et relevé par un autre processus.
+
+Usage : python benchmarks/bench_shared_store.py [processus] [réservations]
+"""
+import asyncio
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from store import Reservation, ReservationStore
+
+def make_reservation(reservation_id, creator_id=1):
+    start = datetime.now().astimezone() + timedelta(minutes=5)
+    return Reservation(
+        reservation_id, start, start + timedelta(hours=2), f"Serveur #{reservation_id}", f"10.0.0.{reservation_id % 250}:27015",
+        "pw", "rcon", creator_id, f"user{creator_id}", channel_id=1, notify_pending=True
+    )
+
+def claim_all(path, ids, barrier, results):
+    store = ReservationStore(path, shared=True)
+    ids = list(ids)
+    random.shuffle(ids)
+    barrier.wait()
+
+    async def claim():
+        # Comme le bot : un verrou tenu par un autre processus est attendu sans bloquer la boucle
+        return [reservation_id for reservation_id in ids
+                if await store.retry_locked(store.claim_notification, reservation_id)]
+
+    results.put(asyncio.run(claim()))
+    store.close()
+
+def race(path, processes, count):
+    writer = ReservationStore(path, shared=True)
+    ids = range(1, count + 1)
+    for reservation_id in ids:
+        writer.add(make_reservation(reservation_id))
+    barrier = multiprocessing.Barrier(processes)
+    results = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=claim_all, args=(path, ids, barrier, results)) for _ in range(processes)]
+    t0 = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    won = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - t0
+    claimed = [reservation_id for wins in won for reservation_id in wins]
+    duplicates = len(claimed) - len(set(claimed))
+    print(f"{processes} processus, {count} notifications disputées en {elapsed * 1000:.0f} ms : "
+          f"{len(set(claimed))} envoyées, {duplicates} en double, {count - len(set(claimed))} perdues "
+          f"(répartition {[len(wins) for wins in won]})")
+    assert sorted(claimed) == list(ids)
+    print(f"  vu par le processus d'origine : {sum(r.notify_pending for r in writer.all())} encore en attente")
+    writer.close()
+
+def visibility(path, rounds=200):
+    writer = ReservationStore(path, shared=True)
+    reader = ReservationStore(path, shared=True)
+    delays = []
+    for i in range(rounds):
+        reservation_id = 100000 + i
+        t0 = time.perf_counter()
+        writer.add(make_reservation(reservation_id, creator_id=2))
+        while reader.get(reservation_id) is None:
+            pass
+        delays.append(time.perf_counter() - t0)
+    delays.sort()
+    print(f"Écriture visible dans l'autre connexion : médiane {delays[len(delays) // 2] * 1e6:.0f} µs, "
+          f"max {delays[-1] * 1e6:.0f} µs ({len(reader)} réservations rechargées)")
+
+    local = ReservationStore(path)
+    for label, store in (("local", local), ("partagé", reader)):
+        t0 = time.perf_counter()
+        for _ in range(20000):
+            store.by_creator(2)
+        print(f"  by_creator en mode {label:<7} : {(time.perf_counter() - t0) / 20000 * 1e6:.1f} µs par lecture sans écriture ailleurs")
+    for store in (writer, reader, local):
+        store.close()
+
+def relay(path):
+    shard0 = ReservationStore(path, shared=True)
+    other = ReservationStore(path, shared=True)
+    shard0.relay_dm(42, "monrcon")
+    shard0.relay_dm(43, "autre")
+    taken = other.take_relayed_dms([42])
+    print(f"DM relayé : {[(user_id, content) for user_id, content, _ in taken]} relevé, "
+          f"relevé suivant {other.take_relayed_dms([42])}, DM de 43 toujours en attente : {bool(shard0.take_relayed_dms([43]))}")
+    shard0.close()
+    other.close()
+
+if __name__ == "__main__":
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    with tempfile.TemporaryDirectory() as tmp:
+        race(os.path.join(tmp, "race.db"), processes, count)
+        visibility(os.path.join(tmp, "visibility.db"))
+        relay(os.path.join(tmp, "relay.db"))
@@ -0,0 +1,73 @@
+"""Relevé des statuts : un `status` RCON par commande vs le StatusPoller en lot.
+
+On simule des `!list` en rafale sur des réservations actives (faux serveurs RCON) et on
+compte les requêtes `status` reçues par les serveurs dans chaque cas.
+
+Usage : python benchmarks/bench_status.py [nombre_de_serveurs] [nombre_de_list]
+"""
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_rcon import FakeRconServer
+from config import Config
+from rcon_pool import RconPool
+from status import ServerStatus, StatusPoller
+from store import Reservation, ReservationStore
+
+async def main(n, lists):
+    servers = [await FakeRconServer(latency=0.01, players=i % 3 * 6).start() for i in range(n)]
+    store = ReservationStore(":memory:")
+    # Réservations ouvertes depuis 10 min (hors relevé rapide de l'ouverture)
+    start = datetime.now(Config.TIMEZONE) - timedelta(minutes=10)
+    for i, server in enumerate(servers):
+        store.add(Reservation(
+            reservation_id=i + 1, start=start, end=start + Config.RESERVATION_DURATION,
+            server_name=f"FishServ #{i + 1} (Paris)", ip_and_port=f"{server.host}:{server.port}",
+            password="fish", rcon=server.password, creator_id=i, creator_name=f"user{i}", channel_id=1
+        ))
+    pool = RconPool()
+    poller = StatusPoller(pool, store)
+    try:
+        t0 = time.perf_counter()
+        for _ in range(lists):
+            # Chaque !list interroge tous les serveurs (en parallèle) avant de répondre
+            outputs = await asyncio.gather(*(
+                pool.run(res.ip_and_port.partition(":")[0], int(res.ip_and_port.partition(":")[2]), res.rcon, "status")
+                for res in store.all()
+            ))
+            [ServerStatus.parse(output) for output in outputs]
+        direct = time.perf_counter() - t0
+        direct_polls = sum(server.commands.count("status") for server in servers)
+        print(f"Par commande : {lists} !list → {direct_polls} status, {direct / lists * 1000:6.1f} ms par !list")
+
+        for server in servers:
+            server.commands.clear()
+        # Une heure de relevé simulée tick par tick, pendant laquelle tombent les mêmes !list
+        now = time.time()
+        t0 = time.perf_counter()
+        for tick in range(0, 3600, Config.STATUS_TICK):
+            await poller.poll_due(now + tick)
+        polled = sum(server.commands.count("status") for server in servers)
+        t1 = time.perf_counter()
+        for _ in range(lists):
+            lines = [poller.get(res.reservation_id) for res in store.all()]
+        cached = (time.perf_counter() - t1) / lists
+        intervals = sorted({s.interval for s in poller._schedules.values()})
+        print(f"StatusPoller : 1 h de relevé → {polled} status ({polled / n:.0f} par serveur, intervalles {intervals} s), "
+              f"{cached * 1000:.3f} ms par !list, indépendant du nombre de !list")
+        print(f"Au-delà de {polled / n:.0f} !list par heure, le relevé en lot interroge moins les serveurs ; "
+              f"il ne fait jamais attendre la commande.")
+        print(f"Exemple : {lines[1].summary()} | {lines[0].summary()}")
+    finally:
+        await pool.close()
+        store.close()
+        for server in servers:
+            await server.stop()
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20, int(sys.argv[2]) if len(sys.argv) > 2 else 50))
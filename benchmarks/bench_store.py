@@ -0,0 +1,72 @@
+"""Micro-benchmarks : ancien dict user_id -> liste de dicts vs ReservationStore indexé.
+
+Usage : python benchmarks/bench_store.py [nombre_de_reservations]
+"""
+import os
+import random
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from store import Reservation, ReservationStore
+
+def synthetic(n):
+    now = datetime.now(Config.TIMEZONE)
+    for i in range(n):
+        start = now + timedelta(minutes=random.randint(-600, 600))
+        yield {
+            "reservation_id": 100000 + i,
+            "start": start,
+            "end": start + Config.RESERVATION_DURATION,
+            "server_name": f"FishServ #{i % 300} (Paris)",
+            "ip_and_port": f"10.0.{i % 300 // 250}.{i % 250}:27015",
+            "password": "fish",
+            "rcon": Config.DEFAULT_RCON,
+            "creator_id": i % 2000,
+            "creator_name": f"user{i % 2000}",
+        }
+
+def old_find(user_data, reservation_id=None, creator_id=None):
+    """Reproduit l'ancien find_reservation : liste aplatie reconstruite puis scan linéaire."""
+    reservations = []
+    for user_reservations in user_data.values():
+        reservations.extend([res for res in user_reservations if "reservation_id" in res])
+    if reservation_id is not None:
+        return next((res for res in reservations if res["reservation_id"] == reservation_id), None)
+    return next((res for res in reservations if res["creator_id"] == creator_id), None)
+
+def old_active(user_data, now):
+    """Ancien format : dates ISO réanalysées à chaque requête."""
+    return [
+        res for reservations in user_data.values() for res in reservations
+        if datetime.fromisoformat(res["start"]).astimezone(Config.TIMEZONE) <= now <= datetime.fromisoformat(res["end"]).astimezone(Config.TIMEZONE)
+    ]
+
+def report(label, old, new, number):
+    t_old = timeit.timeit(old, number=number) / number
+    t_new = timeit.timeit(new, number=number) / number
+    print(f"{label:<22} ancien {t_old * 1e6:10.1f} µs | store {t_new * 1e6:8.2f} µs | x{t_old / t_new:,.0f}")
+
+def main(n):
+    rows = list(synthetic(n))
+    user_data = {}
+    store = ReservationStore(":memory:")
+    for row in rows:
+        user_data.setdefault(row["creator_id"], []).append(dict(row, start=row["start"].isoformat(), end=row["end"].isoformat()))
+        store.add(Reservation(**row))
+    ids = [row["reservation_id"] for row in rows]
+    now = datetime.now(Config.TIMEZONE)
+
+    print(f"{n} réservations synthétiques")
+    report("par reservation_id", lambda: old_find(user_data, reservation_id=random.choice(ids)),
+           lambda: store.get(random.choice(ids)), 200)
+    report("par creator_id", lambda: old_find(user_data, creator_id=random.randrange(2000)),
+           lambda: store.by_creator(random.randrange(2000)), 200)
+    report("actives maintenant", lambda: old_active(user_data, now),
+           lambda: store.active(now.timestamp()), 20)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
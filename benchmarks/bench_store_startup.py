@@ -0,0 +1,49 @@
+"""Temps de redémarrage du ReservationStore selon la taille de l'historique SQLite.
+
+Usage : python benchmarks/bench_store_startup.py
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from store import COLUMNS, ReservationStore
+
+LIVE = 50
+
+def populate(path, history):
+    """Écrit `history` réservations passées (terminées ou expirées) et LIVE réservations à venir."""
+    ReservationStore(path).close()
+    now = int(time.time())
+    rows = []
+    for i in range(history):
+        start = now - 3600 * 24 - i * 600
+        rows.append((i, start, start + 7200, f"FishServ #{i % 300}", f"10.0.0.{i % 250}:27015",
+                     "fish", "fishrcon", i % 2000, f"user{i % 2000}", 1, 0, i % 2))
+    for j in range(LIVE):
+        i = history + j
+        start = now + 600 * j
+        rows.append((i, start, start + 7200, f"FishServ #{j}", f"10.0.1.{j}:27015",
+                     "fish", "fishrcon", j, f"user{j}", 1, 1, 0))
+    db = sqlite3.connect(path)
+    with db:
+        db.executemany(f"INSERT INTO reservations ({', '.join(COLUMNS)}, ended) VALUES ({', '.join('?' * (len(COLUMNS) + 1))})", rows)
+    db.close()
+
+def main():
+    for history in (1_000, 10_000, 100_000):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "reservations.db")
+            populate(path, history)
+            t0 = time.perf_counter()
+            store = ReservationStore(path)
+            elapsed = time.perf_counter() - t0
+            assert len(store) == LIVE
+            store.close()
+            print(f"{history:>7} lignes d'historique : démarrage {elapsed * 1000:6.2f} ms ({LIVE} réservations rechargées)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Coût et efficacité du LoopWatchdog.
+
+1. Surcoût : la même charge asyncio (beaucoup de petites tâches qui se passent la main)
+   avec et sans la sonde.
+2. Détection : un appel synchrone lent glissé dans une coroutine doit être signalé, avec
+   sa pile, pendant qu'il bloque encore la boucle.
+
+Usage : python benchmarks/bench_watchdog.py [tâches] [tours]
+"""
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loop_watchdog import LoopWatchdog
+
+RUNS = 31  # paires de mesures avec et sans sonde
+
+async def workload(tasks, rounds):
+    async def worker():
+        total = 0
+        for i in range(rounds):
+            total += sum(range(50))  # un peu de calcul entre deux passages de main
+            await asyncio.sleep(0)
+        return total
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(tasks)))
+    return time.perf_counter() - t0
+
+def slow_embed_build():
+    time.sleep(0.3)  # appel bloquant simulé (ex. gros parcours synchrone)
+
+async def handler():
+    slow_embed_build()
+
+async def main(tasks, rounds):
+    logging.basicConfig(level=logging.ERROR)
+    await workload(tasks, rounds // 10)  # chauffe
+    watchdog = LoopWatchdog()
+    bare, watched = [], []
+    for run in range(RUNS):
+        # Mesures entrelacées, ordre alterné à chaque paire : la dérive de la machine
+        # (fréquence CPU, autres processus) touche les deux côtés de la même façon
+        for watching in ((False, True) if run % 2 == 0 else (True, False)):
+            if watching:
+                watchdog.start()
+                watched.append(await workload(tasks, rounds))
+                await watchdog.close()
+                await asyncio.sleep(0)
+            else:
+                bare.append(await workload(tasks, rounds))
+    overheads = sorted(w / b - 1 for b, w in zip(bare, watched))
+    bare, watched = statistics.median(bare), statistics.median(watched)
+    watchdog.start()
+    print(f"Charge de {tasks * rounds} passages, médiane de {RUNS} paires : {bare * 1000:.0f} ms sans sonde, "
+          f"{watched * 1000:.0f} ms avec ({(watched / bare - 1) * 100:+.1f} %, écart par paire de "
+          f"{overheads[len(overheads) // 4] * 100:+.1f} % à {overheads[3 * len(overheads) // 4] * 100:+.1f} % entre quartiles)")
+
+    await asyncio.sleep(0.2)
+    await handler()
+    await asyncio.sleep(0.2)
+    await watchdog.close()
+    found = watchdog.last_stack is not None and "slow_embed_build" in watchdog.last_stack
+    print(f"Blocage de 300 ms : {watchdog.stalls} signalé(s), retard max {watchdog.max_lag * 1000:.0f} ms, "
+          f"pile capturée {'avec' if found else 'SANS'} l'appel fautif :")
+    print("\n".join((watchdog.last_stack or "").splitlines()[-4:]))
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 100, int(sys.argv[2]) if len(sys.argv) > 2 else 2000))
@@ -0,0 +1,160 @@
+"""Faux Discord (passerelle et HTTP), pour les benchmarks locaux.
+
+Chaque appel REST coûte un aller-retour simulé et est compté par type ; les messages
+entrants passent par le vrai `bot.dispatch`, donc par `on_message`, `get_context`,
+`invoke`, les écouteurs (dont la DMInbox) et les `wait_for` en attente, comme un
+événement de la passerelle.
+"""
+import asyncio
+import collections
+import itertools
+import random
+import types
+import discord
+from discord.ext import commands
+import picker
+
+# Limites Discord au-delà desquelles l'API répond 400
+EMBED_DESCRIPTION_LIMIT = 4096
+EMBED_TOTAL_LIMIT = 6000
+
+_ids = itertools.count(1)
+
+class FakeHTTP:
+    """Compte les appels Discord par type, chacun coûtant un aller-retour."""
+
+    def __init__(self, rtt):
+        self.rtt = rtt
+        self.calls = collections.Counter()
+        self.errors = 0  # réponses d'erreur (embed rouge) envoyées par le bot
+        self.invalid = 0  # messages que Discord refuserait (embed trop long)
+
+    async def request(self, kind, embed=None):
+        if embed is not None:
+            if embed.color == discord.Color.red():
+                self.errors += 1
+            if len(embed.description or "") > EMBED_DESCRIPTION_LIMIT or len(embed) > EMBED_TOTAL_LIMIT:
+                self.invalid += 1
+        await asyncio.sleep(self.rtt)
+        self.calls[kind] += 1
+
+class FakeMessage:
+    def __init__(self, http, content=None, author=None, channel=None, guild=None):
+        self.http = http
+        self.id = next(_ids)
+        self.content = content
+        self.author = author
+        self.channel = channel
+        self.guild = guild
+        self.attachments = []
+        self._state = None
+
+    async def edit(self, embed=None, **kwargs):
+        await self.http.request("edit", embed)
+
+    async def delete(self):
+        await self.http.request("delete")
+
+class FakeChannel:
+    def __init__(self, http, guild=None):
+        self.http = http
+        self.id = next(_ids)
+        self.guild = guild
+
+    async def send(self, content=None, embed=None, **kwargs):
+        await self.http.request("send", embed)
+        return FakeMessage(self.http, content, channel=self)
+
+class FakeGuild:
+    """Serveur sans membres en cache : les convertisseurs `discord.Member` échouent proprement."""
+
+    def __init__(self):
+        self.id = next(_ids)
+        self._state = types.SimpleNamespace(member_cache_flags=types.SimpleNamespace(joined=False))
+
+    def get_member(self, user_id):
+        return None
+
+    def get_member_named(self, name):
+        return None
+
+    async def query_members(self, *args, **kwargs):
+        return []
+
+class FakeDMChannel(discord.DMChannel):
+    """Salon privé reconnu comme tel par `isinstance(channel, discord.DMChannel)`."""
+
+    def __init__(self, user):
+        self.id = next(_ids)
+        self.user = user
+
+class FakeUser:
+    """Utilisateur simulé ; `on_dm(user, content)` est appelé à chaque DM reçu du bot."""
+
+    bot = False
+
+    def __init__(self, http, user_id, on_dm=None):
+        self.http = http
+        self.id = user_id
+        self.name = f"user{user_id}"
+        self.display_name = self.name
+        self.mention = f"<@{user_id}>"
+        self.on_dm = on_dm
+        self.dm_channel = FakeDMChannel(self)
+
+    async def send(self, content=None, embed=None, **kwargs):
+        await self.http.request("dm", embed)
+        if self.on_dm is not None:
+            self.on_dm(self, content)
+        return FakeMessage(self.http, content, channel=self.dm_channel)
+
+class FakeInteraction:
+    def __init__(self, http, user=None):
+        self.user = user
+        self.response = types.SimpleNamespace(edit_message=lambda embed=None, **kwargs: http.request("interaction", embed))
+
+class FakeContext(commands.Context):
+    """Contexte dont les envois passent par le faux salon au lieu de l'état de connexion."""
+
+    async def send(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+class FakeBot(commands.Bot):
+    """Bot jamais connecté : les messages injectés suivent le chemin normal des commandes."""
+
+    def __init__(self, http, *args, **kwargs):
+        super().__init__(*args, command_prefix="!", intents=discord.Intents.default(), help_command=None, **kwargs)
+        self.fake_http = http
+        self.fake_user = FakeUser(http, 0)
+        self.fake_user.bot = True
+        self.channels = {}
+
+    @property
+    def user(self):
+        return self.fake_user
+
+    async def get_context(self, origin, *, cls=FakeContext):
+        return await super().get_context(origin, cls=cls)
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+    def receive(self, author, content, channel):
+        """Injecte un message comme s'il arrivait de la passerelle."""
+        self.dispatch("message", FakeMessage(self.fake_http, content, author, channel, getattr(channel, "guild", None)))
+
+def human_clicks(http, delay=(0.2, 0.8), choose=lambda options: options[0]):
+    """Remplace les menus par un utilisateur qui choisit une option après un délai humain."""
+    original = picker.option_selects
+
+    def option_selects(options, on_choice, **kwargs):
+        selects = original(options, on_choice, **kwargs)
+        options = list(options)
+        choice = choose(options)
+        asyncio.get_running_loop().call_later(
+            random.uniform(*delay), lambda: asyncio.create_task(on_choice(FakeInteraction(http), choice))
+        )
+        return selects
+
+    picker.option_selects = option_selects
+    return lambda: setattr(picker, "option_selects", original)
@@ -0,0 +1,111 @@
+"""Faux serveur Source RCON (asyncio), pour les benchmarks locaux.
+
+Implémente le protocole Valve : paquets <taille><id><type><corps>\\0\\0 en little-endian,
+authentification SERVERDATA_AUTH, réponses découpées en paquets de 4096 octets et
+écho du paquet vide SERVERDATA_RESPONSE_VALUE comme le fait srcds.
+"""
+import asyncio
+import struct
+
+SERVERDATA_AUTH = 3
+SERVERDATA_AUTH_RESPONSE = 2
+SERVERDATA_EXECCOMMAND = 2
+SERVERDATA_RESPONSE_VALUE = 0
+MAX_BODY = 4096
+
+def encode(request_id, packet_type, body=b""):
+    payload = struct.pack("<ii", request_id, packet_type) + body + b"\x00\x00"
+    return struct.pack("<i", len(payload)) + payload
+
+class FakeRconServer:
+    """Serveur RCON local ; `latency` simule l'aller-retour réseau, `auth_delay` le coût du login."""
+
+    def __init__(self, password="fishrcon", latency=0.0, auth_delay=0.0, current_map="cp_process_f12", players=0):
+        self.password = password
+        self.latency = latency
+        self.auth_delay = auth_delay
+        self.current_map = current_map
+        self.players = players
+        self.connections = 0
+        self.auths = 0
+        self.commands = []
+        self._writers = set()
+        self._server = None
+        self.host = "127.0.0.1"
+        self.port = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def drop_connections(self):
+        """Coupe les connexions ouvertes, comme un redémarrage du serveur de jeu."""
+        for writer in list(self._writers):
+            writer.close()
+
+    def execute(self, command):
+        """Réponse texte du serveur à une commande."""
+        name, _, arg = command.partition(" ")
+        if name == "changelevel":
+            self.current_map = arg
+            return ""
+        if name == "exec":
+            return f"Executing {arg}\n"
+        if name == "echo":
+            return arg + "\n"
+        if name == "status":
+            lines = [
+                "hostname: FishServ #1",
+                f"map     : {self.current_map} at: 0 x, 0 y, 0 z",
+                f"players : {self.players} humans, 0 bots (24 max)",
+                "# userid name uniqueid connected ping loss state adr",
+            ]
+            lines += [f'#    {i + 2} "player{i}" [U:1:{i}] 10:00 40 0 active 10.0.0.{i}:27005' for i in range(self.players)]
+            return "\n".join(lines) + "\n"
+        if name == "big":
+            return "x" * int(arg or 10000)
+        return f'Unknown command "{name}"\n'
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        self._writers.add(writer)
+        authenticated = False
+        try:
+            while True:
+                header = await reader.readexactly(4)
+                (size,) = struct.unpack("<i", header)
+                data = await reader.readexactly(size)
+                request_id, packet_type = struct.unpack("<ii", data[:8])
+                body = data[8:-2].decode("utf-8", "replace")
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                if packet_type == SERVERDATA_AUTH:
+                    if self.auth_delay:
+                        await asyncio.sleep(self.auth_delay)
+                    self.auths += 1
+                    authenticated = body == self.password
+                    writer.write(encode(request_id, SERVERDATA_RESPONSE_VALUE))
+                    writer.write(encode(request_id if authenticated else -1, SERVERDATA_AUTH_RESPONSE))
+                elif not authenticated:
+                    break
+                elif packet_type == SERVERDATA_EXECCOMMAND:
+                    self.commands.append(body)
+                    output = self.execute(body).encode()
+                    chunks = [output[i:i + MAX_BODY] for i in range(0, len(output), MAX_BODY)] or [b""]
+                    for chunk in chunks:
+                        writer.write(encode(request_id, SERVERDATA_RESPONSE_VALUE, chunk))
+                elif packet_type == SERVERDATA_RESPONSE_VALUE:
+                    writer.write(encode(request_id, SERVERDATA_RESPONSE_VALUE))
+                    writer.write(encode(request_id, SERVERDATA_RESPONSE_VALUE, b"\x00\x01\x00\x00"))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
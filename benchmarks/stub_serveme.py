@@ -0,0 +1,104 @@
+"""Faux serveur HTTP imitant l'API serveme.tf, pour les benchmarks locaux."""
+import time
+from aiohttp import web
+
+class StubServeme:
+    """Sert /api/reservations en local sur un port libre.
+
+    Avec `rate_limit`, au plus ce nombre de requêtes est accepté par fenêtre d'une
+    seconde ; les suivantes reçoivent un 429 avec Retry-After et RateLimit-*. Les
+    `throttle_next` prochaines requêtes reçoivent un 429 avec `Retry-After: retry_after`.
+    """
+
+    def __init__(self, servers=None, server_configs=None, rate_limit=None):
+        self.servers = servers if servers is not None else [
+            {"id": i, "name": f"FishServ #{i} (Paris)", "ip_and_port": f"127.0.0.1:{27015 + i}"}
+            for i in range(1, 9)
+        ]
+        self.server_configs = server_configs if server_configs is not None else [
+            {"id": 1, "file": "etf2l_6v6_5cp"}, {"id": 2, "file": "etf2l_6v6_koth"}
+        ]
+        self.requests = 0
+        self.rejected = 0
+        self.rate_limit = rate_limit
+        self.throttle_next = 0
+        self.retry_after = "1"
+        self._window = (0, 0)
+        self.next_id = 1
+        self._runner = None
+        self.base_url = None
+
+    @web.middleware
+    async def limiter(self, request, handler):
+        if self.throttle_next:
+            self.throttle_next -= 1
+            self.rejected += 1
+            return web.json_response({"errors": "rate limited"}, status=429, headers={"Retry-After": self.retry_after})
+        if self.rate_limit is None:
+            return await handler(request)
+        now = time.time()
+        window, count = self._window
+        if int(now) != window:
+            window, count = int(now), 0
+        count += 1
+        self._window = (window, count)
+        remaining = max(self.rate_limit - count, 0)
+        headers = {"RateLimit-Limit": str(self.rate_limit), "RateLimit-Remaining": str(remaining),
+                   "RateLimit-Reset": f"{window + 1 - now:.3f}"}
+        if count > self.rate_limit:
+            self.rejected += 1
+            return web.json_response({"errors": "rate limited"}, status=429, headers=dict(headers, **{"Retry-After": "1"}))
+        response = await handler(request)
+        response.headers.update(headers)
+        return response
+
+    def app(self):
+        app = web.Application(middlewares=[self.limiter])
+        app.router.add_get("/api/reservations/new", self.new)
+        app.router.add_post("/api/reservations/find_servers", self.find_servers)
+        app.router.add_post("/api/reservations", self.create)
+        app.router.add_delete("/api/reservations/{id}", self.delete)
+        return app
+
+    async def start(self):
+        self._runner = web.AppRunner(self.app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}/api/reservations"
+        return self
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def new(self, request):
+        self.requests += 1
+        return web.json_response({
+            "reservation": {"starts_at": None, "ends_at": None},
+            "actions": {"find_servers": f"{self.base_url}/find_servers", "create": self.base_url},
+            "server_configs": self.server_configs
+        })
+
+    async def find_servers(self, request):
+        self.requests += 1
+        await request.json()
+        return web.json_response({"servers": self.servers, "server_configs": self.server_configs})
+
+    async def create(self, request):
+        self.requests += 1
+        body = (await request.json())["reservation"]
+        server = next(s for s in self.servers if s["id"] == body["server_id"])
+        reservation_id, self.next_id = self.next_id, self.next_id + 1
+        return web.json_response({"reservation": {
+            "id": reservation_id,
+            "starts_at": body["starts_at"],
+            "ends_at": body["ends_at"],
+            "password": body["password"],
+            "server": server
+        }})
+
+    async def delete(self, request):
+        self.requests += 1
+        return web.Response(status=204)
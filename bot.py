@@ -3,7 +3,16 @@ from discord.ext import commands
 from dotenv import load_dotenv
 import os
 from config import Config
+from utils import ServemeClient
+from rcon_pool import RconPool
+from latency import LatencyProber
+from status import StatusPoller
+from loop_watchdog import LoopWatchdog
+from dm_inbox import DMInbox
+from store import ReservationStore
+import metrics
 import logging
+import time
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
@@ -11,15 +20,80 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()
 DISCORD_BOT_TOKEN = os.getenv("DISCORD_BOT_TOKEN")
+# Déploiement en plusieurs processus : SHARD_COUNT=4 SHARD_IDS=0,1 pour ce processus
+SHARD_COUNT = os.getenv("SHARD_COUNT")
+SHARD_IDS = os.getenv("SHARD_IDS")
 
-# Validation du token
+# Validation de la configuration
 if not DISCORD_BOT_TOKEN:
     raise ValueError("Le token Discord n'est pas défini dans le fichier .env")
+if SHARD_IDS and not SHARD_COUNT:
+    raise ValueError("SHARD_IDS est défini sans SHARD_COUNT : indiquez le nombre total de shards, tous processus confondus")
 
 intents = discord.Intents.default()
 intents.message_content = True
 intents.reactions = True
-bot = commands.Bot(command_prefix="!", intents=intents)
+
+class ServemeBot(commands.AutoShardedBot):
+    """Bot serveme.tf ; sans `shard_ids`, un seul processus porte tous les shards.
+
+    Avec `shard_ids`, les autres shards tournent dans d'autres processus : la base des
+    réservations est alors partagée (relue dès qu'un autre processus y écrit) et les DM,
+    que Discord ne livre qu'au shard 0, y sont relayés.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.serveme = ServemeClient()
+        self.rcon_pool = RconPool()
+        self.latency_prober = LatencyProber()
+        self.reservations = ReservationStore(shared=self.shard_ids is not None)
+        self.status_poller = StatusPoller(self.rcon_pool, self.reservations)
+        self.metrics_runner = None
+        self.watchdog = LoopWatchdog()
+        self.dm_inbox = DMInbox(relay=self.reservations if self.reservations.shared else None)
+        self.add_listener(self.dm_inbox.on_message)
+
+    async def setup_hook(self):
+        """Arme le timer d'expiration des réservations rechargées depuis le disque, lance le relevé des statuts et les métriques."""
+        self.reservations.expire_due()
+        self.status_poller.start()
+        self.http.request = self._timed_request(self.http.request)
+        metrics.REGISTRY.add_gauges(lambda: {f"serveme_scheduler_{k}": v for k, v in self.serveme.scheduler.metrics().items()})
+        if Config.METRICS_PORT is not None:
+            try:
+                # Un port par processus : METRICS_PORT + premier shard porté
+                port = Config.METRICS_PORT + (self.shard_ids[0] if self.shard_ids else 0)
+                self.metrics_runner = await metrics.start_server(port=port)
+            except OSError as e:
+                logger.warning(f"Serveur de métriques indisponible : {e}")
+
+    @staticmethod
+    def _timed_request(request):
+        """Enveloppe les appels REST Discord (envois, modifications...) pour mesurer leur durée par route."""
+        async def timed_request(route, **kwargs):
+            with metrics.timer("discord_request_seconds", method=route.method, route=route.path):
+                return await request(route, **kwargs)
+        return timed_request
+
+    async def close(self):
+        """Ferme le client serveme.tf, le pool RCON, les tâches de fond, le serveur de métriques et le timer d'expiration avant de couper la connexion Discord."""
+        await self.serveme.close()
+        await self.rcon_pool.close()
+        await self.latency_prober.close()
+        await self.status_poller.close()
+        await self.watchdog.close()
+        await self.dm_inbox.close()
+        if self.metrics_runner is not None:
+            await self.metrics_runner.cleanup()
+        self.reservations.close()
+        await super().close()
+
+bot = ServemeBot(
+    command_prefix="!", intents=intents,
+    shard_count=int(SHARD_COUNT) if SHARD_COUNT else None,
+    shard_ids=[int(shard_id) for shard_id in SHARD_IDS.split(",")] if SHARD_IDS else None
+)
 
 async def load_extensions():
     extensions = ["commands.reservation", "commands.utility"]
@@ -33,11 +107,23 @@ async def load_extensions():
 @bot.event
 async def on_ready():
     logger.info(f"Connecté en tant que {bot.user}")
+    bot.watchdog.start()
     await bot.change_presence(activity=discord.Game(name="Team Fortress 2"))
     
     bot.remove_command("help")
     await load_extensions()
 
+@bot.before_invoke
+async def start_command_timer(ctx):
+    ctx.started_at = time.perf_counter()
+
+@bot.after_invoke
+async def record_command_timer(ctx):
+    """Durée de chaque commande, et une erreur comptée si elle a échoué."""
+    metrics.observe("command_seconds", time.perf_counter() - ctx.started_at, command=ctx.command.qualified_name)
+    if ctx.command_failed:
+        metrics.inc("command_errors_total", command=ctx.command.qualified_name)
+
 @bot.event
 async def on_message(message):
     if message.author.bot:
@@ -1,9 +1,17 @@
+import discord
 from discord.ext import commands
 from datetime import datetime, timedelta
 import asyncio
 import re
-from utils import find_servers, create_reservation, clean_server_name
+import sqlite3
+import time
+from utils import clean_server_name, server_location
+from store import Reservation
+from ratelimit import PRIORITY_LOW
+from picker import FormPicker
+from live_message import LiveMessage
 from config import Config
+import metrics
 import logging
 from discord.ext import tasks
 
@@ -11,99 +19,221 @@ from discord.ext import tasks
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def next_occurrence(now, hour, minute):
+    """Prochaine occurrence de HH:MM à partir de `now` (aujourd'hui ou demain)."""
+    start_dt = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if start_dt < now:
+        start_dt += timedelta(days=1)
+    return start_dt
+
+def score_group(store, user_id, group_name, servers):
+    """Score local d'un groupe de serveurs pour `--auto` : choix passés, localisation et taux de succès."""
+    weights = Config.AUTO_PICK_WEIGHTS
+    group_picks = store.user_picks(user_id, "group")
+    location_picks = store.user_picks(user_id, "location")
+    location = next(filter(None, (server_location(s['name']) for s in servers)), None)
+    return (
+        weights["group"] * group_picks.get(group_name, 0) / max(sum(group_picks.values()), 1)
+        + weights["location"] * location_picks.get(location, 0) / max(sum(location_picks.values()), 1)
+        + weights["success"] * store.group_success_rate(group_name)
+    )
+
+def parse_slot(parts, now):
+    """Interprète `now|<heure>|<date> <heure> [<mot de passe>]`.
+
+    Retourne (début, mot de passe, RCON par défaut) ou lève ValueError avec la clé du
+    message d'erreur dans `ERROR_MESSAGES["reserve"]`.
+    """
+    if re.match(r"\d{4}-\d{2}-\d{2}", parts[0]):
+        if len(parts) < 2:
+            raise ValueError("invalid_format")
+        date_str, time_str, rest = parts[0], parts[1], parts[2:]
+    else:
+        date_str, time_str, rest = None, parts[0], parts[1:]
+    password = rest[0] if rest else "fish"
+
+    if time_str.lower() == "now":
+        start_dt = now
+    else:
+        try:
+            time_obj = datetime.strptime(time_str.replace(":", "h"), "%Hh%M")
+        except ValueError:
+            raise ValueError("invalid_time")
+        start_dt = next_occurrence(now, time_obj.hour, time_obj.minute)
+
+    if date_str:
+        try:
+            date_obj = datetime.strptime(date_str, "%Y-%m-%d")
+        except ValueError:
+            raise ValueError("invalid_date")
+        if date_obj.year > now.year + 1:
+            raise ValueError("date_too_far")
+        start_dt = date_obj.replace(
+            hour=start_dt.hour, minute=start_dt.minute, second=0, microsecond=0, tzinfo=Config.TIMEZONE
+        )
+    return start_dt, password, not rest
+
 class ReservationCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.user_data = {}
-        self.notify_tasks = {}
-        self.cleanup_old_reservations.start()
+        self.prefetch_slots.start()
+        self.sync_reservations.start()
+
+    async def cog_load(self):
+        """Replanifie les notifications des réservations rechargées depuis le disque."""
+        self.schedule_pending_notifications()
 
     def cog_unload(self):
         """Annule les tâches de notification lors du déchargement."""
-        for task in self.notify_tasks.values():
+        for task in self.reservations.notify_tasks.values():
             task.cancel()
-        self.notify_tasks.clear()
-        self.cleanup_old_reservations.cancel()
+        self.reservations.notify_tasks.clear()
+        self.prefetch_slots.cancel()
+        self.sync_reservations.cancel()
 
-    @tasks.loop(hours=6)
-    async def cleanup_old_reservations(self):
-        """Nettoie les réservations terminées depuis plus d'une heure."""
+    @tasks.loop(seconds=Config.AVAILABILITY_TTL - 15)
+    async def prefetch_slots(self):
+        """Garde en cache la disponibilité des prochains créneaux du soir."""
         now = datetime.now(Config.TIMEZONE)
-        for user_id in list(self.user_data.keys()):
-            self.user_data[user_id] = [
-                res for res in self.user_data[user_id]
-                if "reservation_id" not in res or datetime.fromisoformat(res["end"]).astimezone(Config.TIMEZONE) > now - timedelta(hours=1)
-            ]
-            if not self.user_data[user_id]:
-                del self.user_data[user_id]
-
-    async def select_option(self, ctx, title, options, timeout=60.0):
-        """Permet à l'utilisateur de sélectionner une option via des réactions."""
-        emojis = Config.EMOJIS[:len(options)]
-        embed = discord.Embed(title=title, description="\n".join(f"{emojis[i]} {opt}" for i, opt in enumerate(options)), color=discord.Color.blue())
-        msg = await ctx.send(embed=embed)
-        for emoji in emojis:
-            await msg.add_reaction(emoji)
-            await asyncio.sleep(0.1)  # Réduit de 0.5 à 0.1 pour plus de réactivité
-
-        def check(reaction, user):
-            return user == ctx.author and reaction.message.id == msg.id and str(reaction.emoji) in emojis
-
+        for slot in Config.PREFETCH_SLOTS:
+            hour, minute = map(int, slot.split(":"))
+            start_dt = next_occurrence(now, hour, minute)
+            if start_dt - now > Config.PREFETCH_WINDOW:
+                continue
+            end_dt = start_dt + Config.RESERVATION_DURATION
+            try:
+                # Renouvelé à chaque tour : le cache expirerait sinon entre deux tours
+                data = await self.bot.serveme.find_servers(
+                    start_dt.isoformat(), end_dt.isoformat(), priority=PRIORITY_LOW, refresh=True
+                )
+            except Exception as e:
+                logger.warning(f"Préchargement du créneau {slot} échoué : {e}")
+                continue
+            self.bot.latency_prober.track(s['ip_and_port'] for s in data.get("servers", []) if s.get('ip_and_port'))
+
+    @prefetch_slots.before_loop
+    async def before_prefetch_slots(self):
+        await self.bot.wait_until_ready()
+
+    @tasks.loop(seconds=Config.SYNC_INTERVAL)
+    async def sync_reservations(self):
+        """Répercute localement les réservations terminées ou modifiées sur serveme.tf."""
         try:
-            reaction, _ = await self.bot.wait_for('reaction_add', check=check, timeout=timeout)
-            logger.info(f"Réaction reçue : {reaction.emoji}, Utilisateur : {ctx.author.name}")
-            return options[emojis.index(str(reaction.emoji))]
-        except asyncio.TimeoutError:
-            logger.warning("Timeout lors de la sélection")
-            await ctx.send(embed=discord.Embed(description=Config.ERROR_MESSAGES["general"]["timeout"], color=discord.Color.red()))
-            return None
+            await self.reservations.retry_locked(self.reservations.flush_deferred)
+        except sqlite3.Error as e:
+            logger.warning(f"Écritures différées toujours en attente : {e}")
+            return
+        try:
+            remote = await self.bot.serveme.list_reservations()
+        except Exception as e:
+            logger.warning(f"Synchronisation des réservations échouée : {e}")
+            return
+        # Réservations créées par un autre processus : chaque processus programme leur
+        # notification, `claim_notification` garantit qu'un seul l'envoie
+        self.schedule_pending_notifications()
+        if remote is None:
+            return
+        try:
+            ended = await self.reservations.retry_locked(self.reservations.reconcile, remote)
+        except sqlite3.Error as e:
+            logger.warning(f"Synchronisation des réservations échouée : {e}")
+            return
+        for reservation in ended:
+            logger.info(f"Réservation {reservation.reservation_id} terminée sur serveme.tf")
+            await self.bot.rcon_pool.close_address(reservation.ip_and_port)
+
+    @sync_reservations.before_loop
+    async def before_sync_reservations(self):
+        await self.bot.wait_until_ready()
+
+    @property
+    def reservations(self):
+        return self.bot.reservations
 
-    async def notify_server_open(self, ctx, server_name, ip_and_port, password, start_dt, reservation_id):
+    async def save_reservation(self, reservation):
+        """Enregistre une réservation créée sur serveme.tf ; gardée en mémoire si la base reste verrouillée."""
+        try:
+            return await self.reservations.retry_locked(self.reservations.add, reservation)
+        except sqlite3.Error as e:
+            # Elle existe côté serveme.tf : ne pas la perdre, l'écriture est reprise à la synchronisation
+            logger.warning(f"Réservation {reservation.reservation_id} gardée en mémoire, enregistrement différé : {e}")
+            return self.reservations.defer_add(reservation)
+
+    async def record_pick(self, user_id, group_name, location, map_name, success):
+        """Met à jour l'historique des choix ; un échec n'est que journalisé."""
+        try:
+            await self.reservations.retry_locked(self.reservations.record_pick, user_id, group_name, location, map_name, success)
+        except sqlite3.Error as e:
+            logger.warning(f"Historique des choix de {user_id} non enregistré : {e}")
+
+    def schedule_pending_notifications(self):
+        """Programme les notifications encore dues qui n'ont pas de tâche dans ce processus."""
+        now = time.time()
+        for reservation in self.reservations.all():
+            if (reservation.notify_pending and reservation.end_ts > now
+                    and reservation.reservation_id not in self.reservations.notify_tasks):
+                self.schedule_notification(reservation)
+
+    def schedule_notification(self, reservation):
+        """Programme la notification d'ouverture d'une réservation."""
+        self.reservations.notify_tasks[reservation.reservation_id] = self.bot.loop.create_task(
+            self.notify_server_open(reservation)
+        )
+
+    async def notify_server_open(self, reservation):
         """Notifie l'ouverture du serveur à l'heure prévue."""
-        now = datetime.now(Config.TIMEZONE)
-        seconds_until_start = (start_dt - now).total_seconds()
+        seconds_until_start = reservation.start_ts - time.time()
         if seconds_until_start > 0:
             await asyncio.sleep(seconds_until_start)
         
-        if reservation_id in self.notify_tasks:
-            embed = discord.Embed(
-                title="🔔 Serveur ouvert",
-                description=(
-                    f"**Serveur :** {clean_server_name(server_name)}\n"
-                    f"**Connect info :**\n"
-                    f"```\nconnect {ip_and_port}; password \"{password}\"\n```\n"
-                    f"Ouvert à {start_dt.strftime('%Y-%m-%d %H:%M')} (Paris)"
-                ),
-                color=discord.Color.green()
-            )
-            await ctx.send(embed=embed)
-            del self.notify_tasks[reservation_id]
-
-    async def get_rcon(self, ctx, rcon_prompt_msg=None):
-        """Demande le mot de passe RCON via DM."""
+        if reservation.reservation_id not in self.reservations.notify_tasks:
+            return
         try:
-            if rcon_prompt_msg:
-                await rcon_prompt_msg.edit(embed=discord.Embed(
-                    description="Vérifie tes DMs pour fournir le mot de passe RCON.", 
-                    color=discord.Color.blue()
-                ))
-            await ctx.author.send("Veuillez fournir le mot de passe RCON.")
-            def check(m):
-                return m.author == ctx.author and isinstance(m.channel, discord.DMChannel)
-            response = await self.bot.wait_for('message', check=check, timeout=60.0)
+            claimed = await self.reservations.retry_locked(self.reservations.claim_notification, reservation.reservation_id)
+        except sqlite3.Error as e:
+            # Toujours due : replanifiée à la prochaine synchronisation
+            logger.warning(f"Notification de la réservation {reservation.reservation_id} reportée : {e}")
+            claimed = False
+        if not claimed:
+            # Déjà envoyée par un autre processus, ou réservation terminée entre-temps
+            self.reservations.notify_tasks.pop(reservation.reservation_id, None)
+            return
+        embed = discord.Embed(
+            title="🔔 Serveur ouvert",
+            description=(
+                f"**Serveur :** {clean_server_name(reservation.server_name)}\n"
+                f"**Connect info :**\n"
+                f"```\nconnect {reservation.ip_and_port}; password \"{reservation.password}\"\n```\n"
+                f"Ouvert à {reservation.start.strftime('%Y-%m-%d %H:%M')} (Paris)"
+            ),
+            color=discord.Color.green()
+        )
+        try:
+            channel = self.bot.get_channel(reservation.channel_id) or await self.bot.fetch_channel(reservation.channel_id)
+            await channel.send(embed=embed)
+        except discord.HTTPException as e:
+            logger.warning(f"Notification de la réservation {reservation.reservation_id} impossible : {e}")
+        self.reservations.notify_tasks.pop(reservation.reservation_id, None)
+
+    async def get_rcon(self, ctx, live=None):
+        """Demande le mot de passe RCON via DM ; les erreurs s'affichent sur `live` s'il est fourni."""
+        try:
+            with metrics.timer("dm_wait_seconds", step="get_rcon"):
+                await ctx.author.send("Veuillez fournir le mot de passe RCON.")
+                response = await self.bot.dm_inbox.wait_for_reply(ctx.author, timeout=60.0)
             rcon = response.content.strip()
             if not rcon:
                 raise ValueError("RCON vide")
-            if rcon_prompt_msg:
-                await rcon_prompt_msg.delete()
             return rcon
         except (asyncio.TimeoutError, discord.Forbidden, ValueError) as e:
             error_msg = Config.ERROR_MESSAGES["general"]["invalid_rcon"]
             if isinstance(e, asyncio.TimeoutError):
                 error_msg = Config.ERROR_MESSAGES["general"]["timeout"]
-            if rcon_prompt_msg:
-                await rcon_prompt_msg.delete()
-            await ctx.send(embed=discord.Embed(description=error_msg, color=discord.Color.red()))
+            error = discord.Embed(description=error_msg, color=discord.Color.red())
+            if live is not None:
+                live.update(embed=error, view=None)
+            else:
+                await ctx.send(embed=error)
             return None
 
     @commands.command(name="reserve")
@@ -117,17 +247,13 @@ class ReservationCommands(commands.Cog):
             return
 
         now = datetime.now(Config.TIMEZONE)
-        if ctx.author.id in self.user_data:
-            active_reservations = [
-                res for res in self.user_data[ctx.author.id]
-                if "reservation_id" in res and datetime.fromisoformat(res["end"]).astimezone(Config.TIMEZONE) > now - timedelta(hours=1)
-            ]
-            if active_reservations:
-                await ctx.send(embed=discord.Embed(
-                    description=Config.ERROR_MESSAGES["reserve"]["already_active"],
-                    color=discord.Color.red()
-                ))
-                return
+        cutoff = (now - Config.RESERVATION_GRACE).timestamp()
+        if any(res.end_ts > cutoff for res in self.reservations.by_creator(ctx.author.id)):
+            await ctx.send(embed=discord.Embed(
+                description=Config.ERROR_MESSAGES["reserve"]["already_active"],
+                color=discord.Color.red()
+            ))
+            return
 
         if not args:
             await ctx.send(embed=discord.Embed(
@@ -137,139 +263,187 @@ class ReservationCommands(commands.Cog):
             return
 
         parts = args.split()
-        date_str = None
-        time_str = None
-        password = "fish"
-        use_default_rcon = True
-
-        if parts[0].lower() == "now":
-            if len(parts) == 1:
-                time_str = "now"
-            elif len(parts) == 2:
-                time_str = "now"
-                password = parts[1]
-                use_default_rcon = False
-        elif re.match(r"\d{4}-\d{2}-\d{2}", parts[0]):
-            date_str = parts[0]
-            time_str = parts[1]
-            if len(parts) >= 3:
-                password = parts[2]
-                use_default_rcon = False
-        else:
-            time_str = parts[0]
-            if len(parts) >= 2:
-                password = parts[1]
-                use_default_rcon = False
-
-        if time_str.lower() == "now":
-            start_dt = now
-        else:
-            try:
-                time_str = time_str.replace(":", "h")
-                time_obj = datetime.strptime(time_str, "%Hh%M")
-                start_dt = now.replace(hour=time_obj.hour, minute=time_obj.minute, second=0, microsecond=0)
-                if start_dt < now:
-                    start_dt += timedelta(days=1)
-            except ValueError:
+        auto = "--auto" in parts
+        auto_map = None
+        if auto:
+            index = parts.index("--auto")
+            auto_map = parts[index + 1] if index + 1 < len(parts) else None
+            del parts[index:index + 2]
+            if auto_map is not None and auto_map not in Config.AVAILABLE_MAPS:
                 await ctx.send(embed=discord.Embed(
-                    description=Config.ERROR_MESSAGES["reserve"]["invalid_time"],
+                    description=Config.ERROR_MESSAGES["reserve"]["invalid_map"],
                     color=discord.Color.red()
                 ))
                 return
-
-        if date_str:
-            try:
-                date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-                if date_obj.year > now.year + 1:
-                    await ctx.send(embed=discord.Embed(description=Config.ERROR_MESSAGES["reserve"]["date_too_far"], color=discord.Color.red()))
-                    return
-                start_dt = date_obj.replace(
-                    hour=start_dt.hour, minute=start_dt.minute, second=0, microsecond=0, tzinfo=Config.TIMEZONE
-                )
-            except ValueError:
+            if not parts:
                 await ctx.send(embed=discord.Embed(
-                    description=Config.ERROR_MESSAGES["reserve"]["invalid_date"],
+                    description=Config.ERROR_MESSAGES["reserve"]["invalid_format"],
                     color=discord.Color.red()
                 ))
                 return
 
-        end_dt = start_dt + Config.RESERVATION_DURATION
-        start_time_iso = start_dt.isoformat()
-        end_time_iso = end_dt.isoformat()
-
-        await ctx.send(f"Recherche de serveurs pour {start_dt.strftime('%Y-%m-%d %H:%M')}...")
-
         try:
-            data = await find_servers(start_time_iso, end_time_iso)
-        except Exception as e:
-            await ctx.send(embed=discord.Embed(description=str(e), color=discord.Color.red()))
-            return
-
-        servers = data.get("servers", [])
-        server_configs = data.get("server_configs", [])
-        if not servers:
+            start_dt, password, use_default_rcon = parse_slot(parts, now)
+        except ValueError as e:
             await ctx.send(embed=discord.Embed(
-                description=Config.ERROR_MESSAGES["reserve"]["no_servers"],
+                description=Config.ERROR_MESSAGES["reserve"][str(e)],
                 color=discord.Color.red()
             ))
             return
+        is_now = start_dt == now
 
-        server_groups = {}
-        for s in servers:
-            group_name = s['name'].split('#')[0].strip()
-            server_groups.setdefault(group_name, []).append(s)
+        end_dt = start_dt + Config.RESERVATION_DURATION
+        start_time_iso = start_dt.isoformat()
+        end_time_iso = end_dt.isoformat()
 
-        if not server_groups:
-            await ctx.send(embed=discord.Embed(
-                description=Config.ERROR_MESSAGES["reserve"]["no_servers"],
-                color=discord.Color.red()
-            ))
-            return
+        # Un seul message suit toute la réservation : progression, menus, erreurs et
+        # confirmation y sont appliqués par modifications regroupées.
+        live = LiveMessage(ctx)
+        form = FormPicker(ctx.author, live)
+        progress = {
+            "🔎 Serveurs": "recherche...",
+            "🗺️ Carte": "à choisir ci-dessous" if not auto else "choix automatique",
+            "🖥️ Serveur": "en attente de la recherche",
+            "🔑 RCON": "par défaut" if use_default_rcon else "vérifie tes DMs"
+        }
+        aborted = False
+
+        def set_stage(label, value):
+            progress[label] = value
+            if not aborted:
+                live.update(embed=discord.Embed(
+                    title=f"Réservation pour {start_dt.strftime('%Y-%m-%d %H:%M')}",
+                    description="\n".join(f"{key} : {state}" for key, state in progress.items()),
+                    color=discord.Color.blue()
+                ))
 
-        if not ctx.channel.permissions_for(ctx.guild.me).add_reactions:
-            await ctx.send(embed=discord.Embed(
-                description="Erreur : Le bot n'a pas la permission d'ajouter des réactions.",
-                color=discord.Color.red()
-            ))
-            return
+        def fail(description):
+            nonlocal aborted
+            aborted = True
+            live.update(embed=discord.Embed(description=description, color=discord.Color.red()), view=None)
 
-        group_names = sorted(server_groups.keys())[:10]
-        selected_group = await self.select_option(ctx, "Choisir un serveur", group_names)
-        if not selected_group:
-            return
+        # Étapes en parallèle : la recherche tourne pendant le choix de la carte, le choix du
+        # serveur s'affiche dès qu'elle aboutit et la demande de RCON part tout de suite en DM.
+        timings = {}
+        started = time.perf_counter()
 
-        selected_server = sorted(server_groups[selected_group], key=lambda x: x['id'])[0]
-        server_id = selected_server['id']
+        async def timed(stage, coro):
+            t0 = time.perf_counter()
+            try:
+                return await coro
+            finally:
+                timings[stage] = time.perf_counter() - t0
+                metrics.observe("reserve_stage_seconds", timings[stage], stage=stage)
 
-        maps = Config.AVAILABLE_MAPS[:10]
-        map_name = await self.select_option(ctx, "Choisir une carte", maps)
-        if not map_name:
-            return
+        async def pick_server():
+            try:
+                data = await timed("recherche", self.bot.serveme.find_servers(start_time_iso, end_time_iso))
+            except Exception as e:
+                fail(str(e))
+                return None
+
+            servers = data.get("servers", [])
+            latency = self.bot.latency_prober
+            latency.track(s['ip_and_port'] for s in servers if s.get('ip_and_port'))
+            server_groups = {}
+            for s in servers:
+                group_name = s['name'].split('#')[0].strip()
+                server_groups.setdefault(group_name, []).append(s)
+
+            if not server_groups:
+                fail(Config.ERROR_MESSAGES["reserve"]["no_servers"])
+                return None
+            set_stage("🔎 Serveurs", f"{len(servers)} disponible(s)")
+
+            # Serveurs les plus rapides d'abord (mesures de la sonde de latence), puis par id
+            for group in server_groups.values():
+                group.sort(key=lambda x: (latency.sort_key(x.get('ip_and_port')), x['id']))
+            group_names = sorted(
+                server_groups.keys(),
+                key=lambda name: (latency.sort_key(server_groups[name][0].get('ip_and_port')), name)
+            )
+            if auto:
+                # À score égal, max garde le premier groupe, donc le plus rapide
+                selected_group = max(
+                    group_names,
+                    key=lambda name: score_group(self.reservations, ctx.author.id, name, server_groups[name])
+                )
+            else:
+                set_stage("🖥️ Serveur", "à choisir ci-dessous")
+                selected_group = await timed("choix du serveur", form.ask("Choisir un serveur", group_names))
+            if not selected_group:
+                fail(Config.ERROR_MESSAGES["general"]["timeout"])
+                return None
+            selected_server = server_groups[selected_group][0]
+            set_stage("🖥️ Serveur", clean_server_name(selected_server['name']))
+            return selected_server, data.get("server_configs") or self.bot.serveme.server_configs
+
+        async def choose_map():
+            if auto:
+                favourites = self.reservations.user_picks(ctx.author.id, "map")
+                map_name = auto_map or max(favourites, key=favourites.get, default=Config.AVAILABLE_MAPS[0])
+            else:
+                map_name = await timed("choix de la carte", form.ask("Choisir une carte", Config.AVAILABLE_MAPS))
+                if not map_name:
+                    fail(Config.ERROR_MESSAGES["general"]["timeout"])
+                    return None
+            set_stage("🗺️ Carte", map_name)
+            return map_name
+
+        async def ask_rcon():
+            nonlocal aborted
+            if use_default_rcon:
+                return Config.DEFAULT_RCON
+            rcon = await timed("rcon", self.get_rcon(ctx, live))
+            if rcon is None:
+                aborted = True
+                return None
+            set_stage("🔑 RCON", "reçu")
+            return rcon
+
+        stages = [
+            asyncio.create_task(pick_server()),
+            asyncio.create_task(choose_map()),
+            asyncio.create_task(ask_rcon())
+        ]
+        # Premier envoi après le démarrage des étapes, pour qu'il porte déjà le menu des cartes
+        set_stage("🔎 Serveurs", "recherche...")
+        try:
+            pending = set(stages)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                if any(task.result() is None for task in done):
+                    return
+        finally:
+            for task in stages:
+                task.cancel()
+            await asyncio.gather(*stages, return_exceptions=True)
+            form.stop()
+            if aborted:
+                await live.close(view=None)
+        (selected_server, server_configs), map_name, rcon = (task.result() for task in stages)
+        server_id = selected_server['id']
+        group_name = selected_server['name'].split('#')[0].strip()
+        location = server_location(selected_server['name'])
 
         server_config_file = Config.SERVER_CONFIG_FILE_5CP if map_name.startswith("cp_") else Config.SERVER_CONFIG_FILE_KOTH
         server_config_id = next((config["id"] for config in server_configs if config.get("file") == server_config_file), None)
 
-        rcon = Config.DEFAULT_RCON if use_default_rcon else None
-        if not rcon:
-            rcon_prompt_msg = await ctx.send(embed=discord.Embed(
-                description="Préparation de la réservation...", 
-                color=discord.Color.blue()
-            ))
-            rcon = await self.get_rcon(ctx, rcon_prompt_msg)
-            if rcon is None:
-                return
-
+        set_stage("📝 Réservation", "création...")
         try:
-            reservation, status = await create_reservation(
+            reservation, status = await timed("création", self.bot.serveme.create_reservation(
                 start_time_iso, end_time_iso, server_id, password, rcon, server_config_id, first_map=map_name
-            )
+            ))
         except Exception as e:
-            await ctx.send(embed=discord.Embed(description=f"Erreur : {str(e)}", color=discord.Color.red()))
+            await live.close(embed=discord.Embed(description=f"Erreur : {str(e)}", color=discord.Color.red()), view=None)
+            await self.record_pick(ctx.author.id, group_name, location, map_name, False)
             return
+        finally:
+            timings["total"] = time.perf_counter() - started
+            logger.info(f"!reserve {ctx.author.name} : " + ", ".join(f"{stage} {seconds * 1000:.0f} ms" for stage, seconds in timings.items()))
 
         if status == 200:
             res = reservation["reservation"]
-            is_now = time_str.lower() == "now"
 
             if is_now:
                 embed = discord.Embed(
@@ -296,7 +470,7 @@ class ReservationCommands(commands.Cog):
                     color=discord.Color.green()
                 )
 
-            await ctx.send(embed=embed)
+            await live.close(embed=embed, view=None)
 
             rcon_info = discord.Embed(
                 title=f"RCON pour {clean_server_name(res['server']['name'])}",
@@ -311,28 +485,155 @@ class ReservationCommands(commands.Cog):
                     color=discord.Color.red()
                 ))
 
-            if ctx.author.id not in self.user_data:
-                self.user_data[ctx.author.id] = []
-            self.user_data[ctx.author.id].append({
-                "reservation_id": res["id"],
-                "start": start_time_iso,
-                "end": end_time_iso,
-                "server_name": res['server']['name'],
-                "ip_and_port": res['server']['ip_and_port'],
-                "password": res['password'],
-                "rcon": rcon,
-                "creator_id": ctx.author.id,
-                "creator_name": ctx.author.name
-            })
+            reservation = await self.save_reservation(Reservation(
+                reservation_id=res["id"],
+                start=start_dt,
+                end=end_dt,
+                server_name=res['server']['name'],
+                ip_and_port=res['server']['ip_and_port'],
+                password=res['password'],
+                rcon=rcon,
+                creator_id=ctx.author.id,
+                creator_name=ctx.author.name,
+                channel_id=ctx.channel.id,
+                guild_id=ctx.guild.id,
+                notify_pending=not is_now
+            ))
 
             if not is_now:
-                self.notify_tasks[res["id"]] = self.bot.loop.create_task(self.notify_server_open(
-                    ctx, res['server']['name'], res['server']['ip_and_port'], res['password'], start_dt, res["id"]
-                ))
+                self.schedule_notification(reservation)
         else:
-            await ctx.send(embed=discord.Embed(
+            await live.close(embed=discord.Embed(
                 description=f"Erreur : Impossible de réserver.",
                 color=discord.Color.red()
+            ), view=None)
+        # Après la confirmation : l'historique des choix ne doit ni la retarder ni l'empêcher
+        await self.record_pick(ctx.author.id, group_name, location, map_name, status == 200)
+
+    @commands.command(name="batch")
+    async def batch(self, ctx, *, args: str = None):
+        """Réserve plusieurs serveurs (en parallèle et/ou en blocs consécutifs) en une commande."""
+        if ctx.guild is None:
+            await ctx.send(embed=discord.Embed(
+                description="Erreur : Cette commande ne peut être utilisée que dans un serveur, pas en DM.",
+                color=discord.Color.red()
+            ))
+            return
+
+        now = datetime.now(Config.TIMEZONE)
+        cutoff = (now - Config.RESERVATION_GRACE).timestamp()
+        if any(res.end_ts > cutoff for res in self.reservations.by_creator(ctx.author.id)):
+            await ctx.send(embed=discord.Embed(
+                description=Config.ERROR_MESSAGES["reserve"]["already_active"],
+                color=discord.Color.red()
+            ))
+            return
+
+        parts = args.split() if args else []
+        match = re.fullmatch(r"(\d+)(?:x(\d+))?", parts[0].lower()) if len(parts) >= 2 else None
+        if not match:
+            await ctx.send(embed=discord.Embed(
+                description=Config.ERROR_MESSAGES["batch"]["invalid_format"],
+                color=discord.Color.red()
+            ))
+            return
+        count, blocks = int(match.group(1)), int(match.group(2) or 1)
+        if not 1 <= count * blocks <= Config.BATCH_MAX_RESERVATIONS:
+            await ctx.send(embed=discord.Embed(
+                description=Config.ERROR_MESSAGES["batch"]["too_many"],
+                color=discord.Color.red()
+            ))
+            return
+
+        try:
+            start_dt, password, use_default_rcon = parse_slot(parts[1:], now)
+        except ValueError as e:
+            await ctx.send(embed=discord.Embed(
+                description=Config.ERROR_MESSAGES["reserve"][str(e)],
+                color=discord.Color.red()
+            ))
+            return
+
+        live = LiveMessage(ctx)
+        rcon = Config.DEFAULT_RCON
+        if not use_default_rcon:
+            live.update(embed=discord.Embed(
+                description="Vérifie tes DMs pour fournir le mot de passe RCON.",
+                color=discord.Color.blue()
+            ))
+            rcon = await self.get_rcon(ctx, live)
+            if not rcon:
+                await live.close()
+                return
+
+        # Blocs consécutifs de RESERVATION_DURATION, `count` serveurs sur chacun
+        windows = [
+            (start_dt + i * Config.RESERVATION_DURATION, start_dt + (i + 1) * Config.RESERVATION_DURATION)
+            for i in range(blocks)
+        ]
+        favourites = self.reservations.user_picks(ctx.author.id, "map")
+        map_name = max(favourites, key=favourites.get, default=Config.AVAILABLE_MAPS[0])
+        server_config_file = Config.SERVER_CONFIG_FILE_5CP if map_name.startswith("cp_") else Config.SERVER_CONFIG_FILE_KOTH
+        latency = self.bot.latency_prober
+
+        live.update(embed=discord.Embed(
+            description=f"Réservation de {count * blocks} serveur(s) à partir du {start_dt.strftime('%Y-%m-%d %H:%M')}...",
+            color=discord.Color.blue()
+        ))
+        started = time.perf_counter()
+        try:
+            created = await self.bot.serveme.create_batch(
+                [(start.isoformat(), end.isoformat()) for start, end in windows], count, password, rcon,
+                server_config_file=server_config_file, first_map=map_name,
+                server_key=lambda server: (latency.sort_key(server.get('ip_and_port')), server['id'])
+            )
+        except Exception as e:
+            await live.close(embed=discord.Embed(description=str(e), color=discord.Color.red()))
+            return
+        finally:
+            logger.info(f"!batch {ctx.author.name} : {count}x{blocks} en {(time.perf_counter() - started) * 1000:.0f} ms")
+
+        lines = []
+        rcon_lines = []
+        for (start, end), (_, _, res) in zip((w for w in windows for _ in range(count)), created):
+            reservation = await self.save_reservation(Reservation(
+                reservation_id=res["id"],
+                start=start,
+                end=end,
+                server_name=res['server']['name'],
+                ip_and_port=res['server']['ip_and_port'],
+                password=res['password'],
+                rcon=rcon,
+                creator_id=ctx.author.id,
+                creator_name=ctx.author.name,
+                channel_id=ctx.channel.id,
+                guild_id=ctx.guild.id,
+                notify_pending=start != now
+            ))
+            if reservation.notify_pending:
+                self.schedule_notification(reservation)
+            lines.append(
+                f"**{clean_server_name(res['server']['name'])}** (ID `{res['id']}`) : "
+                f"{start.strftime('%Y-%m-%d %H:%M')} → {end.strftime('%H:%M')}\n"
+                f"```\nconnect {res['server']['ip_and_port']}; password \"{res['password']}\"\n```"
+            )
+            rcon_lines.append(f"rcon_address {res['server']['ip_and_port']}; rcon_password \"{rcon}\"")
+
+        await live.close(embed=discord.Embed(
+            title="✅ Réservations confirmées",
+            description=f"{ctx.author.mention} {len(created)} réservation(s) confirmée(s) !\n\n" + "\n".join(lines) + "\nRCON envoyé en DM.",
+            color=discord.Color.green()
+        ))
+        try:
+            await ctx.author.send(embed=discord.Embed(
+                title="RCON des réservations",
+                description="```\n" + "\n".join(rcon_lines) + "\n```",
+                color=discord.Color.blue()
+            ))
+        except discord.Forbidden:
+            await ctx.send(embed=discord.Embed(
+                description=Config.ERROR_MESSAGES["general"]["dm_blocked"],
+                color=discord.Color.red()
             ))
 
 async def setup(bot):
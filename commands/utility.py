@@ -1,95 +1,68 @@
 import discord
 from discord.ext import commands
 from datetime import datetime, timedelta
-from utils import end_reservation, clean_server_name
+from utils import clean_server_name
+from picker import pick_option
 from config import Config
-from rcon.source import Client
+import metrics
 import asyncio
-import concurrent.futures
-from discord.ext import tasks
+import logging
+import sqlite3
+
+logger = logging.getLogger(__name__)
 
 class UtilityCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self._user_data = None
-        self.cleanup_old_reservations.start()
-
-    def cog_unload(self):
-        """Annule la tâche de nettoyage lors du déchargement."""
-        self.cleanup_old_reservations.cancel()
-
-    @tasks.loop(hours=6)
-    async def cleanup_old_reservations(self):
-        """Nettoie les réservations terminées depuis plus d'une heure."""
-        now = datetime.now(Config.TIMEZONE)
-        for user_id in list(self.user_data.keys()):
-            self.user_data[user_id] = [
-                res for res in self.user_data[user_id]
-                if "reservation_id" not in res or datetime.fromisoformat(res["end"]).astimezone(Config.TIMEZONE) > now - timedelta(hours=1)
-            ]
-            if not self.user_data[user_id]:
-                del self.user_data[user_id]
 
     @property
-    def user_data(self):
-        if self._user_data is None:
-            reservation_cog = self.bot.get_cog("ReservationCommands")
-            if reservation_cog is None:
-                raise RuntimeError("ReservationCommands cog not loaded")
-            self._user_data = reservation_cog.user_data
-        return self._user_data
+    def reservations(self):
+        return self.bot.reservations
 
     async def find_reservation(self, ctx, target: discord.Member | int = None):
         """Trouve une réservation active pour un utilisateur ou un ID."""
-        reservations = []
-        for user_id, user_reservations in self.user_data.items():
-            reservations.extend([res for res in user_reservations if "reservation_id" in res])
-
-        if not reservations:
+        if not self.reservations:
             await ctx.send(embed=discord.Embed(title="Erreur", description=Config.ERROR_MESSAGES["general"]["no_reservation"], color=discord.Color.red()))
-            return None, reservations
+            return None
 
-        target_id = target.id if isinstance(target, discord.Member) else ctx.author.id
         reservation_id = target if isinstance(target, int) else None
 
-        if len(reservations) > 1 and not target:
+        if len(self.reservations) > 1 and not target:
             reservation_list = "\n".join(
-                f"ID `{res['reservation_id']}`: {clean_server_name(res['server_name'])} (Créateur : {res['creator_name']})"
-                for res in reservations
+                f"ID `{res.reservation_id}`: {clean_server_name(res.server_name)} (Créateur : {res.creator_name})"
+                for res in self.reservations.all()
             )
             await ctx.send(embed=discord.Embed(
                 title="Erreur",
                 description=f"Plusieurs réservations actives. Utilise `!changelevel @createur` ou `!changelevel <reservation_id>`.\n\n**Réservations actives :**\n{reservation_list}",
                 color=discord.Color.red()
             ))
-            return None, reservations
+            return None
 
         if reservation_id:
-            reservation = next((res for res in reservations if res["reservation_id"] == reservation_id), None)
+            reservation = self.reservations.get(reservation_id)
             if not reservation:
                 await ctx.send(embed=discord.Embed(title="Erreur", description=f"Aucune réservation avec l'ID {reservation_id}. Vérifie avec `!list`.", color=discord.Color.red()))
-                return None, reservations
+                return None
         elif isinstance(target, discord.Member):
-            reservation = next((res for res in self.user_data.get(target_id, []) if "reservation_id" in res), None)
+            reservation = next(iter(self.reservations.by_creator(target.id)), None)
             if not reservation:
                 await ctx.send(embed=discord.Embed(title="Erreur", description=f"Aucune réservation active pour {target.name}.", color=discord.Color.red()))
-                return None, reservations
+                return None
         else:
-            reservation = next((res for res in reservations if res["creator_id"] == ctx.author.id), None)
-            if not reservation and len(reservations) == 1:
-                reservation = reservations[0]
+            reservation = next(iter(self.reservations.by_creator(ctx.author.id)), None)
+            if not reservation and len(self.reservations) == 1:
+                reservation = self.reservations.all()[0]
             elif not reservation:
                 await ctx.send(embed=discord.Embed(title="Erreur", description="Aucune réservation confirmée pour toi.", color=discord.Color.red()))
-                return None, reservations
+                return None
 
-        now = datetime.now(Config.TIMEZONE)
-        start_dt = datetime.fromisoformat(reservation["start"]).astimezone(Config.TIMEZONE)
-        end_dt = datetime.fromisoformat(reservation["end"]).astimezone(Config.TIMEZONE)
-        if now < start_dt or now > end_dt:
-            await ctx.send(embed=discord.Embed(title="Erreur", description=f"La réservation ID `{reservation['reservation_id']}` n'est pas active.", color=discord.Color.red()))
-            return None, reservations
+        now = datetime.now(Config.TIMEZONE).timestamp()
+        if now < reservation.start_ts or now > reservation.end_ts:
+            await ctx.send(embed=discord.Embed(title="Erreur", description=f"La réservation ID `{reservation.reservation_id}` n'est pas active.", color=discord.Color.red()))
+            return None
 
-        return reservation, reservations
+        return reservation
 
     async def verify_rcon(self, ctx, reservation, rcon_prompt_msg=None):
         """Vérifie le mot de passe RCON via DM."""
@@ -99,12 +72,11 @@ class UtilityCommands(commands.Cog):
                     description="Vérifie tes DMs pour fournir le mot de passe RCON.", 
                     color=discord.Color.blue()
                 ))
-            await ctx.author.send(f"Veuillez fournir le mot de passe RCON pour la réservation ID `{reservation['reservation_id']}`.")
-            def check(m):
-                return m.author == ctx.author and isinstance(m.channel, discord.DMChannel)
-            response = await self.bot.wait_for('message', check=check, timeout=60.0)
+            with metrics.timer("dm_wait_seconds", step="verify_rcon"):
+                await ctx.author.send(f"Veuillez fournir le mot de passe RCON pour la réservation ID `{reservation.reservation_id}`.")
+                response = await self.bot.dm_inbox.wait_for_reply(ctx.author, timeout=60.0)
             rcon = response.content.strip()
-            if rcon != reservation["rcon"]:
+            if rcon != reservation.rcon:
                 raise ValueError("RCON incorrect")
             if rcon_prompt_msg:
                 await rcon_prompt_msg.delete()
@@ -119,19 +91,36 @@ class UtilityCommands(commands.Cog):
             return False
 
     async def run_rcon_command(self, ip, port, rcon_password, command, *args):
-        """Exécute une commande RCON dans un thread pool."""
-        def rcon_task():
-            with Client(ip, port, passwd=rcon_password, timeout=10.0) as client:
-                return client.run(command, *args)
-        
+        """Exécute une commande RCON via le pool de connexions partagé."""
         try:
-            loop = asyncio.get_running_loop()
-            with concurrent.futures.ThreadPoolExecutor() as pool:
-                result = await loop.run_in_executor(pool, rcon_task)
-            return result
+            return await self.bot.rcon_pool.run(ip, port, rcon_password, command, *args)
         except Exception as e:
             raise RuntimeError(f"Erreur RCON : {str(e)}")
 
+    async def fan_out_rcon(self, reservations, command, *args):
+        """Exécute une commande RCON sur plusieurs réservations en parallèle.
+
+        Au plus `RCON_FANOUT_CONCURRENCY` serveurs à la fois, chacun borné à
+        `RCON_FANOUT_TIMEOUT` secondes. Retourne [(réservation, réponse ou exception)].
+        """
+        semaphore = asyncio.Semaphore(Config.RCON_FANOUT_CONCURRENCY)
+
+        async def run_one(reservation):
+            ip, _, port = reservation.ip_and_port.partition(":")
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(
+                        self.run_rcon_command(ip, int(port), reservation.rcon, command, *args),
+                        Config.RCON_FANOUT_TIMEOUT
+                    )
+                except asyncio.TimeoutError:
+                    return RuntimeError(f"Pas de réponse après {Config.RCON_FANOUT_TIMEOUT:g} s")
+                except (RuntimeError, ValueError) as e:
+                    return e
+
+        results = await asyncio.gather(*(run_one(reservation) for reservation in reservations))
+        return list(zip(reservations, results))
+
     @commands.command(name="help")
     async def help_command(self, ctx):
         """Affiche le message d'aide."""
@@ -145,11 +134,11 @@ class UtilityCommands(commands.Cog):
     @commands.command(name="changelevel")
     async def changelevel(self, ctx, target: discord.Member | int = None, map_name: str = None):
         """Change la carte du serveur."""
-        reservation, _ = await self.find_reservation(ctx, target)
+        reservation = await self.find_reservation(ctx, target)
         if not reservation:
             return
 
-        if ctx.author.id != reservation["creator_id"]:
+        if ctx.author.id != reservation.creator_id:
             rcon_prompt_msg = await ctx.send(embed=discord.Embed(
                 description="Vérification du RCON en cours...", 
                 color=discord.Color.blue()
@@ -158,10 +147,10 @@ class UtilityCommands(commands.Cog):
                 return
 
         try:
-            ip_port = reservation["ip_and_port"].split(":")
+            ip_port = reservation.ip_and_port.split(":")
             ip = ip_port[0]
             port = int(ip_port[1])
-            rcon_password = reservation["rcon"]
+            rcon_password = reservation.rcon
         except (IndexError, ValueError):
             await ctx.send(embed=discord.Embed(
                 description="Erreur : Informations RCON invalides.",
@@ -186,22 +175,8 @@ class UtilityCommands(commands.Cog):
                 ))
             return
 
-        embed = discord.Embed(
-            title="Choisir une nouvelle carte",
-            description="\n".join(f"{i+1}. {m}" for i, m in enumerate(Config.AVAILABLE_MAPS)),
-            color=discord.Color.blue()
-        )
-        msg = await ctx.send(embed=embed)
-        for i in range(len(Config.AVAILABLE_MAPS)):
-            await msg.add_reaction(f"{i+1}\u20e3")
-
-        def check(reaction, user):
-            return user == ctx.author and reaction.message.id == msg.id and reaction.emoji in [f"{i+1}\u20e3" for i in range(len(Config.AVAILABLE_MAPS))]
-
-        try:
-            reaction, _ = await self.bot.wait_for('reaction_add', check=check, timeout=60.0)
-            map_name = Config.AVAILABLE_MAPS[int(reaction.emoji[0]) - 1]
-        except asyncio.TimeoutError:
+        map_name = await pick_option(ctx, ctx.author, "Choisir une nouvelle carte", Config.AVAILABLE_MAPS)
+        if map_name is None:
             await ctx.send(embed=discord.Embed(
                 description=Config.ERROR_MESSAGES["general"]["timeout"],
                 color=discord.Color.red()
@@ -226,11 +201,11 @@ class UtilityCommands(commands.Cog):
     @commands.command(name="exec")
     async def exec_config(self, ctx, target: discord.Member | int = None, config: str = None):
         """Exécute une configuration sur le serveur."""
-        reservation, _ = await self.find_reservation(ctx, target)
+        reservation = await self.find_reservation(ctx, target)
         if not reservation:
             return
 
-        if ctx.author.id != reservation["creator_id"]:
+        if ctx.author.id != reservation.creator_id:
             rcon_prompt_msg = await ctx.send(embed=discord.Embed(
                 description="Vérification du RCON en cours...", 
                 color=discord.Color.blue()
@@ -239,10 +214,10 @@ class UtilityCommands(commands.Cog):
                 return
 
         try:
-            ip_port = reservation["ip_and_port"].split(":")
+            ip_port = reservation.ip_and_port.split(":")
             ip = ip_port[0]
             port = int(ip_port[1])
-            rcon_password = reservation["rcon"]
+            rcon_password = reservation.rcon
         except (IndexError, ValueError):
             await ctx.send(embed=discord.Embed(
                 description="Erreur : Informations RCON invalides.",
@@ -267,22 +242,8 @@ class UtilityCommands(commands.Cog):
                 ))
             return
 
-        embed = discord.Embed(
-            title="Choisir une configuration",
-            description="\n".join(f"{i+1}. {c}" for i, c in enumerate(Config.SERVER_CONFIG_FILES)),
-            color=discord.Color.blue()
-        )
-        msg = await ctx.send(embed=embed)
-        for i in range(len(Config.SERVER_CONFIG_FILES)):
-            await msg.add_reaction(f"{i+1}\u20e3")
-
-        def check(reaction, user):
-            return user == ctx.author and reaction.message.id == msg.id and reaction.emoji in [f"{i+1}\u20e3" for i in range(len(Config.SERVER_CONFIG_FILES))]
-
-        try:
-            reaction, _ = await self.bot.wait_for('reaction_add', check=check, timeout=60.0)
-            config_name = Config.SERVER_CONFIG_FILES[int(reaction.emoji[0]) - 1]
-        except asyncio.TimeoutError:
+        config_name = await pick_option(ctx, ctx.author, "Choisir une configuration", Config.SERVER_CONFIG_FILES)
+        if config_name is None:
             await ctx.send(embed=discord.Embed(
                 description=Config.ERROR_MESSAGES["general"]["timeout"],
                 color=discord.Color.red()
@@ -311,25 +272,17 @@ class UtilityCommands(commands.Cog):
         target_name = target.name if isinstance(target, discord.Member) else None
         reservation_id = target if isinstance(target, int) else None
 
-        if target_id not in self.user_data or not self.user_data[target_id]:
-            await ctx.send(embed=discord.Embed(
-                title="Erreur", 
-                description=f"Aucune réservation active pour {'toi' if target_id == ctx.author.id else target_name}.",
-                color=discord.Color.red()
-            ))
-            return
-
-        reservations = [res for res in self.user_data[target_id] if "reservation_id" in res]
+        reservations = self.reservations.by_creator(target_id)
         if not reservations:
             await ctx.send(embed=discord.Embed(
                 title="Erreur", 
-                description=f"Aucune réservation confirmée pour {'toi' if target_id == ctx.author.id else target_name}.",
+                description=f"Aucune réservation active pour {'toi' if target_id == ctx.author.id else target_name}.",
                 color=discord.Color.red()
             ))
             return
 
-        target_res = next((res for res in reservations if res["reservation_id"] == reservation_id), reservations[-1])
-        if reservation_id and target_res["reservation_id"] != reservation_id:
+        target_res = self.reservations.get(reservation_id) if reservation_id else reservations[-1]
+        if target_res is None or target_res.creator_id != target_id:
             await ctx.send(embed=discord.Embed(
                 title="Erreur", 
                 description=f"Aucune réservation avec l'ID {reservation_id}. Vérifie avec `!list`.",
@@ -337,23 +290,25 @@ class UtilityCommands(commands.Cog):
             ))
             return
 
-        start_dt = datetime.fromisoformat(target_res["start"]).astimezone(Config.TIMEZONE)
         embed = discord.Embed(
             title="🔗 Connexion",
             description=(
-                f"**Serveur :** {clean_server_name(target_res['server_name'])}\n"
+                f"**Serveur :** {clean_server_name(target_res.server_name)}\n"
                 f"**Connect info :**\n"
-                f"```\nconnect {target_res['ip_and_port']}; password \"{target_res['password']}\"\n```"
+                f"```\nconnect {target_res.ip_and_port}; password \"{target_res.password}\"\n```"
             ),
             color=discord.Color.blue()
         )
-        embed.set_footer(text=f"ID {target_res['reservation_id']} | Créateur : {target_res['creator_name']} | Début : {start_dt.strftime('%Y-%m-%d %H:%M')} (Paris)")
+        status = self.bot.status_poller.get(target_res.reservation_id)
+        if status:
+            embed.add_field(name="Statut", value=status.summary())
+        embed.set_footer(text=f"ID {target_res.reservation_id} | Créateur : {target_res.creator_name} | Début : {target_res.start.strftime('%Y-%m-%d %H:%M')} (Paris)")
         await ctx.send(embed=embed)
 
     @commands.command(name="list")
     async def list_reservations(self, ctx):
         """Liste toutes les réservations actives."""
-        if not self.user_data:
+        if not self.reservations:
             await ctx.send(embed=discord.Embed(
                 title="Aucune réservation", 
                 description="Aucune réservation active.",
@@ -363,22 +318,16 @@ class UtilityCommands(commands.Cog):
 
         now = datetime.now(Config.TIMEZONE)
         message = ""
-        for user_id, reservations in self.user_data.items():
-            for res in reservations:
-                if "reservation_id" in res:
-                    end_dt = datetime.fromisoformat(res["end"]).astimezone(Config.TIMEZONE)
-                    if now > end_dt + timedelta(hours=1):
-                        continue
-                    start_dt = datetime.fromisoformat(res["start"]).astimezone(Config.TIMEZONE)
-                    message += (
-                        f"**ID `{res['reservation_id']}`**: {clean_server_name(res['server_name'])}\n"
-                        f" - **Créateur** : {res['creator_name']}\n"
-                        f" - **Début** : {start_dt.strftime('%Y-%m-%d %H:%M')} (Paris)\n"
-                        f" - **Fin** : {end_dt.strftime('%Y-%m-%d %H:%M')} (Paris)\n"
-                    )
-                else:
-                    start_dt = datetime.fromisoformat(res["start"]).astimezone(Config.TIMEZONE)
-                    message += f"En attente de confirmation pour {start_dt.strftime('%Y-%m-%d %H:%M')} (Paris) par {res['creator_name']}\n"
+        for res in self.reservations.ending_after((now - Config.RESERVATION_GRACE).timestamp()):
+            message += (
+                f"**ID `{res.reservation_id}`**: {clean_server_name(res.server_name)}\n"
+                f" - **Créateur** : {res.creator_name}\n"
+                f" - **Début** : {res.start.strftime('%Y-%m-%d %H:%M')} (Paris)\n"
+                f" - **Fin** : {res.end.strftime('%Y-%m-%d %H:%M')} (Paris)\n"
+            )
+            status = self.bot.status_poller.get(res.reservation_id)
+            if status:
+                message += f" - **Statut** : {status.summary()}\n"
 
         message += "\nUtilise `!end <reservation_id>` ou `!end` pour terminer tes réservations."
         await ctx.send(embed=discord.Embed(
@@ -390,11 +339,11 @@ class UtilityCommands(commands.Cog):
     @commands.command(name="end")
     async def end(self, ctx, target: discord.Member | int = None):
         """Termine une réservation."""
-        reservation, _ = await self.find_reservation(ctx, target)
+        reservation = await self.find_reservation(ctx, target)
         if not reservation:
             return
 
-        if ctx.author.id != reservation["creator_id"]:
+        if ctx.author.id != reservation.creator_id:
             rcon_prompt_msg = await ctx.send(embed=discord.Embed(
                 description="Vérification du RCON en cours...", 
                 color=discord.Color.blue()
@@ -402,23 +351,19 @@ class UtilityCommands(commands.Cog):
             if not await self.verify_rcon(ctx, reservation, rcon_prompt_msg):
                 return
 
-        response, status = await end_reservation(reservation["reservation_id"])
+        response, status = await self.bot.serveme.end_reservation(reservation.reservation_id)
         if status in (200, 204):
-            if reservation["reservation_id"] in self.bot.get_cog("ReservationCommands").notify_tasks:
-                task = self.bot.get_cog("ReservationCommands").notify_tasks[reservation["reservation_id"]]
-                task.cancel()
-                del self.bot.get_cog("ReservationCommands").notify_tasks[reservation["reservation_id"]]
-
-            if reservation["creator_id"] in self.user_data:
-                self.user_data[reservation["creator_id"]] = [
-                    res for res in self.user_data[reservation["creator_id"]] 
-                    if res.get("reservation_id") != reservation["reservation_id"]
-                ]
-                if not self.user_data[reservation["creator_id"]]:
-                    del self.user_data[reservation["creator_id"]]
+            try:
+                await self.reservations.retry_locked(self.reservations.end, reservation.reservation_id)
+            except sqlite3.Error as e:
+                # Terminée côté serveme.tf : on l'oublie ici, l'écriture est reprise à la synchronisation
+                logger.warning(f"Fin de la réservation {reservation.reservation_id} différée : {e}")
+                self.reservations.defer_end(reservation.reservation_id)
+
+            await self.bot.rcon_pool.close_address(reservation.ip_and_port)
             await ctx.send(embed=discord.Embed(
                 title="✅ Réservation terminée", 
-                description=f"Réservation ID `{reservation['reservation_id']}` terminée.",
+                description=f"Réservation ID `{reservation.reservation_id}` terminée.",
                 color=discord.Color.green()
             ))
         else:
@@ -431,26 +376,18 @@ class UtilityCommands(commands.Cog):
     @commands.command(name="rcon")
     async def rcon(self, ctx):
         """Envoie le mot de passe RCON en DM."""
-        if ctx.author.id not in self.user_data or not self.user_data[ctx.author.id]:
-            await ctx.send(embed=discord.Embed(
-                title="Erreur", 
-                description=Config.ERROR_MESSAGES["general"]["no_reservation"], 
-                color=discord.Color.red()
-            ))
-            return
-
-        reservation = next((res for res in self.user_data[ctx.author.id] if "reservation_id" in res), None)
+        reservation = next(iter(self.reservations.by_creator(ctx.author.id)), None)
         if not reservation:
             await ctx.send(embed=discord.Embed(
                 title="Erreur", 
-                description="Aucune réservation confirmée.", 
+                description=Config.ERROR_MESSAGES["general"]["no_reservation"], 
                 color=discord.Color.red()
             ))
             return
 
         rcon_info = discord.Embed(
-            title=f"RCON pour {clean_server_name(reservation['server_name'])}",
-            description=f"```\nrcon_address {reservation['ip_and_port']}; rcon_password \"{reservation['rcon']}\"\n```",
+            title=f"RCON pour {clean_server_name(reservation.server_name)}",
+            description=f"```\nrcon_address {reservation.ip_and_port}; rcon_password \"{reservation.rcon}\"\n```",
             color=discord.Color.blue()
         )
         try:
@@ -465,6 +402,66 @@ class UtilityCommands(commands.Cog):
                 color=discord.Color.red()
             ))
 
+    @commands.command(name="rconall")
+    @commands.guild_only()
+    @commands.has_permissions(administrator=True)
+    async def rcon_all(self, ctx, command: str = None, *args):
+        """Exécute une commande RCON sur tous les serveurs actifs (administrateurs)."""
+        if not command:
+            await ctx.send(embed=discord.Embed(
+                description="Utilisez `!rconall <commande> [<arguments>]` (ex: `!rconall exec etf2l_6v6_5cp`).",
+                color=discord.Color.red()
+            ))
+            return
+
+        # Seulement les réservations de ce serveur Discord ; les anciennes, sans guild_id, par leur salon
+        targets = [
+            reservation for reservation in self.reservations.active(datetime.now(Config.TIMEZONE).timestamp())
+            if reservation.guild_id == ctx.guild.id
+            or (reservation.guild_id is None and ctx.guild.get_channel(reservation.channel_id) is not None)
+        ]
+        if not targets:
+            await ctx.send(embed=discord.Embed(
+                description=Config.ERROR_MESSAGES["general"]["no_reservation"],
+                color=discord.Color.red()
+            ))
+            return
+
+        results = await self.fan_out_rcon(targets, command, *args)
+        failures = sum(isinstance(result, Exception) for _, result in results)
+        lines = []
+        for reservation, result in results:
+            if isinstance(result, Exception):
+                detail = str(result)
+            else:
+                detail = result.strip().splitlines()[0][:80] if result.strip() else "OK"
+            icon = "❌" if isinstance(result, Exception) else "✅"
+            lines.append(f"{icon} **{clean_server_name(reservation.server_name)}** (ID `{reservation.reservation_id}`) : `{detail}`")
+
+        # Limite de 4096 caractères pour la description d'un embed
+        description = ""
+        for i, line in enumerate(lines):
+            if len(description) + len(line) > 3900:
+                description += f"... et {len(lines) - i} autre(s)"
+                break
+            description += line + "\n"
+
+        await ctx.send(embed=discord.Embed(
+            title=f"`{' '.join((command, *args))[:100]}` : {len(results) - failures}/{len(results)} serveur(s)",
+            description=description,
+            color=discord.Color.green() if not failures else discord.Color.orange() if failures < len(results) else discord.Color.red()
+        ))
+
+    @rcon_all.error
+    async def rcon_all_error(self, ctx, error):
+        if isinstance(error, (commands.MissingPermissions, commands.NoPrivateMessage)):
+            await ctx.send(embed=discord.Embed(
+                description="Erreur : Commande réservée aux administrateurs du serveur.",
+                color=discord.Color.red()
+            ))
+        else:
+            raise error
+
     @commands.command(name="dispo")
     async def dispo(self, ctx):
         """Permet aux utilisateurs d'indiquer leurs disponibilités."""
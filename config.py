@@ -4,12 +4,61 @@ import pytz
 class Config:
     TIMEZONE = pytz.timezone("Europe/Paris")
     RESERVATION_DURATION = timedelta(hours=2)
+    RESERVATION_GRACE = timedelta(hours=1)  # délai après la fin avant d'oublier une réservation
+    EXPIRY_MAX_SLEEP = 3600  # secondes max entre deux réveils du timer d'expiration
+    STATE_DB = "reservations.db"  # base SQLite des réservations (survit aux redémarrages)
+    STATE_DB_BUSY_TIMEOUT = 20  # millisecondes d'attente bloquante quand un autre processus écrit dans la base
+    STATE_DB_LOCK_WAIT = 5.0  # secondes de nouveaux essais, sans bloquer la boucle, avant d'abandonner une écriture
+    DM_RELAY_POLL = 0.5  # secondes entre deux relevés des DM relayés par un autre processus
+    DM_RELAY_MAX_AGE = 120  # secondes avant d'oublier un DM relayé que personne n'a attendu
     DEFAULT_RCON = "fishrcon"
     SERVER_CONFIG_FILE_5CP = "etf2l_6v6_5cp"
     SERVER_CONFIG_FILE_KOTH = "etf2l_6v6_koth"
     SERVER_CONFIG_FILES = [SERVER_CONFIG_FILE_5CP, SERVER_CONFIG_FILE_KOTH]
-    
-    EMOJIS = ['🇦', '🇧', '🇨', '🇩', '🇪', '🇫', '🇬', '🇭', '🇮', '🇯']
+
+    # Client HTTP serveme.tf
+    HTTP_POOL_SIZE = 20
+    HTTP_DNS_CACHE_TTL = 300  # secondes
+    HTTP_KEEPALIVE_TIMEOUT = 60  # secondes
+    PREFILLED_TTL = 600  # secondes avant rafraîchissement en tâche de fond du modèle /reservations/new
+    PREFILLED_MAX_AGE = 3600  # secondes au-delà desquelles le modèle est retéléchargé avant usage
+    AVAILABILITY_TTL = 90  # secondes de cache des résultats find_servers par créneau
+    PREFETCH_SLOTS = ["20:00", "21:00"]  # créneaux du soir préchargés en tâche de fond
+    PREFETCH_WINDOW = timedelta(hours=4)  # préchargement seulement si le créneau commence dans ce délai
+    SYNC_INTERVAL = 60  # secondes entre deux synchronisations des réservations avec serveme.tf
+    AUTO_PICK_WEIGHTS = {"group": 3.0, "location": 2.0, "success": 1.0}  # poids du score `!reserve --auto`
+    METRICS_HOST = "127.0.0.1"  # interface du serveur de métriques (/metrics)
+    METRICS_PORT = 9108  # port du serveur de métriques, None pour le désactiver
+    LOOP_WATCHDOG_INTERVAL = 0.05  # secondes entre deux battements de la sonde de boucle d'événements
+    LOOP_WATCHDOG_THRESHOLD = 0.1  # secondes de retard au-delà desquelles la boucle est considérée bloquée
+    LIVE_MESSAGE_DELAY = 0.5  # secondes pendant lesquelles les mises à jour d'un message de statut sont regroupées
+    BATCH_MAX_RESERVATIONS = 6  # réservations maximum par `!batch`
+    BATCH_CONCURRENCY = 3  # appels serveme.tf simultanés pendant un `!batch`
+    API_RATE = 2.0  # requêtes par seconde vers serveme.tf
+    API_BURST = 5  # requêtes pouvant partir d'un coup
+    API_MAX_QUEUE = 50  # requêtes en attente au-delà desquelles on refuse
+    API_MAX_RETRIES = 3  # nouvelles tentatives après un HTTP 429
+    API_BACKOFF_BASE = 1.0  # secondes, doublées à chaque tentative (avec jitter)
+    API_BACKOFF_MAX = 30.0  # secondes
+
+    # Pool RCON
+    RCON_TIMEOUT = 10.0  # secondes
+    RCON_IDLE_TIMEOUT = 300  # secondes avant fermeture d'une connexion inutilisée
+    RCON_HEALTHCHECK_AFTER = 30  # secondes d'inactivité avant de tester une connexion réutilisée
+    RCON_FANOUT_CONCURRENCY = 10  # serveurs contactés en même temps par `!rconall`
+    RCON_FANOUT_TIMEOUT = 5.0  # secondes accordées à chaque serveur par `!rconall`
+    STATUS_TICK = 5  # secondes entre deux réveils du relevé des statuts
+    STATUS_INTERVAL = 30  # secondes entre deux `status` d'un serveur avec des joueurs
+    STATUS_FAST_INTERVAL = 10  # secondes entre deux `status` juste après l'ouverture
+    STATUS_WARMUP = timedelta(minutes=5)  # durée du relevé rapide après l'ouverture
+    STATUS_IDLE_MAX = 300  # intervalle maximal pour un serveur vide ou injoignable
+    STATUS_MAX_AGE = 600  # secondes avant de considérer un statut comme périmé
+    STATUS_CONCURRENCY = 10  # serveurs interrogés en même temps
+    LATENCY_INTERVAL = 60  # secondes entre deux tournées de mesure de latence
+    LATENCY_TIMEOUT = 1.0  # secondes avant de considérer un serveur injoignable
+    LATENCY_MAX_AGE = 600  # secondes avant d'oublier une mesure ou une adresse plus proposée
+    LATENCY_ALPHA = 0.3  # poids d'une nouvelle mesure dans la moyenne lissée
+    LATENCY_CONCURRENCY = 20  # sondes simultanées
 
     ERROR_MESSAGES = {
         "reserve": {
@@ -18,7 +67,12 @@ class Config:
             "no_servers": "Erreur : Aucun serveur disponible.",
             "invalid_date": "Erreur : Utilise YYYY-MM-DD, ex: `2025-05-05`.",
             "invalid_time": "Erreur : Utilise 'now', HHhMM ou HH:MM, ex: `20h00` ou `20:00`.",
-            "date_too_far": "Erreur : La date est trop éloignée (max 1 an)."
+            "date_too_far": "Erreur : La date est trop éloignée (max 1 an).",
+            "invalid_map": "Erreur : Carte inconnue pour `--auto`, ex: `!reserve now --auto cp_process_f12`."
+        },
+        "batch": {
+            "invalid_format": "Utilisez `!batch <serveurs>[x<blocs>] now|<heure>|<date> <heure> [<mot de passe>]` (ex: `!batch 2 20:00` pour deux serveurs, `!batch 1x2 20:00` pour un bloc de 4h).",
+            "too_many": f"Erreur : {BATCH_MAX_RESERVATIONS} réservations maximum par commande."
         },
         "general": {
             "dm_blocked": "Erreur : DMs bloqués. Ouvre tes DMs pour recevoir le RCON.",
@@ -33,9 +87,13 @@ class Config:
         "━━━━━━━━━━━━━━━━━━\n"
         "🔹 **Commandes de Réservation**\n"
         "━━━━━━━━━━━━━━━━━━\n"
-        "🖥️ `!reserve now | <heure> | [<date> <heure>] [<mot de passe>]`\n"
-        " ↪ Réserve un serveur pour 2h\n"
-        "  Exemples : `!reserve now`, `!reserve 2025-05-05 20:00`\n\n"
+        "🖥️ `!reserve now | <heure> | [<date> <heure>] [<mot de passe>] [--auto [<carte>]]`\n"
+        " ↪ Réserve un serveur pour 2h (`--auto` : serveur et carte choisis d'après ton historique)\n"
+        "  Exemples : `!reserve now`, `!reserve 2025-05-05 20:00`, `!reserve now --auto cp_process_f12`\n\n"
+
+        "📦 `!batch <serveurs>[x<blocs>] now | <heure> | [<date> <heure>] [<mot de passe>]`\n"
+        " ↪ Réserve plusieurs serveurs d'un coup (blocs de 2h consécutifs), tout ou rien\n"
+        "  Exemples : `!batch 2 20:00` (deux serveurs), `!batch 1x2 20:00` (bloc de 4h)\n\n"
 
         "🔗 `!connect [<@user> | <ID>]`\n"
         " ↪ Affiche les infos de connexion\n"
@@ -62,6 +120,10 @@ class Config:
         "🔐 `!rcon`\n"
         " ↪ Envoie le mot de passe RCON en DM\n\n"
 
+        "📡 `!rconall <commande> [<arguments>]`\n"
+        " ↪ Lance une commande RCON sur tous les serveurs actifs (admins)\n"
+        "  Exemple : `!rconall exec etf2l_6v6_5cp`\n\n"
+
         "━━━━━━━━━━━━━━━━━━\n"
         "🔹 **Utilitaires**\n"
         "━━━━━━━━━━━━━━━━━━\n"
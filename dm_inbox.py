@@ -0,0 +1,98 @@
+import asyncio
+import collections
+import logging
+import sqlite3
+import time
+import discord
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class RelayedMessage:
+    """DM reçu par un autre processus et transmis par la base partagée."""
+
+    __slots__ = ("author_id", "content")
+
+    def __init__(self, author_id, content):
+        self.author_id = author_id
+        self.content = content
+
+class DMInbox:
+    """Réponses attendues en DM, indexées par utilisateur.
+
+    Remplace les `bot.wait_for('message', check=...)` : discord.py appelle la fonction
+    check de chaque attente en cours sur chaque message reçu, alors qu'ici un message
+    n'est confronté qu'aux attentes de son auteur (un accès dict). Les attentes d'un
+    même utilisateur sont servies dans l'ordre, une réponse chacune.
+
+    En déploiement partagé, Discord ne livre les DM qu'au shard 0 : un DM que personne
+    n'attend ici est déposé dans `relay` (le ReservationStore partagé), et tant qu'il
+    y a des attentes, elles relèvent toutes les `DM_RELAY_POLL` secondes les DM
+    déposés par les autres processus.
+    """
+
+    def __init__(self, relay=None):
+        self._waiters = {}
+        self.relay = relay
+        self._poller = None
+
+    def __len__(self):
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    async def wait_for_reply(self, user, timeout=None):
+        """Attend le prochain DM de `user` ; lève asyncio.TimeoutError après `timeout` secondes."""
+        entry = (time.time(), asyncio.get_running_loop().create_future())
+        waiters = self._waiters.setdefault(user.id, collections.deque())
+        waiters.append(entry)
+        if self.relay is not None and (self._poller is None or self._poller.done()):
+            self._poller = asyncio.create_task(self._poll_relay())
+        try:
+            return await asyncio.wait_for(entry[1], timeout)
+        finally:
+            if entry in waiters:
+                waiters.remove(entry)
+            if not waiters and self._waiters.get(user.id) is waiters:
+                del self._waiters[user.id]
+
+    def _deliver(self, user_id, message, sent_at):
+        """Remet `message` à la plus ancienne attente de l'utilisateur ouverte avant `sent_at`."""
+        waiters = self._waiters.get(user_id)
+        while waiters:
+            since, future = waiters[0]
+            if since > sent_at:
+                return False  # DM antérieur à la question : ce n'est pas la réponse
+            waiters.popleft()
+            if not future.done():
+                future.set_result(message)
+                return True
+        return False
+
+    async def on_message(self, message):
+        """Écouteur `on_message` : remet un DM à la plus ancienne attente de son auteur, sinon le relaie."""
+        if not isinstance(message.channel, discord.DMChannel):
+            return
+        if self._deliver(message.author.id, message, time.time()) or self.relay is None or message.author.bot:
+            return
+        try:
+            await self.relay.retry_locked(self.relay.relay_dm, message.author.id, message.content)
+        except sqlite3.Error as e:
+            logger.warning(f"DM de {message.author.id} non relayé : {e}")
+
+    async def _poll_relay(self):
+        while self._waiters:
+            await asyncio.sleep(Config.DM_RELAY_POLL)
+            try:
+                relayed = await self.relay.retry_locked(self.relay.take_relayed_dms, list(self._waiters))
+            except sqlite3.Error as e:
+                logger.warning(f"Relevé des DM relayés impossible : {e}")
+                continue
+            for user_id, content, sent_at in relayed:
+                self._deliver(user_id, RelayedMessage(user_id, content), sent_at)
+
+    async def close(self):
+        if self._poller is not None:
+            self._poller.cancel()
+            try:
+                await self._poller
+            except asyncio.CancelledError:
+                pass
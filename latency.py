@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import time
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+A2S_INFO = b"\xFF\xFF\xFF\xFFTSource Engine Query\x00"
+
+class _ProbeProtocol(asyncio.DatagramProtocol):
+    def __init__(self, future):
+        self.future = future
+
+    def datagram_received(self, data, addr):
+        if not self.future.done():
+            self.future.set_result(time.perf_counter())
+
+    def error_received(self, exc):
+        if not self.future.done():
+            self.future.set_exception(exc)
+
+async def probe_udp(host, port, timeout):
+    """Latence (ms) d'une requête A2S_INFO ; toute réponse (infos ou challenge) compte."""
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    transport, _ = await loop.create_datagram_endpoint(lambda: _ProbeProtocol(future), remote_addr=(host, port))
+    try:
+        sent = time.perf_counter()
+        transport.sendto(A2S_INFO)
+        received = await asyncio.wait_for(future, timeout)
+        return (received - sent) * 1000
+    finally:
+        transport.close()
+
+async def probe_tcp(host, port, timeout):
+    """Latence (ms) d'une ouverture de connexion TCP (port RCON du serveur)."""
+    sent = time.perf_counter()
+    _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    elapsed = (time.perf_counter() - sent) * 1000
+    writer.close()
+    return elapsed
+
+class _Sample:
+    __slots__ = ("latency", "measured_at", "failures", "seen_at")
+
+    def __init__(self):
+        self.latency = None
+        self.measured_at = 0.0
+        self.failures = 0
+        self.seen_at = 0.0
+
+class LatencyProber:
+    """Mesure en tâche de fond la latence vers les serveurs serveme.tf connus (« ip:port »).
+
+    Les adresses sont signalées via `track` (résultats de find_servers) puis sondées toutes
+    les `LATENCY_INTERVAL` secondes : A2S_INFO en UDP, connexion TCP sinon. Les mesures sont
+    lissées (moyenne exponentielle) et oubliées après `LATENCY_MAX_AGE` secondes, de même que
+    les adresses qui ne sont plus proposées.
+    """
+
+    def __init__(self, interval=Config.LATENCY_INTERVAL, timeout=Config.LATENCY_TIMEOUT):
+        self.interval = interval
+        self.timeout = timeout
+        self._samples = {}
+        self._task = None
+
+    def track(self, addresses):
+        """Ajoute des adresses à sonder et démarre la tâche de fond si besoin."""
+        now = time.monotonic()
+        for address in addresses:
+            self._samples.setdefault(address, _Sample()).seen_at = now
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def latency(self, address):
+        """Latence lissée en ms, inf si injoignable, None si inconnue ou périmée."""
+        sample = self._samples.get(address)
+        if sample is None or time.monotonic() - sample.measured_at > Config.LATENCY_MAX_AGE:
+            return None
+        if sample.failures:
+            return float("inf")
+        return sample.latency
+
+    def sort_key(self, address):
+        """Clé de tri : serveurs mesurés du plus rapide au plus lent, puis inconnus, puis injoignables."""
+        latency = self.latency(address)
+        if latency is None:
+            return (1, 0.0)
+        if latency == float("inf"):
+            return (2, 0.0)
+        return (0, latency)
+
+    async def probe(self, address):
+        """Sonde une adresse et met à jour sa mesure."""
+        host, _, port = address.partition(":")
+        sample = self._samples.setdefault(address, _Sample())
+        try:
+            try:
+                latency = await probe_udp(host, int(port), self.timeout)
+            except (asyncio.TimeoutError, OSError):
+                latency = await probe_tcp(host, int(port), self.timeout)
+        except (asyncio.TimeoutError, OSError, ValueError):
+            sample.failures += 1
+            sample.measured_at = time.monotonic()
+            return
+        if sample.latency is None or sample.failures:
+            sample.latency = latency
+        else:
+            sample.latency += Config.LATENCY_ALPHA * (latency - sample.latency)
+        sample.failures = 0
+        sample.measured_at = time.monotonic()
+
+    async def probe_all(self):
+        """Sonde toutes les adresses suivies, avec une concurrence bornée."""
+        semaphore = asyncio.Semaphore(Config.LATENCY_CONCURRENCY)
+
+        async def bounded(address):
+            async with semaphore:
+                await self.probe(address)
+
+        await asyncio.gather(*(bounded(address) for address in list(self._samples)))
+
+    async def close(self):
+        """Arrête la tâche de fond."""
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _run(self):
+        while self._samples:
+            await self.probe_all()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            for address, sample in list(self._samples.items()):
+                if now - sample.seen_at > Config.LATENCY_MAX_AGE:
+                    del self._samples[address]
@@ -0,0 +1,68 @@
+import asyncio
+import logging
+import discord
+from config import Config
+import metrics
+
+logger = logging.getLogger(__name__)
+
+class LiveMessage:
+    """Message de statut unique, tenu à jour par une file de modifications anti-rebond.
+
+    `update` enregistre le dernier état voulu (content, embed, view) ; le premier part
+    tout de suite, les suivants arrivés dans les `delay` secondes sont fusionnés en une
+    seule modification du message. Une réponse à une interaction sur le message (`respond`)
+    applique l'état en attente sans appel supplémentaire.
+    """
+
+    def __init__(self, destination, delay=Config.LIVE_MESSAGE_DELAY):
+        self.destination = destination
+        self.delay = delay
+        self.message = None
+        self._state = {}
+        self._dirty = False
+        self._flusher = None
+        self._lock = asyncio.Lock()
+
+    def update(self, **fields):
+        """Change l'état du message ; l'envoi est regroupé avec les changements proches."""
+        self._state.update(fields)
+        self._dirty = True
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        # Un `update` arrivé pendant l'envoi ne relance pas de tâche : on reboucle ici
+        while self._dirty:
+            if self.message is not None:
+                await asyncio.sleep(self.delay)
+            await self.flush()
+
+    async def flush(self):
+        """Envoie tout de suite l'état en attente, s'il y en a un."""
+        async with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            state = dict(self._state)
+            try:
+                if self.message is None:
+                    self.message = await self.destination.send(**state)
+                else:
+                    await self.message.edit(**state)
+            except discord.HTTPException as e:
+                logger.warning(f"Mise à jour du message de statut impossible : {e}")
+
+    async def respond(self, interaction):
+        """Répond à une interaction sur le message en y appliquant l'état en attente."""
+        async with self._lock:
+            self._dirty = False
+            with metrics.timer("discord_request_seconds", method="POST", route="/interactions/{interaction_id}/{interaction_token}/callback"):
+                await interaction.response.edit_message(**self._state)
+
+    async def close(self, **fields):
+        """Applique un dernier état et l'envoie sans attendre la fin du délai."""
+        if fields:
+            self._state.update(fields)
+            self._dirty = True
+        await self.flush()
@@ -0,0 +1,75 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from config import Config
+import metrics
+
+logger = logging.getLogger(__name__)
+
+STACK_LIMIT = 15  # cadres gardés dans la pile d'un blocage, les plus profonds
+
+class LoopWatchdog:
+    """Surveille le retard de la boucle d'événements et capture la pile des blocages.
+
+    Un battement sur la boucle se rendort toutes les `interval` secondes et enregistre
+    son retard de réveil dans `event_loop_lag_seconds`. Un thread à part vérifie que le
+    battement avance : s'il a plus de `threshold` secondes de retard, la boucle est
+    coincée dans un appel synchrone, et la pile du thread de la boucle est capturée à
+    ce moment-là (une fois par blocage) puis journalisée. Coût : un réveil de
+    coroutine par intervalle et un réveil de thread par demi-seuil.
+    """
+
+    def __init__(self, interval=Config.LOOP_WATCHDOG_INTERVAL, threshold=Config.LOOP_WATCHDOG_THRESHOLD):
+        self.interval = interval
+        self.threshold = threshold
+        self.max_lag = 0.0
+        self.stalls = 0
+        self.last_stack = None
+        self._beat = time.monotonic()
+        self._reported = None
+        self._loop_thread = None
+        self._task = None
+        self._stop = None
+
+    def start(self):
+        """Démarre le battement et le thread de surveillance (sans effet s'ils tournent déjà)."""
+        if self._task is not None and not self._task.done():
+            return
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop = threading.Event()
+        self._task = asyncio.create_task(self._heartbeat())
+        threading.Thread(target=self._watch, args=(self._stop,), name="loop-watchdog", daemon=True).start()
+
+    async def close(self):
+        """Arrête le battement et le thread."""
+        if self._stop is not None:
+            self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _heartbeat(self):
+        while True:
+            self._beat = before = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = max(time.monotonic() - before - self.interval, 0.0)
+            metrics.observe("event_loop_lag_seconds", lag)
+            self.max_lag = max(self.max_lag, lag)
+            if lag >= self.threshold:
+                self.stalls += 1
+                metrics.inc("event_loop_stalls_total")
+                logger.warning(f"Boucle d'événements bloquée {lag * 1000:.0f} ms")
+
+    def _watch(self, stop):
+        while not stop.wait(self.threshold / 2):
+            beat = self._beat
+            if beat != self._reported and time.monotonic() - beat >= self.interval + self.threshold:
+                self._reported = beat
+                frame = sys._current_frames().get(self._loop_thread)
+                if frame is None:
+                    continue
+                self.last_stack = "".join(traceback.format_stack(frame, limit=STACK_LIMIT))
+                logger.warning(f"Boucle d'événements bloquée depuis plus de {self.threshold * 1000:.0f} ms, pile :\n{self.last_stack}")
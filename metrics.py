@@ -0,0 +1,137 @@
+import bisect
+import logging
+import time
+from contextlib import contextmanager
+from aiohttp import web
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Bornes des histogrammes (secondes), de la milliseconde aux attentes de DM
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+class Histogram:
+    """Histogramme à bornes fixes : une observation coûte une recherche dichotomique et deux additions."""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Quantile estimé par interpolation linéaire dans le seau concerné (comme histogram_quantile)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = BUCKETS[i - 1] if i > 0 else 0.0
+                upper = BUCKETS[i] if i < len(BUCKETS) else BUCKETS[-1]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return BUCKETS[-1]
+
+class Registry:
+    """Histogrammes et compteurs étiquetés, plus des jauges lues à la demande."""
+
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self.gauge_sources = []
+
+    def observe(self, name, seconds, **labels):
+        """Ajoute une durée à l'histogramme `name` pour ces étiquettes."""
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(seconds)
+
+    def inc(self, name, amount=1, **labels):
+        """Incrémente le compteur `name` pour ces étiquettes."""
+        key = (name, tuple(sorted(labels.items())))
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Mesure la durée du bloc ; une exception compte aussi dans `<nom sans _seconds>_errors_total`."""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.inc(f"{name.removesuffix('_seconds')}_errors_total", **labels)
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def add_gauges(self, source):
+        """Ajoute une fonction renvoyant {nom: valeur}, lue à chaque export."""
+        self.gauge_sources.append(source)
+
+    def snapshot(self):
+        """p50/p95/p99, nombre et somme par histogramme."""
+        return {
+            (name, labels): {
+                **{f"p{int(q * 100)}": histogram.quantile(q) for q in QUANTILES},
+                "count": histogram.count,
+                "sum": histogram.sum
+            }
+            for (name, labels), histogram in self.histograms.items()
+        }
+
+    def render(self):
+        """Export au format texte Prometheus (histogrammes, quantiles estimés, compteurs, jauges)."""
+        lines = []
+        for (name, labels), histogram in sorted(self.histograms.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKETS + (float("inf"),), histogram.counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f"{name}_bucket{_labels(labels, le=le)} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {histogram.sum:.6f}")
+            lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+            for q in QUANTILES:
+                lines.append(f"{name}_quantile{_labels(labels, quantile=f'{q:g}')} {histogram.quantile(q):.6f}")
+        for (name, labels), value in sorted(self.counters.items()):
+            lines.append(f"{name}{_labels(labels)} {value}")
+        for source in self.gauge_sources:
+            try:
+                for name, value in sorted(source().items()):
+                    lines.append(f"{name} {value}")
+            except Exception as e:
+                logger.warning(f"Jauges indisponibles : {e}")
+        return "\n".join(lines) + "\n"
+
+def _labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + "}"
+
+REGISTRY = Registry()
+observe = REGISTRY.observe
+inc = REGISTRY.inc
+timer = REGISTRY.timer
+
+async def start_server(registry=REGISTRY, host=Config.METRICS_HOST, port=Config.METRICS_PORT):
+    """Sert `/metrics` en local ; renvoie le runner à fermer avec `cleanup()`."""
+    async def handle(request):
+        return web.Response(text=registry.render(), content_type="text/plain")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"Métriques disponibles sur http://{host}:{port}/metrics")
+    return runner
@@ -0,0 +1,126 @@
+import asyncio
+import time
+import discord
+import metrics
+
+MAX_OPTIONS_PER_SELECT = 25  # limite Discord par menu déroulant
+MAX_SELECTS = 5  # un menu par ligne de composants, 5 lignes par message
+
+def option_selects(options, on_choice, max_selects=MAX_SELECTS, title=None):
+    """Menus déroulants couvrant `options` (25 par menu) ; `on_choice(interaction, option)` au choix."""
+    options = list(options)[:MAX_OPTIONS_PER_SELECT * max_selects]
+    selects = []
+    for start in range(0, len(options), MAX_OPTIONS_PER_SELECT):
+        chunk = options[start:start + MAX_OPTIONS_PER_SELECT]
+        placeholder = title or "Choisir..."
+        if len(options) > MAX_OPTIONS_PER_SELECT:
+            placeholder = f"{title + ' : ' if title else ''}{chunk[0]} … {chunk[-1]}"
+        select = discord.ui.Select(
+            placeholder=str(placeholder)[:150],
+            options=[discord.SelectOption(label=str(option)[:100], value=str(start + i)) for i, option in enumerate(chunk)]
+        )
+
+        def make_callback(select):
+            async def callback(interaction):
+                await on_choice(interaction, options[int(select.values[0])])
+            return callback
+
+        select.callback = make_callback(select)
+        selects.append(select)
+    return selects
+
+class UserView(discord.ui.View):
+    """Vue dont seuls les composants de `user` sont utilisables."""
+
+    def __init__(self, user, timeout=60.0):
+        super().__init__(timeout=timeout)
+        self.user = user
+
+    async def interaction_check(self, interaction):
+        if interaction.user.id != self.user.id:
+            await interaction.response.send_message("Ce choix ne t'appartient pas.", ephemeral=True)
+            return False
+        return True
+
+class OptionPicker(UserView):
+    """Menus déroulants réservés à un utilisateur ; `choice` reçoit l'option choisie.
+
+    Un seul envoi de message remplace l'ancien message + une réaction par option. Au-delà
+    de 25 options, elles sont réparties sur plusieurs menus (125 au maximum).
+    """
+
+    def __init__(self, user, options, timeout=60.0):
+        super().__init__(user, timeout=timeout)
+        self.choice = None
+        for select in option_selects(options, self._on_choice):
+            self.add_item(select)
+
+    async def _on_choice(self, interaction, option):
+        self.choose(option)
+        for item in self.children:
+            item.disabled = True
+        await interaction.response.edit_message(view=self)
+
+    def choose(self, option):
+        """Enregistre le choix et débloque `wait()`."""
+        self.choice = option
+        self.stop()
+
+class FormPicker(UserView):
+    """Plusieurs questions sur un même LiveMessage, chacune avec ses menus déroulants.
+
+    Les questions peuvent être posées en parallèle ; un choix retire ses menus et la
+    réponse à l'interaction met à jour le message (état du LiveMessage compris).
+    """
+
+    def __init__(self, user, live, timeout=None):
+        super().__init__(user, timeout=timeout)
+        self.live = live
+
+    async def ask(self, title, options, timeout=60.0):
+        """Ajoute une question au message et renvoie l'option choisie, ou None si le délai expire."""
+        future = asyncio.get_running_loop().create_future()
+
+        async def on_choice(interaction, option):
+            if not future.done():
+                future.set_result(option)
+            self._remove(selects)
+            await self.live.respond(interaction)
+
+        selects = option_selects(options, on_choice, max_selects=MAX_SELECTS - len(self.children), title=title)
+        for select in selects:
+            self.add_item(select)
+        self.live.update(view=self)
+        started = time.perf_counter()
+        outcome = "choix"
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            outcome = "délai"
+            return None
+        finally:
+            metrics.observe("picker_wait_seconds", time.perf_counter() - started, title=title, outcome=outcome)
+            if any(select in self.children for select in selects):
+                self._remove(selects)
+
+    def _remove(self, selects):
+        for select in selects:
+            if select in self.children:
+                self.remove_item(select)
+        self.live.update(view=self if self.children else None)
+
+async def pick_option(destination, user, title, options, timeout=60.0):
+    """Envoie un menu de choix et renvoie l'option choisie par `user`, ou None si le délai expire."""
+    view = OptionPicker(user, options, timeout=timeout)
+    msg = await destination.send(embed=discord.Embed(title=title, color=discord.Color.blue()), view=view)
+    started = time.perf_counter()
+    try:
+        timed_out = await view.wait()
+    except asyncio.CancelledError:
+        view.stop()
+        raise
+    metrics.observe("picker_wait_seconds", time.perf_counter() - started, title=title, outcome="délai" if timed_out else "choix")
+    if timed_out:
+        await msg.edit(view=None)
+        return None
+    return view.choice
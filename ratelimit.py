@@ -0,0 +1,159 @@
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from config import Config
+
+PRIORITY_HIGH = 0  # création / fin de réservation
+PRIORITY_NORMAL = 1  # recherche de serveurs
+PRIORITY_LOW = 2  # modèle, synchronisation, préchargement
+
+class RateLimitQueueFull(Exception):
+    """La file d'attente vers l'API est pleine."""
+
+class RequestScheduler:
+    """Seau à jetons avec file d'attente à priorités, devant tous les appels à serveme.tf.
+
+    Les requêtes passent immédiatement tant qu'il reste des jetons (`API_RATE` par
+    seconde, jusqu'à `API_BURST`) ; au-delà, elles attendent dans une file bornée, servies
+    par priorité puis par ordre d'arrivée. Les en-têtes RateLimit-* et Retry-After
+    renvoyés par l'API mettent le seau en pause ou le resynchronisent, et chaque 429
+    divise le débit par deux, regagné progressivement au fil des succès (AIMD).
+    """
+
+    def __init__(self, rate=Config.API_RATE, burst=Config.API_BURST, max_queue=Config.API_MAX_QUEUE):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.max_queue = max_queue
+        self.tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._queue = []
+        self._seq = itertools.count()
+        self._wakeup = None
+        self._worker = None
+        # Métriques
+        self.requests = 0
+        self.queued = 0
+        self.rejected = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def queue_depth(self):
+        return len(self._queue)
+
+    def metrics(self):
+        """Instantané des métriques de la file."""
+        return {
+            "queue_depth": self.queue_depth,
+            "rate": self.rate,
+            "requests": self.requests,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "throttled": self.throttled,
+            "wait_avg": self.total_wait / self.requests if self.requests else 0.0,
+            "wait_max": self.max_wait,
+        }
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _delay(self):
+        """Secondes avant qu'un jeton soit disponible (0 si tout de suite)."""
+        now = time.monotonic()
+        if now < self._paused_until:
+            return self._paused_until - now
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def _record(self, waited):
+        self.requests += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+
+    async def acquire(self, priority=PRIORITY_NORMAL):
+        """Attend un jeton ; lève RateLimitQueueFull si la file est pleine."""
+        if not self._queue and self._delay() == 0:
+            self.tokens -= 1
+            self._record(0.0)
+            return
+        if len(self._queue) >= self.max_queue:
+            self.rejected += 1
+            raise RateLimitQueueFull("Erreur : Trop de requêtes en attente vers serveme.tf. Réessayez dans un instant.")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._seq), future))
+        self.queued += 1
+        if self._worker is None or self._worker.done():
+            self._wakeup = asyncio.Event()
+            self._worker = asyncio.create_task(self._dispatch())
+        self._wakeup.set()
+        started = time.monotonic()
+        await future
+        self._record(time.monotonic() - started)
+
+    async def _dispatch(self):
+        while True:
+            while self._queue and self._queue[0][2].done():
+                heapq.heappop(self._queue)  # Appelant annulé
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            delay = self._delay()
+            if delay == 0:
+                self.tokens -= 1
+                heapq.heappop(self._queue)[2].set_result(None)
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def pause(self, seconds):
+        """Suspend l'envoi de requêtes pendant `seconds` secondes."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self.tokens = min(self.tokens, 0.0)
+
+    def update_from_headers(self, headers):
+        """Resynchronise le seau sur les en-têtes RateLimit-Limit / -Remaining / -Reset."""
+        limit = headers.get("RateLimit-Limit") or headers.get("X-RateLimit-Limit")
+        if limit and limit.isdigit():
+            self.burst = max(1, min(self.burst, int(limit)))
+        remaining = headers.get("RateLimit-Remaining") or headers.get("X-RateLimit-Remaining")
+        if remaining is None:
+            return
+        try:
+            remaining = int(remaining)
+            reset = float(headers.get("RateLimit-Reset") or headers.get("X-RateLimit-Reset") or 0)
+        except ValueError:
+            return
+        self._refill(time.monotonic())
+        self.tokens = min(self.tokens, remaining)
+        if remaining <= 0 and reset > 0:
+            # Reset en secondes restantes, ou en timestamp epoch selon les API
+            self.pause(reset - time.time() if reset > 1e9 else reset)
+
+    def on_throttled(self, attempt, retry_after=None):
+        """Réagit à un HTTP 429 : pause du seau, backoff exponentiel avec jitter."""
+        self.throttled += 1
+        self.rate = max(self.max_rate / 16, self.rate / 2)
+        backoff = min(Config.API_BACKOFF_MAX, Config.API_BACKOFF_BASE * 2 ** attempt)
+        self.pause(max(retry_after or 0.0, backoff * random.uniform(0.5, 1.0)))
+
+    def on_success(self):
+        """Regagne progressivement le débit après une réponse acceptée."""
+        self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+        for _, _, future in self._queue:
+            future.cancel()
+        self._queue.clear()
@@ -0,0 +1,150 @@
+import asyncio
+import itertools
+import struct
+from config import Config
+
+SERVERDATA_AUTH = 3
+SERVERDATA_AUTH_RESPONSE = 2
+SERVERDATA_EXECCOMMAND = 2
+SERVERDATA_RESPONSE_VALUE = 0
+MAX_PACKET_SIZE = 4096 + 10
+
+class RconError(Exception):
+    """Erreur de protocole ou de connexion RCON."""
+
+class RconAuthError(RconError):
+    """Mot de passe RCON refusé par le serveur."""
+
+class _RconStreamReader(asyncio.StreamReader):
+    """StreamReader qui retient la fin de flux, même si des octets restent à lire.
+
+    Le second écho de la sentinelle reste souvent dans le tampon : `at_eof()` ne voit
+    alors pas qu'un serveur redémarré a fermé la connexion.
+    """
+
+    eof_received = False
+
+    def feed_eof(self):
+        self.eof_received = True
+        super().feed_eof()
+
+def encode_packet(request_id, packet_type, body=b""):
+    """Encode un paquet Source RCON : <taille><id><type><corps>\\0\\0 (little-endian)."""
+    payload = struct.pack("<ii", request_id, packet_type) + body + b"\x00\x00"
+    return struct.pack("<i", len(payload)) + payload
+
+class AsyncRconClient:
+    """Client Source RCON natif asyncio (une connexion TCP authentifiée).
+
+    Les réponses en plusieurs paquets sont réassemblées en envoyant, après chaque
+    commande, un paquet SERVERDATA_RESPONSE_VALUE vide que srcds renvoie une fois la
+    réponse complète. Un délai dépassé ou une annulation en cours de commande ferme la
+    connexion, car le flux n'est alors plus synchronisé.
+    """
+
+    def __init__(self, host, port, password, timeout=Config.RCON_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.timeout = timeout
+        self._reader = None
+        self._writer = None
+        self._ids = itertools.count(1)
+
+    @property
+    def closed(self):
+        """Vrai si la connexion est coupée, y compris fermée par le serveur (fin de flux reçue)."""
+        return self._writer is None or self._writer.is_closing() or self._reader.eof_received
+
+    def _next_id(self):
+        request_id = next(self._ids)
+        if request_id >= 2 ** 31 - 1:
+            self._ids = itertools.count(1)
+            request_id = next(self._ids)
+        return request_id
+
+    async def connect(self):
+        """Ouvre la connexion et s'authentifie."""
+        try:
+            loop = asyncio.get_running_loop()
+            self._reader = _RconStreamReader()
+            transport, protocol = await asyncio.wait_for(
+                loop.create_connection(lambda: asyncio.StreamReaderProtocol(self._reader), self.host, self.port), self.timeout
+            )
+            self._writer = asyncio.StreamWriter(transport, protocol, self._reader, loop)
+            await self._guarded(self._auth(), self.timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            self.abort()
+            raise RconError(f"Connexion impossible à {self.host}:{self.port} ({e})") from e
+        return self
+
+    async def _read_packet(self):
+        try:
+            (size,) = struct.unpack("<i", await self._reader.readexactly(4))
+            if not 10 <= size <= MAX_PACKET_SIZE:
+                raise RconError(f"Taille de paquet RCON invalide : {size}")
+            data = await self._reader.readexactly(size)
+        except asyncio.IncompleteReadError as e:
+            raise RconError("Connexion RCON fermée par le serveur") from e
+        request_id, packet_type = struct.unpack("<ii", data[:8])
+        return request_id, packet_type, data[8:-2]
+
+    async def _auth(self):
+        auth_id = self._next_id()
+        self._writer.write(encode_packet(auth_id, SERVERDATA_AUTH, self.password.encode()))
+        await self._writer.drain()
+        while True:
+            request_id, packet_type, _ = await self._read_packet()
+            if packet_type != SERVERDATA_AUTH_RESPONSE:
+                continue
+            if request_id == -1:
+                raise RconAuthError("Mot de passe RCON incorrect")
+            if request_id == auth_id:
+                return
+
+    async def _exec(self, command):
+        command_id = self._next_id()
+        sentinel_id = self._next_id()
+        self._writer.write(encode_packet(command_id, SERVERDATA_EXECCOMMAND, command.encode()))
+        self._writer.write(encode_packet(sentinel_id, SERVERDATA_RESPONSE_VALUE))
+        await self._writer.drain()
+        chunks = []
+        while True:
+            request_id, packet_type, body = await self._read_packet()
+            if request_id == sentinel_id:
+                return b"".join(chunks).decode("utf-8", "replace")
+            if request_id == command_id and packet_type == SERVERDATA_RESPONSE_VALUE:
+                chunks.append(body)
+            # Sinon : reliquat d'une commande précédente (ex. second écho du paquet vide)
+
+    async def _guarded(self, coro, timeout):
+        try:
+            return await asyncio.wait_for(coro, timeout)
+        except asyncio.TimeoutError:
+            self.abort()
+            raise RconError(f"Délai RCON dépassé ({timeout}s)")
+        except BaseException:
+            self.abort()
+            raise
+
+    async def run(self, command, *args, timeout=None):
+        """Exécute une commande et renvoie la réponse complète du serveur."""
+        if self.closed:
+            raise RconError("Connexion RCON fermée")
+        return await self._guarded(self._exec(" ".join((command, *args))), timeout or self.timeout)
+
+    def abort(self):
+        """Coupe la connexion immédiatement."""
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def close(self):
+        """Ferme proprement la connexion."""
+        writer = self._writer
+        self.abort()
+        if writer is not None:
+            try:
+                await writer.wait_closed()
+            except (OSError, ConnectionError):
+                pass
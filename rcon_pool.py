@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import time
+from rcon_client import AsyncRconClient
+from config import Config
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Commandes suivies individuellement dans les métriques ; les autres sont regroupées
+TRACKED_COMMANDS = {"status", "changelevel", "exec", "echo"}
+
+class _PooledConnection:
+    __slots__ = ("client", "lock", "last_used")
+
+    def __init__(self):
+        self.client = None
+        self.lock = asyncio.Lock()
+        self.last_used = 0.0
+
+class RconPool:
+    """Pool de connexions RCON authentifiées, clé (ip, port, mot de passe), partagé par les cogs.
+
+    Une connexion est ouverte (et authentifiée) une seule fois puis réutilisée ; les
+    commandes d'une même clé sont sérialisées. Une connexion restée inactive plus de
+    `RCON_HEALTHCHECK_AFTER` secondes est testée avant usage ; fermée par le serveur ou
+    en échec à ce test, elle est rouverte avant l'envoi. Une commande déjà envoyée n'est
+    jamais rejouée. Le nettoyage ferme celles inactives depuis `RCON_IDLE_TIMEOUT` secondes.
+    """
+
+    def __init__(self):
+        self._connections = {}
+        self._reaper = None
+
+    async def _discard(self, conn):
+        client, conn.client = conn.client, None
+        if client is not None:
+            await client.close()
+
+    async def run(self, ip, port, password, command, *args, timeout=None):
+        """Exécute une commande RCON sur une connexion du pool."""
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap_idle())
+
+        conn = self._connections.setdefault((ip, port, password), _PooledConnection())
+        label = command if command in TRACKED_COMMANDS else "autre"
+        with metrics.timer("rcon_command_seconds", command=label):
+            return await self._run(conn, ip, port, password, command, args, timeout)
+
+    async def _run(self, conn, ip, port, password, command, args, timeout):
+        async with conn.lock:
+            if conn.client is None or conn.client.closed:
+                await self._discard(conn)
+            elif time.monotonic() - conn.last_used > Config.RCON_HEALTHCHECK_AFTER:
+                try:
+                    await conn.client.run("echo", "ping")
+                except Exception as e:
+                    logger.info(f"Connexion RCON {ip}:{port} périmée, reconnexion ({e})")
+                    await self._discard(conn)
+            if conn.client is None:
+                conn.client = await AsyncRconClient(ip, port, password).connect()
+            # Jamais rejouée : une commande déjà partie (changelevel, exec...) a pu s'exécuter
+            try:
+                result = await conn.client.run(command, *args, timeout=timeout)
+            except BaseException:
+                await self._discard(conn)
+                raise
+            conn.last_used = time.monotonic()
+            return result
+
+    async def close_server(self, ip, port):
+        """Ferme toutes les connexions vers un serveur (ex. fin de réservation)."""
+        for key in [k for k in self._connections if k[:2] == (ip, port)]:
+            conn = self._connections.pop(key)
+            async with conn.lock:
+                await self._discard(conn)
+
+    async def close_address(self, ip_and_port):
+        """Comme close_server, à partir d'une adresse « ip:port »."""
+        ip, _, port = ip_and_port.partition(":")
+        if port.isdigit():
+            await self.close_server(ip, int(port))
+
+    async def close(self):
+        """Ferme toutes les connexions."""
+        if self._reaper is not None:
+            self._reaper.cancel()
+        for key in list(self._connections):
+            await self.close_server(*key[:2])
+
+    async def _reap_idle(self):
+        while True:
+            await asyncio.sleep(Config.RCON_IDLE_TIMEOUT / 2)
+            for key, conn in list(self._connections.items()):
+                # Revérifié à chaque tour : close_server ou une commande a pu passer pendant un await
+                if (self._connections.get(key) is not conn or conn.lock.locked()
+                        or time.monotonic() - conn.last_used < Config.RCON_IDLE_TIMEOUT):
+                    continue
+                self._connections.pop(key, None)
+                await self._discard(conn)
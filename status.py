@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import re
+import time
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+MAP_RE = re.compile(r"^map\s*:\s*(\S+)", re.MULTILINE)
+PLAYERS_RE = re.compile(r"^players\s*:\s*(\d+) humans?, (\d+) bots? \((\d+)(?:/\d+)? max\)", re.MULTILINE)
+
+class ServerStatus:
+    """Dernier état connu d'un serveur réservé (réponse à `status`)."""
+
+    __slots__ = ("map_name", "players", "bots", "max_players", "polled_at", "error")
+
+    def __init__(self, map_name=None, players=0, bots=0, max_players=0, error=None):
+        self.map_name = map_name
+        self.players = players
+        self.bots = bots
+        self.max_players = max_players
+        self.polled_at = time.time()
+        self.error = error
+
+    @classmethod
+    def parse(cls, text):
+        """Extrait carte et joueurs de la sortie de `status`."""
+        map_match = MAP_RE.search(text)
+        players_match = PLAYERS_RE.search(text)
+        if players_match:
+            players, bots, max_players = map(int, players_match.groups())
+        else:
+            players = bots = max_players = 0
+        return cls(map_match.group(1) if map_match else None, players, bots, max_players)
+
+    def summary(self):
+        """Résumé d'une ligne pour les embeds."""
+        if self.error:
+            return "⚠️ injoignable"
+        return f"🗺️ {self.map_name or '?'} · 👥 {self.players}/{self.max_players or '?'}"
+
+class _Schedule:
+    __slots__ = ("next_poll", "interval")
+
+    def __init__(self):
+        self.next_poll = 0.0
+        self.interval = Config.STATUS_INTERVAL
+
+class StatusPoller:
+    """Interroge en tâche de fond le `status` RCON des serveurs réservés.
+
+    Une seule boucle se réveille toutes les `STATUS_TICK` secondes et interroge d'un coup
+    les réservations dont le tour est venu, via le pool RCON partagé : le coût dépend du
+    nombre de serveurs actifs, pas des commandes tapées. L'intervalle d'un serveur est de
+    `STATUS_FAST_INTERVAL` pendant les `STATUS_WARMUP` suivant l'ouverture, double tant
+    qu'il est vide ou injoignable (jusqu'à `STATUS_IDLE_MAX`) et revient à
+    `STATUS_INTERVAL` dès qu'il y a des joueurs. Les commandes lisent seulement le cache
+    (`get`).
+    """
+
+    def __init__(self, rcon_pool, reservations):
+        self.rcon_pool = rcon_pool
+        self.reservations = reservations
+        self._snapshots = {}
+        self._schedules = {}
+        self._task = None
+
+    def start(self):
+        """Démarre la boucle de fond."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """Arrête la boucle de fond."""
+        if self._task is not None:
+            self._task.cancel()
+
+    def get(self, reservation_id):
+        """Dernier état connu d'une réservation, ou None s'il est absent ou périmé."""
+        snapshot = self._snapshots.get(reservation_id)
+        if snapshot is None or time.time() - snapshot.polled_at > Config.STATUS_MAX_AGE:
+            return None
+        return snapshot
+
+    def _next_interval(self, reservation, schedule, snapshot, now):
+        if now < reservation.start_ts + Config.STATUS_WARMUP.total_seconds():
+            return Config.STATUS_FAST_INTERVAL
+        if snapshot.error or not snapshot.players:
+            return min(max(schedule.interval, Config.STATUS_INTERVAL) * 2, Config.STATUS_IDLE_MAX)
+        return Config.STATUS_INTERVAL
+
+    async def _poll(self, reservation):
+        ip, _, port = reservation.ip_and_port.partition(":")
+        try:
+            output = await asyncio.wait_for(
+                self.rcon_pool.run(ip, int(port), reservation.rcon, "status"), Config.RCON_TIMEOUT
+            )
+            return ServerStatus.parse(output)
+        except Exception as e:
+            logger.debug(f"status {reservation.ip_and_port} échoué : {e}")
+            return ServerStatus(error=str(e) or type(e).__name__)
+
+    async def poll_due(self, now=None):
+        """Interroge en un lot toutes les réservations dont le tour est venu."""
+        now = time.time() if now is None else now
+        due = []
+        live = set()
+        for reservation in self.reservations.ending_after(now):
+            if reservation.start_ts > now:
+                continue
+            live.add(reservation.reservation_id)
+            schedule = self._schedules.setdefault(reservation.reservation_id, _Schedule())
+            if schedule.next_poll <= now:
+                due.append((reservation, schedule))
+
+        for reservation_id in set(self._schedules) - live:
+            del self._schedules[reservation_id]
+            self._snapshots.pop(reservation_id, None)
+        if not due:
+            return 0
+
+        semaphore = asyncio.Semaphore(Config.STATUS_CONCURRENCY)
+
+        async def bounded(reservation):
+            async with semaphore:
+                return await self._poll(reservation)
+
+        snapshots = await asyncio.gather(*(bounded(reservation) for reservation, _ in due))
+        for (reservation, schedule), snapshot in zip(due, snapshots):
+            self._snapshots[reservation.reservation_id] = snapshot
+            schedule.interval = self._next_interval(reservation, schedule, snapshot, now)
+            schedule.next_poll = now + schedule.interval
+        return len(due)
+
+    async def _run(self):
+        while True:
+            try:
+                await self.poll_due()
+            except Exception as e:
+                logger.warning(f"Relevé des statuts échoué : {e}")
+            await asyncio.sleep(Config.STATUS_TICK)
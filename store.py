@@ -0,0 +1,458 @@
+import asyncio
+import bisect
+import heapq
+import sqlite3
+import time
+from datetime import datetime
+from config import Config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reservations (
+    reservation_id INTEGER PRIMARY KEY,
+    start_ts INTEGER NOT NULL,
+    end_ts INTEGER NOT NULL,
+    server_name TEXT NOT NULL,
+    ip_and_port TEXT NOT NULL,
+    password TEXT NOT NULL,
+    rcon TEXT NOT NULL,
+    creator_id INTEGER NOT NULL,
+    creator_name TEXT NOT NULL,
+    channel_id INTEGER,
+    notify_pending INTEGER NOT NULL DEFAULT 0,
+    ended INTEGER NOT NULL DEFAULT 0,
+    guild_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_reservations_live ON reservations (ended, end_ts);
+CREATE TABLE IF NOT EXISTS user_picks (
+    user_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (user_id, kind, value)
+);
+CREATE TABLE IF NOT EXISTS group_outcomes (
+    group_name TEXT PRIMARY KEY,
+    successes INTEGER NOT NULL,
+    attempts INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dm_relay (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    content TEXT NOT NULL,
+    created_ts REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_dm_relay_user ON dm_relay (user_id);
+"""
+
+COLUMNS = (
+    "reservation_id", "start_ts", "end_ts", "server_name", "ip_and_port", "password",
+    "rcon", "creator_id", "creator_name", "channel_id", "notify_pending", "guild_id"
+)
+
+class Reservation:
+    """Réservation confirmée suivie par le bot.
+
+    `start`/`end` sont des datetimes à l'heure de Paris, analysées une seule fois ;
+    `start_ts`/`end_ts` (secondes epoch) servent aux comparaisons et aux index.
+    `notify_pending` indique que la notification « Serveur ouvert » reste à envoyer
+    dans le salon `channel_id`. `guild_id` est le serveur Discord où elle a été créée
+    (None pour les réservations enregistrées avant son ajout).
+    """
+    __slots__ = (
+        "reservation_id", "start", "end", "server_name", "ip_and_port", "password", "rcon",
+        "creator_id", "creator_name", "channel_id", "notify_pending", "guild_id", "start_ts", "end_ts"
+    )
+
+    def __init__(self, reservation_id, start, end, server_name, ip_and_port, password, rcon,
+                 creator_id, creator_name, channel_id=None, notify_pending=False, guild_id=None):
+        self.reservation_id = reservation_id
+        self.start = start.astimezone(Config.TIMEZONE)
+        self.end = end.astimezone(Config.TIMEZONE)
+        self.server_name = server_name
+        self.ip_and_port = ip_and_port
+        self.password = password
+        self.rcon = rcon
+        self.creator_id = creator_id
+        self.creator_name = creator_name
+        self.channel_id = channel_id
+        self.notify_pending = notify_pending
+        self.guild_id = guild_id
+        self.start_ts = int(start.timestamp())
+        self.end_ts = int(end.timestamp())
+
+    @classmethod
+    def from_row(cls, row):
+        reservation_id, start_ts, end_ts, *fields, notify_pending, guild_id = row
+        return cls(
+            reservation_id,
+            datetime.fromtimestamp(start_ts, Config.TIMEZONE),
+            datetime.fromtimestamp(end_ts, Config.TIMEZONE),
+            *fields,
+            notify_pending=bool(notify_pending),
+            guild_id=guild_id
+        )
+
+    def to_row(self):
+        return tuple(getattr(self, column) for column in COLUMNS)
+
+class ReservationStore:
+    """Réservations indexées, partagées par les cogs via `bot.reservations`.
+
+    Index en O(1) par ID de réservation, par créateur et par serveur (ip:port), plus une
+    liste triée par heure de fin pour les requêtes actives/expirées.
+
+    L'expiration passe par un tas (fin + `RESERVATION_GRACE`, ID) et un unique timer de la
+    boucle asyncio, réarmé sur la prochaine échéance : chaque réservation est retirée à
+    son heure, en O(log n), sans balayage périodique. Les entrées du tas devenues
+    obsolètes (réservation terminée ou remplacée) sont ignorées au moment du dépilement.
+
+    Les réservations sont aussi écrites dans une base SQLite (mode WAL) à la création et
+    à la fin ; au démarrage, seules les lignes encore vivantes sont relues via l'index
+    (ended, end_ts), donc le temps de redémarrage ne dépend pas de la taille de l'historique.
+
+    L'historique des choix (groupe de serveurs, localisation, carte par utilisateur) et le
+    taux de succès par groupe sont tenus sous forme de compteurs agrégés, gardés en mémoire
+    pour le mode `!reserve --auto`.
+
+    Avec `shared=True` (plusieurs processus sur la même base), chaque lecture vérifie
+    d'abord `PRAGMA data_version`, qui ne change que lorsqu'une autre connexion a écrit,
+    et recharge alors les index. La notification d'ouverture est réservée par un UPDATE
+    conditionnel (`claim_notification`) : un seul processus l'envoie. Les écritures
+    n'attendent le verrou d'un autre processus que `STATE_DB_BUSY_TIMEOUT` ms ; depuis
+    la boucle asyncio, on les passe par `retry_locked`, qui réessaie sans la bloquer.
+    Une création ou une fin que la base refuse encore après `STATE_DB_LOCK_WAIT` est
+    appliquée en mémoire (`defer_add`, `defer_end`) et réécrite par `flush_deferred`.
+    """
+
+    def __init__(self, path=Config.STATE_DB, shared=False):
+        self._by_id = {}
+        self._by_creator = {}
+        self._by_server = {}
+        self._by_end = []
+        self._expiry_heap = []
+        self._expiry_timer = None
+        self._expiry_at = None
+        self.notify_tasks = {}
+        self._user_picks = {}
+        self._group_outcomes = {}
+        self._deferred = {}
+        self.shared = shared
+        self._db = sqlite3.connect(path)
+        self._db.execute(f"PRAGMA busy_timeout = {Config.STATE_DB_BUSY_TIMEOUT}")
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        if "guild_id" not in {column[1] for column in self._db.execute("PRAGMA table_info(reservations)")}:
+            # Base créée avant l'ajout de la colonne
+            self._db.execute("ALTER TABLE reservations ADD COLUMN guild_id INTEGER")
+        self._data_version = self._db.execute("PRAGMA data_version").fetchone()[0]
+        self._load()
+
+    def _live_rows(self):
+        cutoff = int(time.time() - Config.RESERVATION_GRACE.total_seconds())
+        return self._db.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM reservations WHERE ended = 0 AND end_ts > ?", (cutoff,)
+        )
+
+    def _load(self):
+        for row in self._live_rows():
+            self._index(Reservation.from_row(row))
+        self._load_picks()
+
+    def _load_picks(self):
+        self._user_picks.clear()
+        self._group_outcomes.clear()
+        for user_id, kind, value, count in self._db.execute("SELECT user_id, kind, value, count FROM user_picks"):
+            self._user_picks.setdefault(user_id, {}).setdefault(kind, {})[value] = count
+        for group_name, successes, attempts in self._db.execute("SELECT group_name, successes, attempts FROM group_outcomes"):
+            self._group_outcomes[group_name] = [successes, attempts]
+
+    async def retry_locked(self, operation, *args):
+        """Appelle `operation(*args)` ; tant qu'un autre processus verrouille la base, réessaie sans bloquer la boucle."""
+        deadline = time.monotonic() + Config.STATE_DB_LOCK_WAIT
+        delay = 0.01
+        while True:
+            try:
+                return operation(*args)
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e) or time.monotonic() >= deadline:
+                    raise
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.25)
+
+    def refresh(self):
+        """En mode partagé, recharge les index si un autre processus a écrit depuis la dernière lecture."""
+        if not self.shared:
+            return
+        version = self._db.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._data_version:
+            return
+        self._data_version = version
+        live = {row[0]: row for row in self._live_rows()}
+        # Les écritures différées font foi tant qu'elles ne sont pas sur disque
+        for reservation_id in [reservation_id for reservation_id in self._by_id
+                               if reservation_id not in live and reservation_id not in self._deferred]:
+            self._forget(reservation_id)
+        for reservation_id, row in live.items():
+            if reservation_id in self._deferred:
+                continue
+            current = self._by_id.get(reservation_id)
+            if current is None or current.to_row() != row:
+                self._index(Reservation.from_row(row))
+        self._load_picks()
+
+    def record_pick(self, user_id, group_name, location, map_name, success):
+        """Enregistre une tentative de réservation ; seules les réussies comptent comme choix de l'utilisateur."""
+        picks = [("group", group_name), ("location", location), ("map", map_name)] if success else []
+        picks = [(kind, value) for kind, value in picks if value]
+        with self._db:
+            self._db.execute(
+                "INSERT INTO group_outcomes VALUES (?, ?, 1) ON CONFLICT (group_name) "
+                "DO UPDATE SET successes = successes + excluded.successes, attempts = attempts + 1",
+                (group_name, int(success))
+            )
+            self._db.executemany(
+                "INSERT INTO user_picks VALUES (?, ?, ?, 1) ON CONFLICT (user_id, kind, value) DO UPDATE SET count = count + 1",
+                [(user_id, kind, value) for kind, value in picks]
+            )
+        # Compteurs en mémoire après l'écriture : un nouvel essai ne compte pas deux fois
+        outcome = self._group_outcomes.setdefault(group_name, [0, 0])
+        outcome[0] += int(success)
+        outcome[1] += 1
+        for kind, value in picks:
+            counts = self._user_picks.setdefault(user_id, {}).setdefault(kind, {})
+            counts[value] = counts.get(value, 0) + 1
+
+    def user_picks(self, user_id, kind):
+        """Compteurs {valeur: nombre} des choix passés d'un utilisateur (kind : group, location ou map)."""
+        self.refresh()
+        return self._user_picks.get(user_id, {}).get(kind, {})
+
+    def group_success_rate(self, group_name):
+        """Taux de succès lissé (Laplace) des réservations sur un groupe de serveurs."""
+        self.refresh()
+        successes, attempts = self._group_outcomes.get(group_name, (0, 0))
+        return (successes + 1) / (attempts + 2)
+
+    def __len__(self):
+        self.refresh()
+        return len(self._by_id)
+
+    def __contains__(self, reservation_id):
+        self.refresh()
+        return reservation_id in self._by_id
+
+    def add(self, reservation):
+        """Ajoute (ou remplace) une réservation et l'enregistre sur disque."""
+        with self._db:
+            self._db.execute(
+                f"INSERT OR REPLACE INTO reservations ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                reservation.to_row()
+            )
+        self._deferred.pop(reservation.reservation_id, None)
+        return self._index(reservation)
+
+    def end(self, reservation_id):
+        """Termine une réservation : retirée des index, annulée côté notification, marquée finie sur disque."""
+        with self._db:
+            self._db.execute("UPDATE reservations SET ended = 1, notify_pending = 0 WHERE reservation_id = ?", (reservation_id,))
+        self._deferred.pop(reservation_id, None)
+        return self._forget(reservation_id)
+
+    def defer_add(self, reservation):
+        """Comme `add`, en mémoire seulement ; l'écriture est reprise par `flush_deferred`."""
+        self._deferred[reservation.reservation_id] = reservation
+        return self._index(reservation)
+
+    def defer_end(self, reservation_id):
+        """Comme `end`, en mémoire seulement ; l'écriture est reprise par `flush_deferred`."""
+        self._deferred[reservation_id] = None
+        return self._forget(reservation_id)
+
+    def flush_deferred(self):
+        """Écrit les créations et fins différées ; celles qui échouent restent en attente."""
+        for reservation_id, reservation in list(self._deferred.items()):
+            with self._db:
+                if reservation is None:
+                    self._db.execute("UPDATE reservations SET ended = 1, notify_pending = 0 WHERE reservation_id = ?", (reservation_id,))
+                else:
+                    self._db.execute(
+                        f"INSERT OR REPLACE INTO reservations ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                        reservation.to_row()
+                    )
+            del self._deferred[reservation_id]
+
+    def claim_notification(self, reservation_id):
+        """Réserve l'envoi de la notification d'ouverture ; True pour un seul appelant, tous processus confondus."""
+        with self._db:
+            cursor = self._db.execute(
+                "UPDATE reservations SET notify_pending = 0 WHERE reservation_id = ? AND notify_pending = 1", (reservation_id,)
+            )
+        reservation = self._by_id.get(reservation_id)
+        if reservation is not None and cursor.rowcount == 1:
+            # Pas avant : une réservation dont l'écriture est différée garde sa notification
+            reservation.notify_pending = False
+        return cursor.rowcount == 1
+
+    def relay_dm(self, user_id, content):
+        """Dépose un DM reçu ici pour le processus qui attend la réponse de cet utilisateur."""
+        now = time.time()
+        with self._db:
+            self._db.execute("DELETE FROM dm_relay WHERE created_ts < ?", (now - Config.DM_RELAY_MAX_AGE,))
+            self._db.execute("INSERT INTO dm_relay (user_id, content, created_ts) VALUES (?, ?, ?)", (user_id, content, now))
+
+    def take_relayed_dms(self, user_ids):
+        """Retire de la base les DM relayés pour ces utilisateurs ; renvoie [(user_id, contenu, heure)] par ordre d'arrivée."""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return []
+        with self._db:
+            rows = self._db.execute(
+                f"DELETE FROM dm_relay WHERE user_id IN ({', '.join('?' * len(user_ids))}) RETURNING id, user_id, content, created_ts",
+                user_ids
+            ).fetchall()
+        return [(user_id, content, created_ts) for _, user_id, content, created_ts in sorted(rows)]
+
+    def reconcile(self, remote_reservations):
+        """Aligne les réservations locales sur celles renvoyées par serveme.tf.
+
+        Seules les réservations connues localement et présentes dans la réponse sont
+        modifiées : terminées à distance (site web, auto_end) elles sont terminées ici,
+        prolongées ou raccourcies leur heure de fin est mise à jour. Renvoie la liste
+        des réservations terminées.
+        """
+        self.refresh()
+        ended, moved = [], []
+        for remote in remote_reservations:
+            local = self._by_id.get(remote.get("id"))
+            if local is None:
+                continue
+            if remote.get("ended"):
+                ended.append(local.reservation_id)
+                continue
+            ends_at = remote.get("ends_at")
+            if ends_at and int(datetime.fromisoformat(ends_at).timestamp()) != local.end_ts:
+                moved.append((local, datetime.fromisoformat(ends_at)))
+        # Une seule transaction, et la mémoire n'est touchée qu'une fois celle-ci validée :
+        # rejouée par retry_locked après un verrou, la passe retrouve les mêmes réservations
+        with self._db:
+            self._db.executemany(
+                "UPDATE reservations SET ended = 1, notify_pending = 0 WHERE reservation_id = ?",
+                [(reservation_id,) for reservation_id in ended]
+            )
+            # Seule l'heure de fin est écrite, pour ne pas rétablir une notification
+            # qu'un autre processus aurait déjà réservée
+            self._db.executemany(
+                "UPDATE reservations SET end_ts = ? WHERE reservation_id = ?",
+                [(int(end.timestamp()), local.reservation_id) for local, end in moved]
+            )
+        for local, end in moved:
+            self._index(Reservation(
+                local.reservation_id, local.start, end, local.server_name,
+                local.ip_and_port, local.password, local.rcon, local.creator_id, local.creator_name,
+                local.channel_id, local.notify_pending, local.guild_id
+            ))
+        for reservation_id in ended:
+            self._deferred.pop(reservation_id, None)
+        return [self._forget(reservation_id) for reservation_id in ended]
+
+    def _index(self, reservation):
+        self._unindex(reservation.reservation_id)
+        self._by_id[reservation.reservation_id] = reservation
+        self._by_creator.setdefault(reservation.creator_id, {})[reservation.reservation_id] = reservation
+        self._by_server.setdefault(reservation.ip_and_port, {})[reservation.reservation_id] = reservation
+        bisect.insort(self._by_end, (reservation.end_ts, reservation.reservation_id))
+        deadline = self._expires_at(reservation)
+        heapq.heappush(self._expiry_heap, (deadline, reservation.reservation_id))
+        if self._expiry_at is None or deadline < self._expiry_at:
+            self._arm_expiry()
+        return reservation
+
+    def _unindex(self, reservation_id):
+        reservation = self._by_id.pop(reservation_id, None)
+        if reservation is None:
+            return None
+        for index, key in ((self._by_creator, reservation.creator_id), (self._by_server, reservation.ip_and_port)):
+            bucket = index[key]
+            del bucket[reservation_id]
+            if not bucket:
+                del index[key]
+        i = bisect.bisect_left(self._by_end, (reservation.end_ts, reservation_id))
+        del self._by_end[i]
+        return reservation
+
+    def _forget(self, reservation_id):
+        """Retire une réservation des index et annule sa notification, sans toucher au disque."""
+        task = self.notify_tasks.pop(reservation_id, None)
+        if task:
+            task.cancel()
+        return self._unindex(reservation_id)
+
+    def get(self, reservation_id):
+        self.refresh()
+        return self._by_id.get(reservation_id)
+
+    def all(self):
+        """Toutes les réservations, dans l'ordre d'ajout."""
+        self.refresh()
+        return list(self._by_id.values())
+
+    def by_creator(self, creator_id):
+        """Réservations d'un utilisateur, dans l'ordre d'ajout."""
+        self.refresh()
+        return list(self._by_creator.get(creator_id, {}).values())
+
+    def by_server(self, ip_and_port):
+        """Réservations sur un serveur donné."""
+        self.refresh()
+        return list(self._by_server.get(ip_and_port, {}).values())
+
+    def ending_after(self, timestamp):
+        """Réservations dont la fin est postérieure à `timestamp`, triées par heure de fin."""
+        self.refresh()
+        i = bisect.bisect_right(self._by_end, (timestamp, float("inf")))
+        return [self._by_id[reservation_id] for _, reservation_id in self._by_end[i:]]
+
+    def active(self, timestamp):
+        """Réservations en cours à `timestamp`."""
+        return [res for res in self.ending_after(timestamp) if res.start_ts <= timestamp]
+
+    @staticmethod
+    def _expires_at(reservation):
+        return reservation.end_ts + int(Config.RESERVATION_GRACE.total_seconds())
+
+    def _arm_expiry(self):
+        """Programme le timer sur la prochaine échéance du tas."""
+        if self._expiry_timer is not None:
+            self._expiry_timer.cancel()
+            self._expiry_timer = self._expiry_at = None
+        if not self._expiry_heap:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Pas encore de boucle (chargement au démarrage) : expire_due() arme le timer
+        self._expiry_at = self._expiry_heap[0][0]
+        # Délai plafonné pour rattraper une éventuelle dérive de l'horloge murale
+        delay = min(max(self._expiry_at - time.time(), 0), Config.EXPIRY_MAX_SLEEP)
+        self._expiry_timer = loop.call_later(delay, self.expire_due)
+
+    def expire_due(self, now=None):
+        """Retire les réservations dont l'échéance est passée et annule leur notification."""
+        now = time.time() if now is None else now
+        expired = []
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            deadline, reservation_id = heapq.heappop(self._expiry_heap)
+            reservation = self._by_id.get(reservation_id)
+            if reservation is None or self._expires_at(reservation) != deadline:
+                continue
+            expired.append(self._forget(reservation_id))
+        self._arm_expiry()
+        return expired
+
+    def close(self):
+        """Arrête le timer d'expiration et ferme la base."""
+        if self._expiry_timer is not None:
+            self._expiry_timer.cancel()
+        self._expiry_timer = self._expiry_at = None
+        self._db.close()
@@ -0,0 +1,8 @@
+"""Rend importables les modules du bot et les faux serveurs de `benchmarks/`."""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+os.environ.setdefault("SERVEME_API_KEY", "test")
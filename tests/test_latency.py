@@ -0,0 +1,129 @@
+"""LatencyProber contre des écouteurs UDP/TCP locaux, avec des délais de réponse simulés."""
+import asyncio
+import pytest
+import latency
+from config import Config
+from latency import LatencyProber
+
+A2S_REPLY = b"\xFF\xFF\xFF\xFFA\x00\x00\x00\x00"
+
+class DelayedA2S(asyncio.DatagramProtocol):
+    """Répond à A2S_INFO après `delay` secondes ; `delay=None` ne répond jamais."""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        if self.delay is not None:
+            asyncio.get_running_loop().call_later(self.delay, self.transport.sendto, A2S_REPLY, addr)
+
+async def udp_listener(delay, port=0):
+    transport, protocol = await asyncio.get_running_loop().create_datagram_endpoint(
+        lambda: DelayedA2S(delay), local_addr=("127.0.0.1", port)
+    )
+    return transport, protocol, f"127.0.0.1:{transport.get_extra_info('sockname')[1]}"
+
+async def closed_address():
+    server = await asyncio.start_server(lambda reader, writer: writer.close(), "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    server.close()
+    await server.wait_closed()
+    return f"127.0.0.1:{port}"
+
+def test_servers_are_ranked_fastest_first_then_unknown_then_unreachable():
+    async def scenario():
+        listeners = {delay: await udp_listener(delay) for delay in (0.12, 0.01, 0.06)}
+        unreachable = await closed_address()
+        unknown = "127.0.0.1:1"
+        prober = LatencyProber(timeout=0.5)
+        prober._samples.update({address: latency._Sample() for _, _, address in listeners.values()})
+        prober._samples[unreachable] = latency._Sample()
+        await prober.probe_all()
+        ranked = sorted([unreachable, unknown, *(address for _, _, address in listeners.values())], key=prober.sort_key)
+        for transport, _, _ in listeners.values():
+            transport.close()
+        return ranked, [listeners[delay][2] for delay in (0.01, 0.06, 0.12)] + [unknown, unreachable], prober.latency(unreachable)
+
+    ranked, expected, unreachable_latency = asyncio.run(scenario())
+    assert ranked == expected
+    assert unreachable_latency == float("inf")
+
+def test_tcp_is_used_when_udp_gets_no_reply():
+    async def scenario():
+        accepted = []
+        server = await asyncio.start_server(lambda reader, writer: (accepted.append(1), writer.close()), "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        transport, _, address = await udp_listener(None, port)  # écoute en UDP sans jamais répondre
+        prober = LatencyProber(timeout=0.2)
+        await prober.probe(address)
+        await asyncio.sleep(0.05)
+        transport.close()
+        server.close()
+        await server.wait_closed()
+        return prober.latency(address), accepted
+
+    measured, accepted = asyncio.run(scenario())
+    assert measured is not None and measured != float("inf")
+    assert accepted  # la mesure vient de la connexion TCP
+
+def test_measurements_are_smoothed(monkeypatch):
+    raw = []
+    original = latency.probe_udp
+
+    async def recording_probe(host, port, timeout):
+        raw.append(await original(host, port, timeout))
+        return raw[-1]
+
+    monkeypatch.setattr(latency, "probe_udp", recording_probe)
+
+    async def scenario():
+        transport, protocol, address = await udp_listener(0.01)
+        prober = LatencyProber(timeout=0.5)
+        await prober.probe(address)
+        first = prober.latency(address)
+        protocol.delay = 0.1
+        await prober.probe(address)
+        transport.close()
+        return first, prober.latency(address)
+
+    first, smoothed = asyncio.run(scenario())
+    assert first == raw[0]
+    assert smoothed == pytest.approx(first + Config.LATENCY_ALPHA * (raw[1] - first))
+    assert first < smoothed < raw[1]
+
+def test_stale_measurement_is_ignored():
+    async def scenario():
+        transport, _, address = await udp_listener(0.0)
+        prober = LatencyProber(timeout=0.5)
+        await prober.probe(address)
+        fresh = prober.latency(address)
+        prober._samples[address].measured_at -= Config.LATENCY_MAX_AGE + 1
+        transport.close()
+        return fresh, prober.latency(address), prober.sort_key(address)
+
+    fresh, stale, key = asyncio.run(scenario())
+    assert fresh is not None
+    assert stale is None and key == (1, 0.0)  # classé comme inconnu
+
+def test_stale_samples_and_addresses_expire(monkeypatch):
+    monkeypatch.setattr(Config, "LATENCY_MAX_AGE", 0.2)
+
+    async def scenario():
+        transport, _, address = await udp_listener(0.0)
+        prober = LatencyProber(interval=0.05, timeout=0.5)
+        prober.track([address])
+        await asyncio.sleep(0.1)
+        measured = prober.latency(address)
+        await asyncio.sleep(0.4)  # plus proposée par find_servers : oubliée
+        forgotten = address not in prober._samples and prober.latency(address) is None
+        stopped = prober._task.done()
+        await prober.close()
+        transport.close()
+        return measured, forgotten, stopped
+
+    measured, forgotten, stopped = asyncio.run(scenario())
+    assert measured is not None
+    assert forgotten and stopped
@@ -0,0 +1,101 @@
+"""RequestScheduler devant le faux serveme.tf de `benchmarks/stub_serveme.py`."""
+import asyncio
+import time
+import pytest
+from config import Config
+from ratelimit import PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL, RateLimitQueueFull, RequestScheduler
+from stub_serveme import StubServeme
+from utils import ServemeClient
+
+async def with_client(scenario, **scheduler_kwargs):
+    stub = await StubServeme().start()
+    scheduler = RequestScheduler(**scheduler_kwargs)
+    client = ServemeClient("test", stub.base_url, scheduler=scheduler)
+    try:
+        return await scenario(stub, client, scheduler)
+    finally:
+        scheduler.close()
+        await client.close()
+        await stub.stop()
+
+async def get_new(client, priority):
+    return await client._request("GET", f"{client.base_url}/new?api_key=test", priority, "new")
+
+def test_queued_requests_are_served_by_priority():
+    async def scenario(stub, client, scheduler):
+        served = []
+
+        async def call(label, priority):
+            await get_new(client, priority)
+            served.append(label)
+
+        await get_new(client, PRIORITY_NORMAL)  # consomme l'unique jeton
+        tasks = []
+        for label, priority in (("low", PRIORITY_LOW), ("normal", PRIORITY_NORMAL), ("high", PRIORITY_HIGH)):
+            tasks.append(asyncio.create_task(call(label, priority)))
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        return served, stub.requests
+
+    assert asyncio.run(with_client(scenario, rate=20, burst=1)) == (["high", "normal", "low"], 4)
+
+def test_full_queue_is_rejected():
+    async def scenario(stub, client, scheduler):
+        await get_new(client, PRIORITY_NORMAL)
+        queued = [asyncio.create_task(get_new(client, PRIORITY_NORMAL)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(RateLimitQueueFull):
+            await get_new(client, PRIORITY_HIGH)
+        statuses = [status for status, _, _ in await asyncio.gather(*queued)]
+        return statuses, scheduler.rejected, stub.requests
+
+    assert asyncio.run(with_client(scenario, rate=20, burst=1, max_queue=2)) == ([200, 200], 1, 3)
+
+def test_retry_after_pauses_the_bucket(monkeypatch):
+    monkeypatch.setattr(Config, "API_BACKOFF_BASE", 0.01)
+
+    async def scenario(stub, client, scheduler):
+        stub.throttle_next = 1
+        t0 = time.monotonic()
+        status, _, _ = await get_new(client, PRIORITY_NORMAL)
+        return status, time.monotonic() - t0, stub.rejected, scheduler.throttled
+
+    status, elapsed, rejected, throttled = asyncio.run(with_client(scenario, rate=100, burst=10))
+    assert (status, rejected, throttled) == (200, 1, 1)
+    assert elapsed >= 0.95  # Retry-After: 1, malgré des jetons disponibles et un backoff de 10 ms
+
+def test_throttled_request_is_retried_up_to_max_retries(monkeypatch):
+    monkeypatch.setattr(Config, "API_BACKOFF_BASE", 0.001)
+    monkeypatch.setattr(Config, "API_MAX_RETRIES", 2)
+
+    async def scenario(stub, client, scheduler):
+        stub.retry_after = "0"
+        stub.throttle_next = 2
+        recovered, _, _ = await get_new(client, PRIORITY_NORMAL)
+        stub.throttle_next = 10
+        given_up, _, _ = await get_new(client, PRIORITY_NORMAL)
+        return recovered, given_up, stub.rejected, stub.throttle_next
+
+    # 2 échecs puis succès ; puis 1 tentative + 2 nouvelles, toutes refusées
+    assert asyncio.run(with_client(scenario, rate=100, burst=10)) == (200, 429, 5, 7)
+
+def test_cancelled_waiters_are_skipped():
+    async def scenario(stub, client, scheduler):
+        served = []
+
+        async def call(label, priority):
+            await scheduler.acquire(priority)
+            served.append(label)
+
+        await scheduler.acquire()
+        cancelled = asyncio.create_task(call("annulé", PRIORITY_HIGH))
+        waiting = asyncio.create_task(call("servi", PRIORITY_LOW))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        t0 = time.monotonic()
+        await waiting
+        return served, time.monotonic() - t0, scheduler.queue_depth
+
+    served, elapsed, depth = asyncio.run(with_client(scenario, rate=5, burst=1))
+    assert served == ["servi"] and depth == 0
+    assert elapsed < 0.35  # servi au premier jeton (200 ms), pas après celui de l'appelant annulé
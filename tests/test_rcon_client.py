@@ -0,0 +1,136 @@
+"""Client RCON natif contre le faux serveur de `benchmarks/fake_rcon.py`."""
+import asyncio
+import struct
+import pytest
+from fake_rcon import FakeRconServer
+from rcon_client import AsyncRconClient, RconAuthError, RconError, encode_packet, SERVERDATA_AUTH_RESPONSE
+
+async def connected(server, **kwargs):
+    return await AsyncRconClient(server.host, server.port, server.password, **kwargs).connect()
+
+def test_multi_packet_response_is_reassembled():
+    async def scenario():
+        server = await FakeRconServer().start()
+        client = await connected(server)
+        try:
+            return await client.run("big", "10000")
+        finally:
+            await client.close()
+            await server.stop()
+
+    assert asyncio.run(scenario()) == "x" * 10000
+
+def test_leftover_sentinel_echo_is_skipped():
+    # srcds renvoie deux paquets pour la sentinelle : le second arrive pendant la commande suivante
+    async def scenario():
+        server = await FakeRconServer().start()
+        client = await connected(server)
+        try:
+            return [await client.run("echo", word) for word in ("un", "deux", "trois")]
+        finally:
+            await client.close()
+            await server.stop()
+
+    assert asyncio.run(scenario()) == ["un\n", "deux\n", "trois\n"]
+
+def test_refused_password_raises_auth_error():
+    async def scenario():
+        server = await FakeRconServer(password="bon").start()
+        try:
+            with pytest.raises(RconAuthError):
+                await AsyncRconClient(server.host, server.port, "mauvais").connect()
+        finally:
+            await server.stop()
+
+    asyncio.run(scenario())
+
+def test_unreachable_server_raises_rcon_error():
+    async def scenario():
+        server = await FakeRconServer().start()
+        await server.stop()
+        with pytest.raises(RconError):
+            await AsyncRconClient(server.host, server.port, server.password, timeout=1.0).connect()
+
+    asyncio.run(scenario())
+
+def test_timeout_aborts_the_connection():
+    async def scenario():
+        server = await FakeRconServer().start()
+        client = await connected(server)
+        server.latency = 0.5
+        try:
+            with pytest.raises(RconError, match="Délai"):
+                await client.run("status", timeout=0.1)
+            assert client.closed
+            with pytest.raises(RconError):
+                await client.run("status")
+        finally:
+            await client.close()
+            await server.stop()
+
+    asyncio.run(scenario())
+
+def test_cancellation_mid_command_aborts_the_connection():
+    async def scenario():
+        server = await FakeRconServer().start()
+        client = await connected(server)
+        server.latency = 0.5
+        try:
+            task = asyncio.create_task(client.run("status"))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            assert client.closed
+        finally:
+            await client.close()
+            await server.stop()
+
+    asyncio.run(scenario())
+
+@pytest.mark.parametrize("size", [4, 1 << 20])
+def test_invalid_packet_size_is_rejected(size):
+    async def handle(reader, writer):
+        (length,) = struct.unpack("<i", await reader.readexactly(4))
+        request_id, _ = struct.unpack("<ii", (await reader.readexactly(length))[:8])
+        writer.write(encode_packet(request_id, SERVERDATA_AUTH_RESPONSE))
+        await reader.readexactly(4)
+        writer.write(struct.pack("<i", size) + b"\x00" * 16)
+        await writer.drain()
+
+    async def scenario():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        client = await AsyncRconClient("127.0.0.1", port, "pw", timeout=1.0).connect()
+        try:
+            with pytest.raises(RconError, match="Taille"):
+                await client.run("status")
+            assert client.closed
+        finally:
+            await client.close()
+            server.close()
+            await server.wait_closed()
+
+    asyncio.run(scenario())
+
+def test_server_closing_the_connection_raises_rcon_error():
+    async def handle(reader, writer):
+        (length,) = struct.unpack("<i", await reader.readexactly(4))
+        request_id, _ = struct.unpack("<ii", (await reader.readexactly(length))[:8])
+        writer.write(encode_packet(request_id, SERVERDATA_AUTH_RESPONSE))
+        await reader.readexactly(4)
+        writer.close()
+
+    async def scenario():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        client = await AsyncRconClient("127.0.0.1", port, "pw", timeout=1.0).connect()
+        try:
+            with pytest.raises(RconError, match="fermée"):
+                await client.run("status")
+        finally:
+            await client.close()
+            server.close()
+            await server.wait_closed()
+
+    asyncio.run(scenario())
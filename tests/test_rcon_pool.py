@@ -0,0 +1,99 @@
+"""Pool RCON : réutilisation, reconnexion et absence de rejeu des commandes."""
+import asyncio
+import pytest
+from config import Config
+from fake_rcon import FakeRconServer
+from rcon_client import RconAuthError, RconError
+from rcon_pool import RconPool
+
+async def with_pool(scenario, **server_kwargs):
+    server = await FakeRconServer(**server_kwargs).start()
+    pool = RconPool()
+    try:
+        return await scenario(server, pool)
+    finally:
+        await pool.close()
+        await server.stop()
+
+def test_connection_is_reused():
+    async def scenario(server, pool):
+        for _ in range(3):
+            await pool.run(server.host, server.port, server.password, "status")
+        return server.connections, server.auths
+
+    assert asyncio.run(with_pool(scenario)) == (1, 1)
+
+def test_timed_out_command_is_not_replayed():
+    async def scenario(server, pool):
+        await pool.run(server.host, server.port, server.password, "status")
+        server.latency = 0.5
+        with pytest.raises(RconError, match="Délai"):
+            await pool.run(server.host, server.port, server.password, "changelevel", "cp_gullywash_f9", timeout=0.2)
+        await asyncio.sleep(0.6)
+        return server.commands.count("changelevel cp_gullywash_f9")
+
+    assert asyncio.run(with_pool(scenario)) == 1
+
+def test_connection_closed_by_server_is_reopened_before_sending():
+    async def scenario(server, pool):
+        await pool.run(server.host, server.port, server.password, "status")
+        server.drop_connections()
+        await asyncio.sleep(0.05)
+        result = await pool.run(server.host, server.port, server.password, "changelevel", "cp_gullywash_f9")
+        return result, server.connections, server.commands.count("changelevel cp_gullywash_f9")
+
+    assert asyncio.run(with_pool(scenario)) == ("", 2, 1)
+
+def test_failed_health_check_reconnects(monkeypatch):
+    monkeypatch.setattr(Config, "RCON_HEALTHCHECK_AFTER", 0)
+
+    async def scenario(server, pool):
+        await pool.run(server.host, server.port, server.password, "status")
+        stale = next(iter(pool._connections.values())).client
+
+        async def broken(command, *args, timeout=None):
+            raise RconError("Connexion RCON fermée par le serveur")
+
+        stale.run = broken
+        await pool.run(server.host, server.port, server.password, "exec", "etf2l_6v6")
+        return server.connections, server.commands.count("exec etf2l_6v6")
+
+    assert asyncio.run(with_pool(scenario)) == (2, 1)
+
+def test_refused_password_is_not_retried():
+    async def scenario(server, pool):
+        with pytest.raises(RconAuthError):
+            await pool.run(server.host, server.port, "mauvais", "status")
+        return server.auths
+
+    assert asyncio.run(with_pool(scenario)) == 1
+
+def test_reaper_survives_connections_closed_meanwhile(monkeypatch):
+    monkeypatch.setattr(Config, "RCON_IDLE_TIMEOUT", 0.1)
+
+    async def scenario():
+        servers = [await FakeRconServer().start() for _ in range(2)]
+        pool = RconPool()
+        try:
+            for server in servers:
+                await pool.run(server.host, server.port, server.password, "status")
+            discard = pool._discard
+            closing = []
+
+            async def discard_then_end_other(conn):
+                await discard(conn)
+                if not closing:
+                    # Pendant que le nettoyage ferme une connexion, !end ferme l'autre serveur
+                    closing.append(conn)
+                    for server in servers:
+                        await pool.close_server(server.host, server.port)
+
+            pool._discard = discard_then_end_other
+            await asyncio.sleep(0.25)
+            return pool._reaper.done(), len(pool._connections)
+        finally:
+            await pool.close()
+            for server in servers:
+                await server.stop()
+
+    assert asyncio.run(scenario()) == (False, 0)
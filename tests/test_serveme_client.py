@@ -0,0 +1,54 @@
+"""ServemeClient contre le faux serveme.tf de `benchmarks/stub_serveme.py`."""
+import asyncio
+from stub_serveme import StubServeme
+from utils import ServemeClient
+
+def slot(start_hour, end_hour):
+    return f"2025-05-05T{start_hour:02d}:00:00+02:00", f"2025-05-05T{end_hour:02d}:00:00+02:00"
+
+def test_booking_invalidates_every_overlapping_slot():
+    async def scenario():
+        stub = await StubServeme().start()
+        client = ServemeClient("test", stub.base_url)
+        try:
+            windows = [slot(18, 20), slot(20, 22), slot(21, 23), slot(19, 21), slot(22, 24)]
+            for start, end in windows:
+                await client.find_servers(start, end)
+            await client.create_reservation(*slot(20, 22), server_id=1, password="pw", rcon="rcon")
+            return set(client._availability)
+        finally:
+            await client.close()
+            await stub.stop()
+
+    # 20h-22h réservé : 21h-23h et 19h-21h chevauchent ; 18h-20h et 22h-24h ne font que toucher
+    assert asyncio.run(scenario()) == {slot(18, 20), slot(22, 24)}
+
+def test_batch_never_books_the_same_server_twice_in_a_window():
+    async def scenario():
+        stub = await StubServeme(servers=[
+            {"id": 1, "name": "FishServ #1 (Paris)", "ip_and_port": "127.0.0.1:27016"},
+            {"id": 2, "name": "FishServ #2 (Paris)", "ip_and_port": "127.0.0.1:27017"},
+            {"id": 3, "name": "FishServ #3 (Paris)", "ip_and_port": "127.0.0.1:27018"},
+        ]).start()
+        client = ServemeClient("test", stub.base_url)
+        original = client.find_servers
+
+        async def find_servers(start, end, **kwargs):
+            # 20h-22h : #1 et #3 libres ; 22h-24h : #1 et #2 libres, décrits un peu autrement
+            data = await original(start, end, **kwargs)
+            if start == slot(20, 22)[0]:
+                return dict(data, servers=[server for server in data["servers"] if server["id"] != 2])
+            return dict(data, servers=[
+                dict(server, ip_and_port=server["ip_and_port"] + " ") for server in data["servers"] if server["id"] != 3
+            ])
+
+        client.find_servers = find_servers
+        try:
+            created = await client.create_batch([slot(20, 22), slot(22, 24)], 2, "pw", "rcon")
+            return [(start, res["server"]["id"]) for start, _, res in created]
+        finally:
+            await client.close()
+            await stub.stop()
+
+    booked = asyncio.run(scenario())
+    assert len(booked) == 4 and len(set(booked)) == 4
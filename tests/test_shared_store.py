@@ -0,0 +1,172 @@
+"""ReservationStore partagé entre plusieurs connexions (un processus par shard)."""
+import asyncio
+import sqlite3
+import time
+from datetime import datetime, timedelta
+import pytest
+from config import Config
+from store import Reservation, ReservationStore
+
+def make_reservation(reservation_id, notify_pending=True):
+    start = datetime.now().astimezone() + timedelta(minutes=5)
+    return Reservation(
+        reservation_id, start, start + timedelta(hours=2), "FishServ #1 (Paris)", "127.0.0.1:27015",
+        "pw", "rcon", 1, "user1", channel_id=1, notify_pending=notify_pending
+    )
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "reservations.db")
+
+def test_writes_from_another_process_are_seen(path):
+    first, second = ReservationStore(path, shared=True), ReservationStore(path, shared=True)
+    first.add(make_reservation(1))
+    assert second.get(1) is not None
+    first.end(1)
+    assert second.get(1) is None and 1 not in second
+    first.close()
+    second.close()
+
+def test_notification_is_claimed_once(path):
+    stores = [ReservationStore(path, shared=True) for _ in range(3)]
+    stores[0].add(make_reservation(1))
+    assert [store.claim_notification(1) for store in stores] == [True, False, False]
+    for store in stores:
+        store.close()
+
+def test_locked_write_is_retried_without_blocking_the_loop(path):
+    store = ReservationStore(path, shared=True)
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")  # un autre processus tient le verrou d'écriture
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.5, other.execute, "COMMIT")
+        lags = []
+
+        async def sample():
+            while True:
+                t0 = loop.time()
+                await asyncio.sleep(0.01)
+                lags.append(loop.time() - t0 - 0.01)
+
+        sampler = asyncio.create_task(sample())
+        t0 = time.monotonic()
+        await store.retry_locked(store.add, make_reservation(1))
+        sampler.cancel()
+        return time.monotonic() - t0, max(lags)
+
+    waited, max_lag = asyncio.run(scenario())
+    assert waited >= 0.45 and 1 in store
+    assert max_lag < 0.1  # chaque attente bloquante reste bornée par STATE_DB_BUSY_TIMEOUT
+    other.close()
+    store.close()
+
+def test_locked_write_gives_up_after_lock_wait(path, monkeypatch):
+    monkeypatch.setattr(Config, "STATE_DB_LOCK_WAIT", 0.2)
+    store = ReservationStore(path, shared=True)
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    with pytest.raises(sqlite3.OperationalError, match="locked"):
+        asyncio.run(store.retry_locked(store.add, make_reservation(1)))
+    assert 1 not in store
+    other.execute("COMMIT")
+    other.close()
+    store.close()
+
+def test_relayed_dms_are_taken_once(path):
+    shard0, other = ReservationStore(path, shared=True), ReservationStore(path, shared=True)
+    shard0.relay_dm(42, "monrcon")
+    shard0.relay_dm(43, "autre")
+    assert [(user_id, content) for user_id, content, _ in other.take_relayed_dms([42])] == [(42, "monrcon")]
+    assert other.take_relayed_dms([42]) == []
+    assert len(shard0.take_relayed_dms([43])) == 1
+    shard0.close()
+    other.close()
+
+class LockedOnceConnection:
+    """Connexion dont la deuxième écriture échoue une fois, comme si un autre processus prenait le verrou."""
+
+    def __init__(self, db):
+        self.db = db
+        self.writes = 0
+
+    def _write(self, method, sql, params):
+        if sql.startswith("UPDATE"):
+            self.writes += 1
+            if self.writes == 2:
+                raise sqlite3.OperationalError("database is locked")
+        return getattr(self.db, method)(sql, params)
+
+    def execute(self, sql, params=()):
+        return self._write("execute", sql, params)
+
+    def executemany(self, sql, params):
+        return self._write("executemany", sql, params)
+
+    def __enter__(self):
+        return self.db.__enter__()
+
+    def __exit__(self, *exc_info):
+        return self.db.__exit__(*exc_info)
+
+def test_reconcile_retried_after_lock_reports_every_ended_reservation(path):
+    store = ReservationStore(path)
+    for reservation_id in (1, 2, 3):
+        store.add(make_reservation(reservation_id))
+    store._db = LockedOnceConnection(store._db)
+    new_end = (datetime.now().astimezone() + timedelta(hours=3)).replace(microsecond=0)
+    remote = [{"id": 1, "ended": True}, {"id": 2, "ended": True}, {"id": 3, "ends_at": new_end.isoformat()}]
+    ended = asyncio.run(store.retry_locked(store.reconcile, remote))
+    assert sorted(reservation.reservation_id for reservation in ended) == [1, 2]
+    assert list(store._by_id) == [3] and store.get(3).end_ts == int(new_end.timestamp())
+    store._db = store._db.db
+    store.close()
+    reopened = ReservationStore(path)
+    assert list(reopened._by_id) == [3] and reopened.get(3).end_ts == int(new_end.timestamp())
+    reopened.close()
+
+def test_deferred_writes_survive_refresh_and_are_flushed(path, monkeypatch):
+    monkeypatch.setattr(Config, "STATE_DB_LOCK_WAIT", 0.1)
+    store, other = ReservationStore(path, shared=True), ReservationStore(path, shared=True)
+    other.add(make_reservation(2))
+    locker = sqlite3.connect(path, isolation_level=None)
+    locker.execute("BEGIN IMMEDIATE")
+    for operation, args in ((store.add, (make_reservation(1),)), (store.end, (2,))):
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            asyncio.run(store.retry_locked(operation, *args))
+    store.defer_add(make_reservation(1))
+    store.defer_end(2)
+    with pytest.raises(sqlite3.OperationalError, match="locked"):
+        store.flush_deferred()
+    locker.execute("COMMIT")
+    other.add(make_reservation(3))  # une autre écriture force le rechargement des index
+    assert sorted(reservation.reservation_id for reservation in store.all()) == [1, 3]
+    store.flush_deferred()
+    assert sorted(reservation.reservation_id for reservation in other.all()) == [1, 3]
+    assert other.claim_notification(1)
+    locker.close()
+    store.close()
+    other.close()
+
+def test_guild_id_is_stored_and_added_to_older_databases(path):
+    old = sqlite3.connect(path)
+    old.execute(
+        "CREATE TABLE reservations (reservation_id INTEGER PRIMARY KEY, start_ts INTEGER NOT NULL, end_ts INTEGER NOT NULL, "
+        "server_name TEXT NOT NULL, ip_and_port TEXT NOT NULL, password TEXT NOT NULL, rcon TEXT NOT NULL, "
+        "creator_id INTEGER NOT NULL, creator_name TEXT NOT NULL, channel_id INTEGER, "
+        "notify_pending INTEGER NOT NULL DEFAULT 0, ended INTEGER NOT NULL DEFAULT 0)"
+    )
+    start = int(time.time())
+    old.execute("INSERT INTO reservations VALUES (1, ?, ?, 'FishServ #1', '127.0.0.1:27015', 'pw', 'rcon', 1, 'user1', 7, 0, 0)",
+                (start, start + 7200))
+    old.commit()
+    old.close()
+    store = ReservationStore(path)
+    reservation = make_reservation(2)
+    reservation.guild_id = 42
+    store.add(reservation)
+    store.close()
+    reopened = ReservationStore(path)
+    assert (reopened.get(1).guild_id, reopened.get(2).guild_id) == (None, 42)
+    reopened.close()
@@ -1,7 +1,15 @@
 import aiohttp
+import asyncio
+import json
+import logging
 import os
 import re
+import time
+from datetime import datetime
 from dotenv import load_dotenv
+from config import Config
+from ratelimit import RequestScheduler, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW
+import metrics
 
 load_dotenv()
 API_KEY = os.getenv("SERVEME_API_KEY")
@@ -12,58 +20,306 @@ if not API_KEY:
 
 BASE_URL = "https://serveme.tf/api/reservations"
 
-async def get_prefilled_reservation():
-    """Récupère une réservation pré-remplie via l'API."""
-    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10)) as session:
-        async with session.get(f"{BASE_URL}/new?api_key={API_KEY}", headers={"Content-Type": "application/json"}) as resp:
-            return await resp.json()
-
-async def find_servers(start, end):
-    """Recherche des serveurs disponibles pour une période donnée."""
-    prefilled = await get_prefilled_reservation()
-    payload = {"reservation": {"starts_at": start, "ends_at": end}}
-    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10)) as session:
-        async with session.post(f"{prefilled['actions']['find_servers']}?api_key={API_KEY}", 
-                              headers={"Content-Type": "application/json"}, json=payload) as resp:
-            if resp.status >= 400:
-                error_data = await resp.json()
-                raise Exception(f"Erreur API : {error_data.get('errors', 'Erreur inconnue')}")
-            return await resp.json()
-
-async def create_reservation(start, end, server_id, password, rcon, server_config_id=None, first_map=None):
-    """Crée une réservation de serveur via l'API."""
-    payload = {
-        "reservation": {
-            "starts_at": start,
-            "ends_at": end,
-            "server_id": server_id,
-            "password": password,
-            "rcon": rcon,
-            "first_map": first_map or "cp_process_f12",
-            "server_config_id": server_config_id,
-            "auto_end": True,
-            "enable_plugins": True,
-            "enable_demos_tf": True
+logger = logging.getLogger(__name__)
+
+class ServemeClient:
+    """Client persistant pour l'API serveme.tf, partagé par tout le bot.
+
+    Une seule `aiohttp.ClientSession` est réutilisée pour tous les appels : le pool
+    de connexions garde les sockets TLS ouvertes (keep-alive) et les résolutions DNS
+    sont mises en cache, ce qui évite une poignée de main TCP+TLS par requête.
+
+    Toutes les requêtes passent par un `RequestScheduler` (seau à jetons à priorités) ;
+    un HTTP 429 est retenté jusqu'à `API_MAX_RETRIES` fois après la pause demandée.
+    """
+
+    def __init__(self, api_key=API_KEY, base_url=BASE_URL, scheduler=None):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.scheduler = scheduler or RequestScheduler()
+        self._session = None
+        self._prefilled = None
+        self._prefilled_at = 0.0
+        self._prefilled_task = None
+        self._availability = {}
+        self._availability_inflight = {}
+        self._reservations_etag = None
+
+    @property
+    def session(self):
+        """Crée la session à la première utilisation (il faut une boucle asyncio active)."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=Config.HTTP_POOL_SIZE,
+                ttl_dns_cache=Config.HTTP_DNS_CACHE_TTL,
+                keepalive_timeout=Config.HTTP_KEEPALIVE_TIMEOUT
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=10),
+                headers={"Content-Type": "application/json"}
+            )
+        return self._session
+
+    async def close(self):
+        """Ferme la session et toutes les connexions du pool."""
+        if self._prefilled_task is not None:
+            self._prefilled_task.cancel()
+        for task in list(self._availability_inflight.values()):
+            task.cancel()
+        self.scheduler.close()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _request(self, method, url, priority, endpoint, **kwargs):
+        """Envoie une requête via le planificateur ; renvoie (statut, en-têtes, corps).
+
+        Chaque tentative est mesurée dans `serveme_request_seconds{endpoint}`.
+        """
+        attempt = 0
+        while True:
+            await self.scheduler.acquire(priority)
+            with metrics.timer("serveme_request_seconds", endpoint=endpoint):
+                async with self.session.request(method, url, **kwargs) as resp:
+                    body = await resp.text()
+            metrics.inc("serveme_responses_total", endpoint=endpoint, status=resp.status)
+            self.scheduler.update_from_headers(resp.headers)
+            if resp.status != 429:
+                self.scheduler.on_success()
+                return resp.status, resp.headers, body
+            if attempt >= Config.API_MAX_RETRIES:
+                return resp.status, resp.headers, body
+            retry_after = resp.headers.get("Retry-After", "")
+            self.scheduler.on_throttled(attempt, float(retry_after) if retry_after.isdigit() else None)
+            attempt += 1
+
+    @staticmethod
+    def _json(body):
+        try:
+            return json.loads(body) if body else {}
+        except ValueError:
+            return {}
+
+    async def _fetch_prefilled(self):
+        """Télécharge la réservation pré-remplie et met à jour le cache."""
+        status, _, body = await self._request("GET", f"{self.base_url}/new?api_key={self.api_key}", PRIORITY_LOW, "new")
+        if status >= 400:
+            self.invalidate_prefilled()
+            raise Exception(f"Erreur API : modèle de réservation indisponible (HTTP {status})")
+        data = self._json(body)
+        if "actions" not in data:
+            self.invalidate_prefilled()
+            raise Exception("Erreur API : réponse /reservations/new inattendue")
+        self._prefilled = data
+        self._prefilled_at = time.monotonic()
+        return data
+
+    def _refresh_prefilled(self):
+        """Lance (ou réutilise) l'unique rafraîchissement en cours du modèle."""
+        if self._prefilled_task is None or self._prefilled_task.done():
+            self._prefilled_task = asyncio.create_task(self._fetch_prefilled())
+            self._prefilled_task.add_done_callback(self._log_refresh_error)
+        return self._prefilled_task
+
+    @staticmethod
+    def _log_refresh_error(task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Rafraîchissement du modèle de réservation échoué : {task.exception()}")
+
+    def invalidate_prefilled(self):
+        """Oublie le modèle en cache ; le prochain appel le retélécharge."""
+        self._prefilled = None
+        self._prefilled_at = 0.0
+
+    async def get_prefilled_reservation(self):
+        """Récupère la réservation pré-remplie (URLs d'actions, server_configs).
+
+        Le modèle est gardé en cache : au-delà de `PREFILLED_TTL` il est renvoyé tel quel
+        pendant qu'un rafraîchissement tourne en tâche de fond, et au-delà de
+        `PREFILLED_MAX_AGE` l'appel attend la nouvelle version.
+        """
+        age = time.monotonic() - self._prefilled_at
+        if self._prefilled is None or age > Config.PREFILLED_MAX_AGE:
+            return await asyncio.shield(self._refresh_prefilled())
+        if age > Config.PREFILLED_TTL:
+            self._refresh_prefilled()
+        return self._prefilled
+
+    @property
+    def server_configs(self):
+        """Liste des configurations serveur du dernier modèle connu."""
+        return (self._prefilled or {}).get("server_configs", [])
+
+    async def find_servers(self, start, end, priority=PRIORITY_NORMAL, refresh=False):
+        """Recherche des serveurs disponibles pour une période donnée.
+
+        Les résultats sont gardés `AVAILABILITY_TTL` secondes par créneau (start, end) et
+        les recherches identiques lancées en même temps partagent la même requête.
+        `refresh=True` ignore le cache et le renouvelle (préchargement).
+        """
+        key = (start, end)
+        cached = self._availability.get(key)
+        if not refresh and cached is not None and time.monotonic() - cached[0] < Config.AVAILABILITY_TTL:
+            return cached[1]
+        task = self._availability_inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch_servers(start, end, priority))
+            self._availability_inflight[key] = task
+            task.add_done_callback(lambda _: self._availability_inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    def invalidate_slot(self, start, end):
+        """Retire du cache de disponibilité tous les créneaux qui chevauchent [start, end)."""
+        try:
+            start_dt, end_dt = datetime.fromisoformat(start), datetime.fromisoformat(end)
+        except ValueError:
+            start_dt = end_dt = None
+        for key in list(self._availability):
+            try:
+                overlaps = datetime.fromisoformat(key[0]) < end_dt and start_dt < datetime.fromisoformat(key[1])
+            except (TypeError, ValueError):
+                overlaps = key == (start, end)  # date illisible ou sans fuseau : clé exacte seulement
+            if overlaps:
+                del self._availability[key]
+
+    async def _fetch_servers(self, start, end, priority):
+        """Interroge l'API find_servers et met le résultat en cache."""
+        prefilled = await self.get_prefilled_reservation()
+        payload = {"reservation": {"starts_at": start, "ends_at": end}}
+        status, _, body = await self._request(
+            "POST", f"{prefilled['actions']['find_servers']}?api_key={self.api_key}", priority, "find_servers", json=payload
+        )
+        if status >= 400:
+            self.invalidate_prefilled()
+            raise Exception(f"Erreur API : {self._json(body).get('errors', 'Erreur inconnue')}")
+        data = self._json(body)
+        now = time.monotonic()
+        self._availability = {
+            k: v for k, v in self._availability.items() if now - v[0] < Config.AVAILABILITY_TTL
         }
-    }
-    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10)) as session:
-        async with session.post(f"{BASE_URL}?api_key={API_KEY}", 
-                              headers={"Content-Type": "application/json"}, json=payload) as resp:
-            if resp.status == 429:
+        self._availability[(start, end)] = (now, data)
+        return data
+
+    async def create_reservation(self, start, end, server_id, password, rcon, server_config_id=None, first_map=None):
+        """Crée une réservation de serveur via l'API.
+
+        Le créneau est retiré du cache de disponibilité quel que soit le résultat.
+        """
+        payload = {
+            "reservation": {
+                "starts_at": start,
+                "ends_at": end,
+                "server_id": server_id,
+                "password": password,
+                "rcon": rcon,
+                "first_map": first_map or "cp_process_f12",
+                "server_config_id": server_config_id,
+                "auto_end": True,
+                "enable_plugins": True,
+                "enable_demos_tf": True
+            }
+        }
+        try:
+            status, _, body = await self._request("POST", f"{self.base_url}?api_key={self.api_key}", PRIORITY_HIGH, "create", json=payload)
+            if status == 429:
                 raise Exception("Erreur : Limite de requêtes atteinte. Réessayez plus tard.")
-            if resp.status >= 400:
-                error_data = await resp.json()
-                raise Exception(f"Erreur API : {error_data.get('reservation', {}).get('errors', 'Erreur inconnue')}")
-            return await resp.json(), resp.status
-
-async def end_reservation(reservation_id):
-    """Termine une réservation via l'API."""
-    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10)) as session:
-        async with session.delete(f"{BASE_URL}/{reservation_id}?api_key={API_KEY}", 
-                                headers={"Content-Type": "application/json"}) as resp:
-            return await resp.text(), resp.status
+            if status >= 400:
+                raise Exception(f"Erreur API : {self._json(body).get('reservation', {}).get('errors', 'Erreur inconnue')}")
+            return self._json(body), status
+        finally:
+            self.invalidate_slot(start, end)
+
+    async def create_batch(self, windows, count, password, rcon, server_config_file=None, first_map=None, server_key=None):
+        """Réserve `count` serveurs sur chacune des fenêtres (start, end), avec un parallélisme borné.
+
+        Les recherches et les créations partent en parallèle (au plus `BATCH_CONCURRENCY` à la
+        fois). Les serveurs libres sur toutes les fenêtres passent en premier pour enchaîner les
+        blocs sur la même machine, puis l'ordre suit `server_key` (id par défaut). Si une
+        création échoue, celles déjà faites sont annulées via end_reservation et l'erreur est
+        relevée. Retourne la liste des (start, end, réservation) créées.
+        """
+        semaphore = asyncio.Semaphore(Config.BATCH_CONCURRENCY)
+        server_key = server_key or (lambda server: server['id'])
+
+        async def bounded(coro):
+            async with semaphore:
+                return await coro
+
+        searches = await asyncio.gather(*(bounded(self.find_servers(start, end)) for start, end in windows))
+        available = [{server['id']: server for server in data.get("servers", [])} for data in searches]
+        common = sorted(
+            (server for server in available[0].values() if all(server['id'] in free for free in available)),
+            key=server_key
+        )
+        plan = []
+        for (start, end), free in zip(windows, available):
+            chosen = common[:count]
+            # Comparaison par id : les dicts de deux réponses find_servers peuvent différer
+            chosen_ids = {server['id'] for server in chosen}
+            chosen += sorted((s for s in free.values() if s['id'] not in chosen_ids), key=server_key)[:count - len(chosen)]
+            if len(chosen) < count:
+                raise Exception(f"Erreur : Seulement {len(chosen)} serveur(s) libre(s) pour le créneau du {start[:16].replace('T', ' ')}.")
+            plan += [(start, end, server) for server in chosen]
+
+        server_configs = searches[0].get("server_configs") or self.server_configs
+        server_config_id = next((c["id"] for c in server_configs if c.get("file") == server_config_file), None)
+        results = await asyncio.gather(
+            *(bounded(self.create_reservation(start, end, server['id'], password, rcon, server_config_id, first_map=first_map))
+              for start, end, server in plan),
+            return_exceptions=True
+        )
+
+        created = [
+            (start, end, result[0]["reservation"])
+            for (start, end, _), result in zip(plan, results)
+            if not isinstance(result, BaseException) and result[1] == 200
+        ]
+        if len(created) == len(plan):
+            return created
+
+        error = next((r for r in results if isinstance(r, BaseException)), None) or Exception("Erreur : Impossible de réserver.")
+        if not created:
+            raise error
+        rollbacks = await asyncio.gather(
+            *(bounded(self.end_reservation(res["id"])) for _, _, res in created), return_exceptions=True
+        )
+        leftovers = [
+            res["id"] for (_, _, res), outcome in zip(created, rollbacks)
+            if isinstance(outcome, BaseException) or outcome[1] >= 400
+        ]
+        logger.warning(f"Lot incomplet ({len(created)}/{len(plan)}), annulation des réservations créées : {error}")
+        if leftovers:
+            raise Exception(f"{error} Annulation impossible pour les réservations {', '.join(map(str, leftovers))}.")
+        raise Exception(f"{error} {len(created)} réservation(s) déjà créée(s) annulée(s).")
+
+    async def list_reservations(self):
+        """Liste les réservations du compte en une requête conditionnelle.
+
+        Renvoie None si rien n'a changé depuis le dernier appel (HTTP 304 sur l'ETag).
+        """
+        headers = {"If-None-Match": self._reservations_etag} if self._reservations_etag else {}
+        status, resp_headers, body = await self._request(
+            "GET", f"{self.base_url}?api_key={self.api_key}", PRIORITY_LOW, "list", headers=headers
+        )
+        if status == 304:
+            return None
+        if status >= 400:
+            raise Exception(f"Erreur API : liste des réservations indisponible (HTTP {status})")
+        self._reservations_etag = resp_headers.get("ETag")
+        return self._json(body).get("reservations", [])
+
+    async def end_reservation(self, reservation_id):
+        """Termine une réservation via l'API."""
+        status, _, body = await self._request("DELETE", f"{self.base_url}/{reservation_id}?api_key={self.api_key}", PRIORITY_HIGH, "end")
+        return body, status
 
 def clean_server_name(name):
     """Remove parentheses, brackets, and extra whitespace from server names."""
     name = re.sub(r'[\(\[\{].*?[\)\]\}]', '', name)  # Supprime ( ), [ ], { }
     return name.strip()
+
+def server_location(name):
+    """Localisation indiquée entre parenthèses/crochets dans un nom de serveur (ex. « Paris »), ou None."""
+    match = re.search(r'[\(\[\{](.*?)[\)\]\}]', name)
+    return match.group(1).strip() or None if match else None